@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+MO Listener Delivery Benchmark
+Runs MoListener against a local stand-in command server and reports
+latency from command enqueue to handler start for each delivery mode
+"""
+
+import json
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+import statistics
+import importlib.util
+from pathlib import Path
+from typing import Dict, Any, List
+
+from aiohttp import web
+
+SERVICES_DIR = Path(__file__).resolve().parent.parent / "services"
+
+
+def load_listener_module():
+    """Import mo-listener.py despite the hyphenated file name"""
+    spec = importlib.util.spec_from_file_location("mo_listener", SERVICES_DIR / "mo-listener.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class StandInCommandServer:
+    """Minimal command queue speaking the polling, long-poll and SSE protocols"""
+
+    def __init__(self, enable_push: bool = True):
+        self.enable_push = enable_push
+        self.pending: List[Dict[str, Any]] = []
+        self.results: List[Dict[str, Any]] = []
+        self.queue_requests = 0
+        self.new_command = asyncio.Event()
+        self.app = web.Application()
+        self.app.router.add_get("/api/command-queue", self.command_queue)
+        self.app.router.add_get("/api/command-stream", self.command_stream)
+        self.app.router.add_post("/api/command-results", self.command_results)
+        self.app.router.add_post("/api/command-results/batch", self.command_results_batch)
+        self.runner = None
+        self.url = ""
+
+    async def start(self):
+        self.runner = web.AppRunner(self.app, access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}"
+
+    async def stop(self):
+        # Release held long-polls so cleanup doesn't wait out their timeout
+        self.new_command.set()
+        if self.runner:
+            await self.runner.cleanup()
+
+    def enqueue(self, command: Dict[str, Any]):
+        command["enqueued_at"] = time.monotonic()
+        self.pending.append(command)
+        self.new_command.set()
+
+    def take_pending(self) -> List[Dict[str, Any]]:
+        commands, self.pending = self.pending, []
+        self.new_command.clear()
+        return commands
+
+    async def command_queue(self, request: web.Request) -> web.Response:
+        self.queue_requests += 1
+        wait = float(request.query.get("wait", 0)) if self.enable_push else 0
+        if wait and not self.pending:
+            try:
+                await asyncio.wait_for(self.new_command.wait(), timeout=wait)
+            except asyncio.TimeoutError:
+                pass
+        return web.json_response(self.take_pending())
+
+    async def command_stream(self, request: web.Request) -> web.StreamResponse:
+        if not self.enable_push:
+            return web.Response(status=404)
+
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        try:
+            await response.write(b"retry: 500\n\n")
+            while True:
+                try:
+                    await asyncio.wait_for(self.new_command.wait(), timeout=15)
+                except asyncio.TimeoutError:
+                    await response.write(b": keep-alive\n\n")
+                    continue
+                for command in self.take_pending():
+                    await response.write(f"data: {json.dumps(command)}\n\n".encode())
+        except ConnectionResetError:
+            # Listener disconnected at the end of the run
+            return response
+
+    async def command_results(self, request: web.Request) -> web.Response:
+        self.results.append(await request.json())
+        return web.json_response({"success": True})
+
+    async def command_results_batch(self, request: web.Request) -> web.Response:
+        payload = await request.json()
+        self.results.extend(payload.get("results", []))
+        return web.json_response({"success": True})
+
+
+async def run_mode(mode: str, commands: int, spacing: float, enable_push: bool) -> Dict[str, Any]:
+    """Measure enqueue-to-start latency for one delivery mode"""
+    module = load_listener_module()
+    server = StandInCommandServer(enable_push=enable_push)
+    await server.start()
+
+    work_dir = Path(tempfile.mkdtemp())
+    config_path = work_dir / "mo_config.json"
+    config_path.write_text(json.dumps({
+        "journal_path": str(work_dir / "mo_journal.db"),
+        "metrics_snapshot_path": str(work_dir / "metrics.json"),
+        "metrics_port": 0,
+        "rate_limits": {},
+        # Stand-in commands never render; don't spawn content automation workers
+        "automation_prewarm": False
+    }))
+    listener = module.MoListener(str(config_path))
+    listener.replit_api = server.url
+    listener.config["delivery_mode"] = mode
+    listener.config["log_commands"] = False
+
+    latencies: List[float] = []
+
+    async def record_start(command: Dict[str, Any]) -> Dict[str, Any]:
+        latencies.append(time.monotonic() - command["enqueued_at"])
+        return {"success": True}
+
+    listener.command_handlers["social_action"] = record_start
+    loop_task = asyncio.create_task(listener.main_loop())
+
+    # Let the listener settle into its steady-state delivery path
+    await asyncio.sleep(1.0)
+    for i in range(commands):
+        server.enqueue({"id": f"{mode}-{i}", "type": "social_action"})
+        await asyncio.sleep(random.uniform(0, 2 * spacing))
+
+    deadline = time.monotonic() + 60
+    while len(latencies) < commands and time.monotonic() < deadline:
+        await asyncio.sleep(0.05)
+
+    listener.is_running = False
+    loop_task.cancel()
+    await asyncio.gather(loop_task, return_exceptions=True)
+    await server.stop()
+
+    ordered = sorted(latencies)
+    metrics = json.loads((work_dir / "metrics.json").read_text())
+    handler = [h for h in metrics["histograms"] if h["name"] == "mo_listener_queue_wait_seconds"]
+    return {
+        "mode": mode,
+        "delivered": len(latencies),
+        "queue_requests": server.queue_requests,
+        "results_received": len(server.results),
+        "p50_ms": round(statistics.median(ordered) * 1000, 1) if ordered else None,
+        "p95_ms": round(ordered[int(len(ordered) * 0.95) - 1] * 1000, 1) if ordered else None,
+        "max_ms": round(ordered[-1] * 1000, 1) if ordered else None,
+        "avg_queue_wait_ms": round(handler[0]["avg"] * 1000, 2) if handler else None
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="MO Listener delivery latency benchmark")
+    parser.add_argument("--commands", type=int, default=20, help="Commands per mode")
+    parser.add_argument("--spacing", type=float, default=1.0, help="Mean seconds between commands")
+    parser.add_argument("--modes", default="poll,long_poll,sse", help="Comma-separated delivery modes")
+    parser.add_argument("--no-push", action="store_true", help="Stand-in server rejects push, exercising fallback")
+    args = parser.parse_args()
+
+    for mode in args.modes.split(","):
+        result = await run_mode(mode.strip(), args.commands, args.spacing, not args.no_push)
+        print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
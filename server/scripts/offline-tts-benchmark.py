@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Offline TTS Throughput Benchmark
+Compares one fresh interpreter + pyttsx3.init() per utterance (the old
+reel editor path) against the warm OfflineTTSPool at several pool sizes
+"""
+
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+from typing import Dict, Any, List
+
+SERVICES_DIR = Path(__file__).resolve().parent.parent / "services"
+sys.path.insert(0, str(SERVICES_DIR))
+
+from offline_tts_pool import OfflineTTSPool
+
+PER_CALL_SCRIPT = """
+import sys, pyttsx3
+engine = pyttsx3.init()
+engine.setProperty('rate', 200)
+engine.save_to_file(sys.argv[1], sys.argv[2])
+engine.runAndWait()
+"""
+
+
+def make_utterances(count: int, work_dir: Path) -> List[Dict[str, Any]]:
+    return [
+        {
+            "text": f"Offline narration sample number {i}. This sentence keeps the engine busy.",
+            "path": str(work_dir / f"utterance_{i}.wav"),
+            "rate": 200
+        }
+        for i in range(count)
+    ]
+
+
+def bench_per_call(utterances: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """One interpreter and one engine per utterance"""
+    start = time.perf_counter()
+    failures = 0
+    for utterance in utterances:
+        result = subprocess.run(
+            [sys.executable, "-c", PER_CALL_SCRIPT, utterance["text"], utterance["path"]],
+            capture_output=True
+        )
+        failures += result.returncode != 0
+    return summarize("per_call", len(utterances), time.perf_counter() - start, failures, 0.0)
+
+
+def bench_pool(utterances: List[Dict[str, Any]], size: int, batch_size: int) -> Dict[str, Any]:
+    """Warm pool, fed in batches of batch_size"""
+    pool = OfflineTTSPool(size=size)
+    started = time.perf_counter()
+    pool.start()
+    startup = time.perf_counter() - started
+
+    start = time.perf_counter()
+    failures = 0
+    for i in range(0, len(utterances), batch_size):
+        results = pool.synthesize_batch(utterances[i:i + batch_size])
+        failures += sum(1 for r in results if not r["success"])
+    elapsed = time.perf_counter() - start
+    pool.close()
+    return summarize(f"pool_{size}x_batch_{batch_size}", len(utterances), elapsed, failures, startup)
+
+
+def summarize(mode: str, count: int, elapsed: float, failures: int, startup: float) -> Dict[str, Any]:
+    return {
+        "mode": mode,
+        "utterances": count,
+        "failures": failures,
+        "startup_s": round(startup, 3),
+        "elapsed_s": round(elapsed, 3),
+        "utterances_per_s": round(count / elapsed, 2) if elapsed else None
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline TTS throughput benchmark")
+    parser.add_argument("--utterances", type=int, default=24, help="Utterances per mode")
+    parser.add_argument("--pool-sizes", default="1,2,4", help="Comma-separated pool sizes")
+    parser.add_argument("--batch-size", type=int, default=8, help="Utterances per pool batch")
+    parser.add_argument("--skip-per-call", action="store_true", help="Skip the per-utterance baseline")
+    args = parser.parse_args()
+
+    work_dir = Path(tempfile.mkdtemp())
+    utterances = make_utterances(args.utterances, work_dir)
+
+    if not args.skip_per_call:
+        print(json.dumps(bench_per_call(utterances)))
+    for size in args.pool_sizes.split(","):
+        print(json.dumps(bench_pool(utterances, int(size), args.batch_size)))
+
+
+if __name__ == "__main__":
+    main()
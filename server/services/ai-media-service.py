@@ -9,13 +9,13 @@ Comprehensive free AI-powered media generation using open-source models:
 - Whisper for speech recognition
 """
 
+import io
 import os
 import sys
 import json
 import asyncio
 import subprocess
-import tempfile
-import uuid
+from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Optional, Union
 import logging
@@ -40,9 +40,16 @@ except ImportError:
                           "torch", "diffusers", "transformers", "torchaudio"])
 
 # Text-to-Speech libraries
-import pyttsx3
 from gtts import gTTS
 import pygame
+from pydub import AudioSegment
+
+from tts_cache import get_tts_cache
+from offline_tts_pool import get_offline_tts_pool
+from media_probe import media_duration
+from render_profiles import get_render_profile, scaled_size, profile_fps, moviepy_write_args
+from artifact_store import get_artifact_store
+import audio_dsp
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -53,10 +60,13 @@ class AIMediaGenerator:
         self.output_dir = output_dir
         self.ensure_output_dir()
         
+        # Outputs are stored by content digest and aged out by the store's collector
+        self.store = get_artifact_store()
+        self.store.manage(self.output_dir)
+        
         # Initialize AI models
         self.sd_pipeline = None
         self.music_generator = None
-        self.tts_engine = None
         
         # Video settings
         self.video_codecs = {
@@ -99,23 +109,6 @@ class AIMediaGenerator:
                 return False
         return True
 
-    def init_tts_engine(self):
-        """Initialize text-to-speech engine"""
-        if self.tts_engine is None:
-            try:
-                self.tts_engine = pyttsx3.init()
-                # Configure voice settings
-                voices = self.tts_engine.getProperty('voices')
-                if voices:
-                    self.tts_engine.setProperty('voice', voices[0].id)
-                self.tts_engine.setProperty('rate', 150)  # Speaking rate
-                self.tts_engine.setProperty('volume', 0.8)  # Volume level
-                logger.info("TTS engine initialized successfully")
-            except Exception as e:
-                logger.error(f"Failed to initialize TTS: {e}")
-                return False
-        return True
-
     async def generate_image(self, prompt: str, settings: Dict) -> Dict:
         """Generate image using Stable Diffusion"""
         try:
@@ -146,10 +139,10 @@ class AIMediaGenerator:
             
             image = result.images[0]
             
-            # Save image
-            filename = f"image_{uuid.uuid4().hex[:8]}.png"
-            filepath = os.path.join(self.output_dir, 'images', filename)
-            image.save(filepath, quality=95)
+            # Save image, named by its content
+            object_path = self.store.produce(None, lambda path: image.save(path, quality=95), ".png")
+            filename = f"image_{Path(object_path).stem[:16]}.png"
+            filepath = self.store.materialize(object_path, os.path.join(self.output_dir, 'images', filename))
             
             return {
                 "success": True,
@@ -198,43 +191,59 @@ class AIMediaGenerator:
             pitch = settings.get('pitch', 1.0)
             emotion = settings.get('emotion', 'neutral')
             
-            filename = f"voice_{uuid.uuid4().hex[:8]}.wav"
-            filepath = os.path.join(self.output_dir, 'voice', filename)
-            
             # Use gTTS for online generation
             if language.startswith('en'):
                 lang_code = 'en'
             else:
                 lang_code = language.split('-')[0]
             
-            try:
-                # Try gTTS first for better quality
-                tts = gTTS(text=text, lang=lang_code, slow=False)
-                temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.mp3')
-                tts.save(temp_file.name)
-                
-                # Convert to WAV and adjust speed/pitch using FFmpeg
-                speed_filter = f"atempo={speed}"
-                pitch_filter = f"asetrate=44100*{pitch},aresample=44100"
-                
-                cmd = [
-                    'ffmpeg', '-i', temp_file.name,
-                    '-af', f"{speed_filter},{pitch_filter}",
-                    '-y', filepath
-                ]
+            cache = get_tts_cache()
+            
+            def synthesize_gtts(path: str):
+                # Try gTTS first for better quality, decoding in memory
+                buffer = io.BytesIO()
+                gTTS(text=text, lang=lang_code, slow=False).write_to_fp(buffer)
+                buffer.seek(0)
+                samples, sample_rate = audio_dsp.segment_to_array(
+                    AudioSegment.from_file(buffer, format="mp3")
+                )
                 
-                subprocess.run(cmd, check=True, capture_output=True)
-                os.unlink(temp_file.name)
+                # Adjust speed/pitch on the PCM array and encode once
+                if speed != 1.0:
+                    samples = audio_dsp.time_stretch(samples, speed, sample_rate)
+                if pitch != 1.0:
+                    samples = audio_dsp.pitch_shift(samples, pitch, sample_rate)
+                samples = audio_dsp.resample(samples, sample_rate, 44100)
+                audio_dsp.write_wav(path, samples, 44100)
+            
+            def synthesize_pyttsx3(path: str):
+                get_offline_tts_pool().synthesize(text, path, rate=int(150 * speed), volume=0.8)
+            
+            try:
+                cached_path = cache.fetch(
+                    text, synthesize_gtts,
+                    language=lang_code, speed=speed, pitch=pitch,
+                    engine="gtts+dsp", fmt="wav"
+                )
                 
             except Exception as e:
                 # Fallback to pyttsx3
                 logger.warning(f"gTTS failed, using pyttsx3: {e}")
-                if not self.init_tts_engine():
+                try:
+                    get_offline_tts_pool().start()
+                except Exception as pool_error:
+                    logger.error(f"Failed to initialize TTS: {pool_error}")
                     return {"success": False, "error": "Failed to initialize TTS"}
                 
-                self.tts_engine.setProperty('rate', int(150 * speed))
-                self.tts_engine.save_to_file(text, filepath)
-                self.tts_engine.runAndWait()
+                cached_path = cache.fetch(
+                    text, synthesize_pyttsx3,
+                    language=lang_code, speed=speed,
+                    engine="pyttsx3", fmt="wav"
+                )
+            
+            # Cache entries are named by their synthesis key
+            filename = f"voice_{Path(cached_path).stem[:16]}.wav"
+            filepath = cache.materialize(cached_path, os.path.join(self.output_dir, 'voice', filename))
             
             # Get audio duration
             duration = self.get_audio_duration(filepath)
@@ -260,21 +269,27 @@ class AIMediaGenerator:
             genre = settings.get('genre', 'electronic')
             tempo = settings.get('tempo', 120)
             
-            filename = f"music_{uuid.uuid4().hex[:8]}.wav"
-            filepath = os.path.join(self.output_dir, 'audio', filename)
-            
-            # For now, create a simple synthetic audio track
-            # In production, this would use MusicGen or similar
-            sample_rate = 44100
-            t = np.linspace(0, duration, int(sample_rate * duration))
-            
-            # Generate simple electronic-style music
-            frequency = self.get_genre_frequency(genre)
-            waveform = self.generate_music_waveform(t, frequency, tempo, genre)
-            
-            # Save as WAV
-            import scipy.io.wavfile as wavfile
-            wavfile.write(filepath, sample_rate, (waveform * 32767).astype(np.int16))
+            def synthesize(path: str):
+                # For now, create a simple synthetic audio track
+                # In production, this would use MusicGen or similar
+                sample_rate = 44100
+                t = np.linspace(0, duration, int(sample_rate * duration))
+                
+                # Generate simple electronic-style music
+                frequency = self.get_genre_frequency(genre)
+                waveform = self.generate_music_waveform(t, frequency, tempo, genre)
+                
+                # Save as WAV
+                import scipy.io.wavfile as wavfile
+                wavfile.write(path, sample_rate, (waveform * 32767).astype(np.int16))
+            
+            # The track is a pure function of its settings, so it is only synthesized once
+            key = self.store.make_key("music", duration=duration, genre=genre, tempo=tempo)
+            filename = f"music_{key[:16]}.wav"
+            filepath = self.store.materialize(
+                self.store.produce(key, synthesize, ".wav"),
+                os.path.join(self.output_dir, 'audio', filename)
+            )
             
             return {
                 "success": True,
@@ -344,15 +359,15 @@ class AIMediaGenerator:
             duration = settings.get('duration', 30)
             resolution = settings.get('resolution', '1080p')
             style = settings.get('style', 'modern')
-            fps = settings.get('fps', 30)
+            profile = get_render_profile(settings.get('profile'))
+            fps = profile_fps(profile, settings.get('fps', 30))
             background_music = settings.get('background_music', True)
             
-            filename = f"video_{uuid.uuid4().hex[:8]}.mp4"
-            filepath = os.path.join(self.output_dir, 'videos', filename)
-            
-            # Get video dimensions
-            width = self.video_codecs[resolution]['width']
-            height = self.video_codecs[resolution]['height']
+            # Get video dimensions, scaled down for draft previews
+            width, height = scaled_size(
+                (self.video_codecs[resolution]['width'], self.video_codecs[resolution]['height']),
+                profile
+            )
             
             # Generate background images for video
             image_prompts = self.generate_video_scene_prompts(prompt, style)
@@ -397,15 +412,16 @@ class AIMediaGenerator:
                     audio_clip = audio_clip.volumex(0.3)  # Lower volume
                     video_clip = video_clip.set_audio(audio_clip)
             
-            # Write final video
-            video_clip.write_videofile(
-                filepath,
+            # Write final video, named by its content
+            object_path = self.store.produce(None, lambda path: video_clip.write_videofile(
+                path,
                 fps=fps,
-                codec='libx264',
-                audio_codec='aac',
                 verbose=False,
-                logger=None
-            )
+                logger=None,
+                **moviepy_write_args(profile)
+            ), ".mp4")
+            filename = f"video_{Path(object_path).stem[:16]}.mp4"
+            filepath = self.store.materialize(object_path, os.path.join(self.output_dir, 'videos', filename))
             
             # Clean up temporary clips
             video_clip.close()
@@ -419,6 +435,7 @@ class AIMediaGenerator:
                 "prompt": prompt,
                 "duration": duration,
                 "resolution": f"{width}x{height}",
+                "profile": profile["name"],
                 "settings": settings,
                 "generated_at": datetime.now().isoformat()
             }
@@ -438,16 +455,8 @@ class AIMediaGenerator:
         return base_prompts
 
     def get_audio_duration(self, filepath: str) -> float:
-        """Get duration of audio file"""
-        try:
-            import wave
-            with wave.open(filepath, 'r') as f:
-                frames = f.getnframes()
-                rate = f.getframerate()
-                duration = frames / float(rate)
-            return duration
-        except:
-            return 0.0
+        """Get duration of audio file from its headers (any container ffprobe reads)"""
+        return media_duration(filepath)
 
     async def process_generation_request(self, request: Dict) -> Dict:
         """Main method to process generation requests"""
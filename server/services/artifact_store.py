@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""
+Artifact Store - Content-addressed storage for generated media
+Renders, reel segments, narration and images are stored once under the
+digest of their bytes, looked up by a stable digest of the inputs that
+produced them, and exposed in the services' output directories as hard
+links. Every exposed path is recorded as a reference so a size/age-based
+collector can reclaim space in the store and in the output directories it
+manages.
+
+Usage: python artifact_store.py gc|stats [--max-mb N] [--max-age-days N]
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import shutil
+import sqlite3
+import hashlib
+import logging
+import argparse
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STORE_DIR = Path(os.environ.get("MO_ARTIFACT_STORE", Path.home() / ".cache" / "mo_artifacts"))
+DEFAULT_MAX_BYTES = int(os.environ.get("MO_ARTIFACT_STORE_MAX_MB", "4096")) * 1024 * 1024
+DEFAULT_MAX_AGE = float(os.environ.get("MO_ARTIFACT_MAX_AGE_DAYS", "14")) * 86400
+GC_INTERVAL = 600
+# A collection triggered by the size budget frees down to this fraction of it,
+# so the writes that follow don't each set off another full pass
+GC_LOW_WATER = 0.9
+# Only these are swept from managed directories; logs and configs are left alone
+MEDIA_EXTENSIONS = ('.mp4', '.mov', '.webm', '.mp3', '.wav', '.m4a', '.png', '.jpg', '.jpeg', '.gif')
+
+
+def file_digest(path: str, block_size: int = 1024 * 1024) -> str:
+    """SHA-256 of a file's bytes, read in fixed-size blocks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ArtifactStore:
+    """Deduplicating object store with input keys, output references and garbage collection"""
+
+    def __init__(self, root: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES,
+                 max_age: float = DEFAULT_MAX_AGE):
+        self.root = Path(root) if root else DEFAULT_STORE_DIR
+        self.objects_dir = self.root / "objects"
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.lock = threading.Lock()
+        self.last_gc = 0.0
+        self.stats = {"hits": 0, "misses": 0, "deduplicated": 0, "bytes_written": 0}
+
+        self.conn = sqlite3.connect(str(self.root / "index.db"), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS objects (
+                digest TEXT PRIMARY KEY,
+                ext TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                accessed_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS keys (
+                key TEXT PRIMARY KEY,
+                digest TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS refs (
+                path TEXT PRIMARY KEY,
+                digest TEXT NOT NULL,
+                accessed_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS managed_dirs (
+                path TEXT PRIMARY KEY
+            );
+        """)
+        self.conn.commit()
+        # Running total of object bytes, so writes can check the budget without a scan
+        self.total_bytes = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM objects").fetchone()[0]
+
+    @staticmethod
+    def make_key(kind: str, **params) -> str:
+        """Stable SHA-256 over an artifact kind and the inputs that determine it"""
+        canonical = json.dumps({"kind": kind, **params}, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def object_path(self, digest: str, ext: str) -> Path:
+        return self.objects_dir / digest[:2] / f"{digest}{ext}"
+
+    def lookup(self, key: str) -> Optional[str]:
+        """Stored object for an input key, or None"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT objects.digest, objects.ext FROM keys JOIN objects ON objects.digest = keys.digest "
+                "WHERE keys.key = ?", (key,)
+            ).fetchone()
+        if not row:
+            return None
+        path = self.object_path(*row)
+        if not path.exists():
+            return None
+        with self.lock:
+            self.conn.execute("UPDATE objects SET accessed_at = ? WHERE digest = ?", (time.time(), row[0]))
+            self.conn.commit()
+        return str(path)
+
+    def publish(self, source_path: str, key: Optional[str] = None, ext: Optional[str] = None) -> str:
+        """
+        Move a finished file into the store and return its object path
+
+        Identical bytes are stored once; a later copy is discarded. The
+        object appears under its final name via an atomic rename.
+        """
+        ext = ext if ext is not None else Path(source_path).suffix.lower()
+        digest = file_digest(source_path)
+        path = self.object_path(digest, ext)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        if path.exists():
+            os.unlink(source_path)
+            with self.lock:
+                self.stats["deduplicated"] += 1
+        else:
+            temp_path = path.with_name(f".{uuid.uuid4().hex}{ext}")
+            try:
+                shutil.move(source_path, temp_path)
+                os.replace(temp_path, path)
+            finally:
+                if temp_path.exists():
+                    temp_path.unlink()
+            with self.lock:
+                self.stats["bytes_written"] += path.stat().st_size
+
+        size = path.stat().st_size
+        with self.lock:
+            if not self.conn.execute("SELECT 1 FROM objects WHERE digest = ?", (digest,)).fetchone():
+                self.total_bytes += size
+            self.conn.execute(
+                "INSERT OR REPLACE INTO objects (digest, ext, size, accessed_at) VALUES (?, ?, ?, ?)",
+                (digest, ext, size, time.time())
+            )
+            if key:
+                self.conn.execute("INSERT OR REPLACE INTO keys (key, digest) VALUES (?, ?)", (key, digest))
+            self.conn.commit()
+
+        self.maybe_gc()
+        return str(path)
+
+    def produce(self, key: Optional[str], build: Callable[[str], None], ext: str) -> str:
+        """
+        Return the object for a key, calling build(temp_path) to create it on a miss
+
+        With no key (non-deterministic output) the result is always built
+        and only deduplicated by content.
+        """
+        cached = self.lookup(key) if key else None
+        if cached:
+            with self.lock:
+                self.stats["hits"] += 1
+            return cached
+
+        with self.lock:
+            self.stats["misses"] += 1
+
+        temp_path = self.objects_dir / f".build_{uuid.uuid4().hex}{ext}"
+        try:
+            build(str(temp_path))
+            return self.publish(str(temp_path), key, ext)
+        finally:
+            if temp_path.exists():
+                temp_path.unlink()
+
+    def materialize(self, object_path: str, output_path: str) -> str:
+        """Expose an object at an output path (hard link, else copy) and reference it"""
+        output = Path(output_path)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        if not (output.exists() and os.path.samefile(object_path, output)):
+            temp_path = output.with_name(f".{uuid.uuid4().hex}{output.suffix}")
+            try:
+                try:
+                    os.link(object_path, temp_path)
+                except OSError:
+                    shutil.copyfile(object_path, temp_path)
+                os.replace(temp_path, output)
+            finally:
+                if temp_path.exists():
+                    temp_path.unlink()
+
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO refs (path, digest, accessed_at) VALUES (?, ?, ?)",
+                (str(output.resolve()), Path(object_path).stem, time.time())
+            )
+            self.conn.commit()
+        return str(output)
+
+    def manage(self, directory: str):
+        """Put an output directory under the collector's age-based sweep"""
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR IGNORE INTO managed_dirs (path) VALUES (?)", (str(Path(directory).resolve()),)
+            )
+            self.conn.commit()
+
+    def maybe_gc(self):
+        over_budget = self.total_bytes > self.max_bytes
+        if over_budget or time.time() - self.last_gc > GC_INTERVAL:
+            try:
+                self.gc(max_bytes=int(self.max_bytes * GC_LOW_WATER) if over_budget else None)
+            except Exception as e:
+                logger.warning(f"Artifact garbage collection failed: {e}")
+
+    def gc(self, max_bytes: Optional[int] = None, max_age: Optional[float] = None) -> Dict[str, int]:
+        """
+        Reclaim space in the store and managed output directories
+
+        Outputs not requested within max_age are removed, as are untracked
+        media files of that age in managed directories. Unreferenced objects
+        go when they are older than max_age or the store is over max_bytes;
+        if it still is, the least recently used referenced objects and their
+        outputs go too.
+        """
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        max_age = self.max_age if max_age is None else max_age
+        now = time.time()
+        self.last_gc = now
+        result = {"outputs_removed": 0, "files_swept": 0, "objects_removed": 0, "bytes_freed": 0}
+
+        with self.lock:
+            refs = self.conn.execute("SELECT path, digest, accessed_at FROM refs").fetchall()
+            managed = [row[0] for row in self.conn.execute("SELECT path FROM managed_dirs")]
+
+        live_refs: Dict[str, List[str]] = {}
+        dropped = []
+        for path, digest, accessed_at in refs:
+            if not os.path.exists(path):
+                dropped.append(path)
+            elif now - accessed_at > max_age:
+                Path(path).unlink(missing_ok=True)
+                dropped.append(path)
+                result["outputs_removed"] += 1
+            else:
+                live_refs.setdefault(digest, []).append(path)
+
+        tracked = {path for paths in live_refs.values() for path in paths}
+        for directory in managed:
+            for path in Path(directory).rglob("*"):
+                if not path.name.lower().endswith(MEDIA_EXTENSIONS) or str(path) in tracked:
+                    continue
+                try:
+                    stat = path.stat()
+                    if now - stat.st_mtime > max_age:
+                        path.unlink()
+                        result["files_swept"] += 1
+                        result["bytes_freed"] += stat.st_size
+                except OSError:
+                    continue
+
+        with self.lock:
+            self.conn.executemany("DELETE FROM refs WHERE path = ?", [(path,) for path in dropped])
+            self.conn.commit()
+            objects = self.conn.execute(
+                "SELECT digest, ext, size, accessed_at FROM objects ORDER BY accessed_at"
+            ).fetchall()
+
+        total = sum(size for _, _, size, _ in objects)
+        removed = []
+
+        def remove(digest: str, ext: str, size: int):
+            nonlocal total
+            self.object_path(digest, ext).unlink(missing_ok=True)
+            for path in live_refs.pop(digest, []):
+                Path(path).unlink(missing_ok=True)
+                dropped.append(path)
+                result["outputs_removed"] += 1
+            removed.append(digest)
+            total -= size
+            result["objects_removed"] += 1
+            result["bytes_freed"] += size
+
+        for digest, ext, size, accessed_at in objects:
+            if digest not in live_refs and (now - accessed_at > max_age or total > max_bytes):
+                remove(digest, ext, size)
+        for digest, ext, size, _ in objects:
+            if total <= max_bytes:
+                break
+            if digest not in removed:
+                remove(digest, ext, size)
+
+        with self.lock:
+            self.conn.executemany("DELETE FROM refs WHERE path = ?", [(path,) for path in dropped])
+            self.conn.executemany("DELETE FROM objects WHERE digest = ?", [(d,) for d in removed])
+            self.conn.executemany("DELETE FROM keys WHERE digest = ?", [(d,) for d in removed])
+            self.conn.commit()
+            # Resync with objects other processes may have added or collected
+            self.total_bytes = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM objects").fetchone()[0]
+
+        if any(result.values()):
+            logger.info(f"Artifact GC: {result}")
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            stats = dict(self.stats)
+            objects, size = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM objects").fetchone()
+            stats["refs"] = self.conn.execute("SELECT COUNT(*) FROM refs").fetchone()[0]
+        stats["objects"] = objects
+        stats["stored_bytes"] = size
+        return stats
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+_shared_store: Optional[ArtifactStore] = None
+_shared_lock = threading.Lock()
+
+
+def get_artifact_store() -> ArtifactStore:
+    """Process-wide store instance"""
+    global _shared_store
+    with _shared_lock:
+        if _shared_store is None:
+            _shared_store = ArtifactStore()
+        return _shared_store
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Artifact store maintenance")
+    parser.add_argument("command", choices=["gc", "stats"])
+    parser.add_argument("--max-mb", type=int, help="Store size budget (default MO_ARTIFACT_STORE_MAX_MB)")
+    parser.add_argument("--max-age-days", type=float, help="Output retention (default MO_ARTIFACT_MAX_AGE_DAYS)")
+    args = parser.parse_args()
+
+    store = get_artifact_store()
+    if args.command == "gc":
+        result = store.gc(
+            max_bytes=args.max_mb * 1024 * 1024 if args.max_mb is not None else None,
+            max_age=args.max_age_days * 86400 if args.max_age_days is not None else None
+        )
+        print(json.dumps(result))
+    else:
+        print(json.dumps(store.get_stats()))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+    main()
@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""
+ASS Captions - Timed subtitle tracks burned in with one ffmpeg pass
+Builds an Advanced SubStation Alpha script (fades, karaoke word sweeps,
+per-position styles) and lets libass draw it while the video is encoded,
+instead of compositing one rendered text layer per word. Without libass the
+same timed lines are drawn as text sprites and composited by MoviePy
+
+Usage: python ass_captions.py <video_path> <caption_text> [style] [profile]
+"""
+
+import os
+import re
+import sys
+import json
+import shutil
+import tempfile
+import logging
+import subprocess
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Tuple
+
+from media_probe import probe_media
+from render_profiles import get_render_profile, ffmpeg_encoder_args, moviepy_write_args
+
+logger = logging.getLogger(__name__)
+
+FFMPEG_BINARY = os.environ.get("MO_FFMPEG_BINARY", "ffmpeg")
+
+# Styles of the cross-platform poster's animated captions
+CAPTION_STYLES: Dict[str, Dict[str, Any]] = {
+    "modern": {
+        "font": "Arial",
+        "fontsize": 60,
+        "bold": True,
+        "color": (255, 255, 255),
+        "outline_color": (0, 0, 0),
+        "outline": 3,
+        "karaoke": True
+    },
+    "minimal": {
+        "font": "Arial",
+        "fontsize": 45,
+        "bold": False,
+        "color": (255, 255, 255),
+        "outline_color": (0, 0, 0),
+        "outline": 0,
+        "karaoke": False
+    },
+    "bold": {
+        "font": "Arial",
+        "fontsize": 70,
+        "bold": True,
+        "color": (255, 255, 0),
+        "outline_color": (0, 0, 0),
+        "outline": 4,
+        "karaoke": True
+    },
+    "creative": {
+        "font": "Comic Sans MS",
+        "fontsize": 55,
+        "bold": False,
+        "color": (255, 255, 255),
+        "outline_color": (128, 0, 128),
+        "outline": 2,
+        "karaoke": True
+    }
+}
+
+# Numpad-style ASS alignments for overlay positions
+ALIGNMENTS = {"bottom": 2, "center": 5, "top": 8}
+
+
+def ass_timestamp(seconds: float) -> str:
+    """h:mm:ss.cc as ASS expects"""
+    centiseconds = max(0, int(round(seconds * 100)))
+    hours, rest = divmod(centiseconds, 360000)
+    minutes, rest = divmod(rest, 6000)
+    secs, cs = divmod(rest, 100)
+    return f"{hours}:{minutes:02d}:{secs:02d}.{cs:02d}"
+
+
+def ass_color(rgb: Tuple[int, int, int], alpha: int = 0) -> str:
+    """&HAABBGGRR, where alpha 0 is opaque"""
+    r, g, b = rgb
+    return f"&H{alpha:02X}{b:02X}{g:02X}{r:02X}"
+
+
+def escape_text(text: str) -> str:
+    """Keep caption text from being read as override tags or line breaks"""
+    # A word joiner after each backslash stops it pairing with the next character as an escape
+    text = text.replace("\\", "\\\u2060").replace("{", "\\{").replace("}", "\\}")
+    return re.sub(r"\r?\n", r"\\N", text)
+
+
+def filter_path(path: str) -> str:
+    """Escape a path for use as a filter option inside a filtergraph"""
+    value = re.sub(r"([\\':])", r"\\\1", path)
+    return re.sub(r"([\\'\[\],;])", r"\\\1", value)
+
+
+def caption_events(text: str, duration: float, words_per_line: int = 3,
+                   karaoke: bool = True, position: str = "bottom") -> List[Dict[str, Any]]:
+    """
+    Split caption text into timed lines of a few words each
+
+    Words share the duration evenly; with karaoke each line carries the
+    per-word timings so words light up as they come due.
+    """
+    words = text.split()
+    if not words or duration <= 0:
+        return []
+
+    per_word = duration / len(words)
+    events = []
+    for i in range(0, len(words), words_per_line):
+        line = words[i:i + words_per_line]
+        events.append({
+            "text": " ".join(line),
+            "start": i * per_word,
+            "end": min(duration, (i + len(line)) * per_word),
+            "position": position,
+            "karaoke": [(word, per_word) for word in line] if karaoke else None
+        })
+    return events
+
+
+def build_ass(events: List[Dict[str, Any]], size: Tuple[int, int], style: Dict[str, Any],
+              fade_ms: int = 300) -> str:
+    """
+    Render caption events as an ASS script
+
+    Args:
+        events: Dicts with text, start, end (seconds), position (bottom,
+            center or top), optional karaoke [(word, seconds), ...] and
+            optional span (start, end) of the whole caption when the event
+            is a piece of it cut at a segment boundary
+        size: Frame size; script coordinates are frame pixels
+        style: Font, fontsize, bold, color, outline_color, outline and
+            optional outline_alpha / margin_v
+        fade_ms: Fade in and out per line, shortened for brief lines; a cut
+            edge gets no fade so the caption runs on across the join
+
+    Returns:
+        ASS script text
+    """
+    width, height = size
+    primary = ass_color(style["color"])
+    # Karaoke words are drawn dimmed until their sweep reaches them
+    secondary = ass_color(style["color"], alpha=0x80)
+    outline = ass_color(style["outline_color"], alpha=style.get("outline_alpha", 0))
+    bold = -1 if style.get("bold") else 0
+    margin_v = style.get("margin_v", 100)
+
+    lines = [
+        "[Script Info]",
+        "ScriptType: v4.00+",
+        f"PlayResX: {width}",
+        f"PlayResY: {height}",
+        "WrapStyle: 0",
+        "ScaledBorderAndShadow: yes",
+        "",
+        "[V4+ Styles]",
+        "Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, "
+        "Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, "
+        "Shadow, Alignment, MarginL, MarginR, MarginV, Encoding"
+    ]
+    for name, alignment in ALIGNMENTS.items():
+        lines.append(
+            f"Style: {name},{style['font']},{style['fontsize']},{primary},{secondary},{outline},&H00000000,"
+            f"{bold},0,0,0,100,100,0,0,1,{style['outline']},0,{alignment},40,40,{margin_v},1"
+        )
+
+    lines += ["", "[Events]", "Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text"]
+    for event in events:
+        span_start, span_end = event.get("span") or (event["start"], event["end"])
+        fade = int(min(fade_ms, (span_end - span_start) * 1000 / 4))
+        fade_in = fade if event["start"] <= span_start + 1e-3 else 0
+        fade_out = fade if event["end"] >= span_end - 1e-3 else 0
+        if event.get("karaoke"):
+            body = " ".join(
+                f"{{\\kf{max(1, int(round(seconds * 100)))}}}{escape_text(word)}"
+                for word, seconds in event["karaoke"]
+            )
+        else:
+            body = escape_text(event["text"])
+        lines.append(
+            f"Dialogue: 0,{ass_timestamp(event['start'])},{ass_timestamp(event['end'])},"
+            f"{event.get('position', 'bottom')},,0,0,0,,{{\\fad({fade_in},{fade_out})}}{body}"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def write_ass(path: str, events: List[Dict[str, Any]], size: Tuple[int, int], style: Dict[str, Any]) -> str:
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(build_ass(events, size, style))
+    return path
+
+
+@lru_cache(maxsize=None)
+def ass_supported(ffmpeg_binary: str = FFMPEG_BINARY) -> bool:
+    """Whether this ffmpeg was built with libass"""
+    if not shutil.which(ffmpeg_binary):
+        return False
+    try:
+        result = subprocess.run([ffmpeg_binary, "-hide_banner", "-filters"], capture_output=True, text=True, timeout=15)
+    except (OSError, subprocess.TimeoutExpired):
+        return False
+    return any(line.split()[1:2] == ["ass"] for line in result.stdout.splitlines())
+
+
+def load_font(name: str, size: int, bold: bool = False):
+    """Best-effort TrueType lookup by family name, falling back to PIL's default font"""
+    from PIL import ImageFont
+
+    candidates = [f"{name} Bold.ttf", f"{name}bd.ttf"] if bold else []
+    candidates += [f"{name}.ttf", "DejaVuSans-Bold.ttf" if bold else "DejaVuSans.ttf"]
+    for candidate in candidates:
+        try:
+            return ImageFont.truetype(candidate, size)
+        except OSError:
+            continue
+    try:
+        return ImageFont.load_default(size)
+    except TypeError:
+        return ImageFont.load_default()
+
+
+def caption_sprite(text: str, size: Tuple[int, int], style: Dict[str, Any],
+                   position: str = "bottom") -> Tuple[Any, Tuple[int, int]]:
+    """
+    Rasterize one caption line into a tight outlined RGBA sprite
+
+    Placement mirrors the ASS styles: horizontally centred, margin_v from the
+    bottom or top edge, or centred in the frame.
+
+    Returns:
+        Tuple of (RGBA PIL sprite, (x, y) placement within the frame)
+    """
+    from PIL import Image, ImageDraw
+
+    width, height = size
+    font = load_font(style["font"], style["fontsize"], style.get("bold", False))
+    stroke = style.get("outline", 0)
+    left, top, right, bottom = font.getbbox(text, stroke_width=stroke)
+    sprite = Image.new("RGBA", (max(1, right - left), max(1, bottom - top)), (0, 0, 0, 0))
+    ImageDraw.Draw(sprite).text(
+        (-left, -top), text, font=font,
+        fill=(*style["color"], 255),
+        stroke_width=stroke,
+        stroke_fill=(*style["outline_color"], 255 - style.get("outline_alpha", 0))
+    )
+
+    margin_v = style.get("margin_v", 100)
+    x = (width - sprite.width) // 2
+    if position == "center":
+        y = (height - sprite.height) // 2
+    elif position == "top":
+        y = margin_v
+    else:
+        y = height - sprite.height - margin_v
+    return sprite, (x, y)
+
+
+def burn_captions_moviepy(video_path: str, events: List[Dict[str, Any]], style: Dict[str, Any],
+                          output_path: str, profile: Dict[str, Any], fade: float = 0.3) -> None:
+    """
+    Composite caption sprites over the video with MoviePy
+
+    Used when ffmpeg has no libass; each line fades in and out as a whole, so
+    karaoke sweeps are not drawn.
+    """
+    import numpy as np
+    from moviepy.editor import VideoFileClip, ImageClip, CompositeVideoClip
+
+    video = VideoFileClip(video_path)
+    try:
+        layers = [video]
+        for event in events:
+            sprite, offset = caption_sprite(event["text"], video.size, style, event.get("position", "bottom"))
+            length = event["end"] - event["start"]
+            clip = (ImageClip(np.array(sprite), transparent=True)
+                    .set_start(event["start"])
+                    .set_duration(length)
+                    .set_position(offset))
+            edge = min(fade, length / 4)
+            if edge > 0:
+                clip = clip.crossfadein(edge).crossfadeout(edge)
+            layers.append(clip)
+
+        final = CompositeVideoClip(layers, size=video.size).set_audio(video.audio)
+        final.write_videofile(output_path, fps=video.fps, logger=None, **moviepy_write_args(profile))
+        final.close()
+    finally:
+        video.close()
+
+
+def burn_captions(video_path: str, caption_text: str, style: str = "modern",
+                  output_path: Optional[str] = None, profile: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Burn word-timed captions into a video in a single encode
+
+    Uses ffmpeg's libass filter when available and MoviePy sprite overlays
+    otherwise.
+
+    Args:
+        video_path: Source video
+        caption_text: Caption spread evenly over the video's duration
+        style: Caption style (modern, minimal, bold, creative)
+        output_path: Defaults to <video>_captioned.mp4
+        profile: Render profile for the encode
+
+    Returns:
+        Result dict with success, output_path or error
+    """
+    try:
+        info = probe_media(video_path)
+        video = info.get("video") or {}
+        size = (video.get("width") or 1080, video.get("height") or 1920)
+        style_config = CAPTION_STYLES.get(style, CAPTION_STYLES["modern"])
+        events = caption_events(caption_text, info["duration"], karaoke=style_config["karaoke"])
+        output_path = output_path or video_path.replace('.mp4', '_captioned.mp4')
+
+        if not ass_supported(FFMPEG_BINARY):
+            logger.info("ffmpeg has no libass; compositing captions with MoviePy")
+            burn_captions_moviepy(video_path, events, style_config, output_path, get_render_profile(profile))
+            return {
+                "success": True,
+                "output_path": output_path,
+                "caption_text": caption_text,
+                "style": style,
+                "engine": "moviepy"
+            }
+
+        with tempfile.TemporaryDirectory() as work_dir:
+            ass_path = write_ass(os.path.join(work_dir, "captions.ass"), events, size, style_config)
+            command = [
+                FFMPEG_BINARY, "-y", "-hide_banner", "-loglevel", "error",
+                "-i", video_path,
+                "-vf", f"ass={filter_path(ass_path)}",
+                *ffmpeg_encoder_args(get_render_profile(profile)),
+                "-c:a", "copy",
+                "-movflags", "+faststart",
+                output_path
+            ]
+            result = subprocess.run(command, capture_output=True, text=True)
+            if result.returncode != 0:
+                raise RuntimeError(f"ffmpeg exited with {result.returncode}: {result.stderr[-500:]}")
+
+        return {
+            "success": True,
+            "output_path": output_path,
+            "caption_text": caption_text,
+            "style": style,
+            "engine": "ass"
+        }
+
+    except Exception as e:
+        logger.error(f"Caption burn-in failed: {e}")
+        return {"success": False, "error": str(e)}
+
+
+def main():
+    if len(sys.argv) < 3:
+        print("Usage: python ass_captions.py <video_path> <caption_text> [style] [profile]")
+        return
+    style = sys.argv[3] if len(sys.argv) > 3 else "modern"
+    profile = sys.argv[4] if len(sys.argv) > 4 else None
+    print(json.dumps(burn_captions(sys.argv[1], sys.argv[2], style, profile=profile)))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+    main()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Audio DSP - In-memory speed, pitch and gain effects on PCM arrays
+Replaces ffmpeg filter round-trips and pydub speedup in the voice paths;
+everything runs on float32 NumPy arrays shaped (frames, channels)
+"""
+
+import wave
+import logging
+from typing import Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# WSOLA analysis parameters, in seconds
+FRAME_SECONDS = 0.03
+TOLERANCE_SECONDS = 0.008
+# Cross-correlation search runs on a decimated mono signal to stay cheap
+SEARCH_DECIMATION = 4
+
+
+def as_frames(samples: np.ndarray) -> np.ndarray:
+    """Normalize input to a float32 (frames, channels) array"""
+    samples = np.asarray(samples, dtype=np.float32)
+    if samples.ndim == 1:
+        samples = samples[:, None]
+    return samples
+
+
+def segment_to_array(segment) -> Tuple[np.ndarray, int]:
+    """Decode a pydub AudioSegment into float32 samples in [-1, 1]"""
+    raw = np.array(segment.get_array_of_samples(), dtype=np.float32)
+    scale = float(1 << (8 * segment.sample_width - 1))
+    samples = raw.reshape(-1, segment.channels) / scale
+    return samples, segment.frame_rate
+
+
+def array_to_segment(samples: np.ndarray, sample_rate: int, like):
+    """Wrap float32 samples back into an AudioSegment shaped like `like` (16-bit PCM)"""
+    pcm = to_pcm16(samples)
+    return like._spawn(pcm.tobytes(), overrides={
+        "frame_rate": sample_rate,
+        "sample_width": 2,
+        "channels": pcm.shape[1]
+    })
+
+
+def to_pcm16(samples: np.ndarray) -> np.ndarray:
+    samples = as_frames(samples)
+    return (np.clip(samples, -1.0, 1.0) * 32767.0).astype("<i2")
+
+
+def write_wav(path: str, samples: np.ndarray, sample_rate: int):
+    """Encode float32 samples as a 16-bit PCM WAV file"""
+    pcm = to_pcm16(samples)
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(pcm.shape[1])
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm.tobytes())
+
+
+def resample(samples: np.ndarray, src_rate: float, dst_rate: float) -> np.ndarray:
+    """Linear-interpolation resampling from src_rate to dst_rate"""
+    samples = as_frames(samples)
+    if src_rate == dst_rate or len(samples) < 2:
+        return samples
+
+    out_len = max(1, int(round(len(samples) * dst_rate / src_rate)))
+    positions = np.arange(out_len, dtype=np.float64) * (src_rate / dst_rate)
+    base = np.minimum(positions.astype(np.int64), len(samples) - 2)
+    frac = (positions - base).astype(np.float32)[:, None]
+    return samples[base] * (1.0 - frac) + samples[base + 1] * frac
+
+
+def time_stretch(samples: np.ndarray, rate: float, sample_rate: int) -> np.ndarray:
+    """
+    Change tempo without changing pitch using WSOLA
+
+    Args:
+        samples: Input audio, (frames,) or (frames, channels)
+        rate: Playback speed multiplier (>1 is faster, shorter)
+        sample_rate: Sample rate of the input
+
+    Returns:
+        float32 array of roughly len(samples) / rate frames
+    """
+    samples = as_frames(samples)
+    if rate <= 0:
+        raise ValueError(f"Invalid stretch rate: {rate}")
+    frame_len = int(sample_rate * FRAME_SECONDS) & ~1
+    if rate == 1.0 or len(samples) < 2 * frame_len:
+        return samples
+
+    hop_out = frame_len // 2
+    hop_in = hop_out * rate
+    tolerance = int(sample_rate * TOLERANCE_SECONDS)
+    out_len = int(len(samples) / rate)
+    frame_count = max(1, (out_len - frame_len) // hop_out + 1)
+
+    # Pad so every frame and search window stays in bounds
+    padded = np.pad(samples, ((tolerance, frame_len + tolerance + hop_out), (0, 0)))
+    mono = padded.mean(axis=1)[::SEARCH_DECIMATION]
+    dec_len = frame_len // SEARCH_DECIMATION
+    dec_tol = tolerance // SEARCH_DECIMATION
+
+    # Pick each analysis frame to best continue the previously chosen one
+    positions = np.empty(frame_count, dtype=np.int64)
+    positions[0] = tolerance
+    for k in range(1, frame_count):
+        nominal = tolerance + int(k * hop_in)
+        natural = (positions[k - 1] + hop_out) // SEARCH_DECIMATION
+        template = mono[natural:natural + dec_len]
+        start = nominal // SEARCH_DECIMATION - dec_tol
+        region = mono[start:start + dec_len + 2 * dec_tol]
+        if len(template) < dec_len or len(region) < dec_len + 2 * dec_tol:
+            positions[k] = nominal
+            continue
+        scores = np.correlate(region, template, mode="valid")
+        offset = int(np.argmax(scores)) - dec_tol
+        positions[k] = nominal + offset * SEARCH_DECIMATION
+
+    # Vectorized windowed overlap-add of all chosen frames
+    window = np.hanning(frame_len).astype(np.float32)
+    frame_index = positions[:, None] + np.arange(frame_len)
+    frames = padded[frame_index] * window[None, :, None]
+    out_index = (np.arange(frame_count) * hop_out)[:, None] + np.arange(frame_len)
+    total = frame_count * hop_out + frame_len
+    output = np.zeros((total, samples.shape[1]), dtype=np.float32)
+    norm = np.zeros(total, dtype=np.float32)
+    np.add.at(output, out_index.ravel(), frames.reshape(-1, samples.shape[1]))
+    np.add.at(norm, out_index.ravel(), np.tile(window, frame_count))
+    output /= np.maximum(norm, 1e-3)[:, None]
+    return output[:out_len]
+
+
+def pitch_shift(samples: np.ndarray, factor: float, sample_rate: int) -> np.ndarray:
+    """Raise or lower pitch by `factor` while keeping the duration"""
+    samples = as_frames(samples)
+    if factor == 1.0:
+        return samples
+    # Lengthen by the factor, then resample back down so playback pitch rises by it
+    stretched = time_stretch(samples, 1.0 / factor, sample_rate)
+    return resample(stretched, sample_rate * factor, sample_rate)
+
+
+def apply_gain(samples: np.ndarray, gain_db: float) -> np.ndarray:
+    """Scale samples by a gain in decibels"""
+    samples = as_frames(samples)
+    if gain_db == 0:
+        return samples
+    return samples * np.float32(10.0 ** (gain_db / 20.0))
+
+
+def change_speed_segment(segment, speed: float):
+    """Tempo-change a pydub AudioSegment in memory, keeping its pitch"""
+    if speed == 1.0:
+        return segment
+    samples, sample_rate = segment_to_array(segment)
+    return array_to_segment(time_stretch(samples, speed, sample_rate), sample_rate, segment)
@@ -21,6 +21,9 @@ try:
     from PIL import Image, ImageDraw, ImageFont
     import aiohttp
     import asyncio
+    from tts_cache import get_tts_cache
+    from render_profiles import get_render_profile, scaled_size, profile_fps, moviepy_write_args
+    from artifact_store import get_artifact_store, file_digest
 except ImportError as e:
     print(f"Missing required library: {e}")
     print("Run: pip install moviepy gtts pydub opencv-python pillow aiohttp numpy")
@@ -41,92 +44,125 @@ class ContentAutomation:
         
         for directory in [self.video_dir, self.audio_dir, self.image_dir, self.output_dir]:
             directory.mkdir(exist_ok=True)
+        
+        # Generated files are aged out by the artifact store's collector
+        self.store = get_artifact_store()
+        for directory in [self.audio_dir, self.output_dir]:
+            self.store.manage(str(directory))
     
     def generate_voice(self, text: str, language: str = 'en', output_name: str = None) -> str:
-        """Generate voice audio from text using gTTS"""
+        """Generate voice audio from text using gTTS (served from the shared TTS cache)"""
         try:
+            cache = get_tts_cache()
             if not output_name:
-                output_name = f"voice_{hash(text) % 10000}.mp3"
+                key = cache.make_key(text, language=language, voice="com", engine="gtts")
+                output_name = f"voice_{key[:16]}.mp3"
             
             output_path = self.audio_dir / output_name
             
-            # Generate TTS
-            tts = gTTS(text=text, lang=language, slow=False)
-            tts.save(str(output_path))
+            # Generate TTS only on a cache miss
+            cached_path = cache.fetch(
+                text,
+                lambda path: gTTS(text=text, lang=language, slow=False).save(path),
+                language=language,
+                voice="com",
+                engine="gtts"
+            )
             
-            return str(output_path)
+            return cache.materialize(cached_path, str(output_path))
         except Exception as e:
             print(f"Voice generation error: {e}")
             return None
     
-    def create_text_overlay(self, text: str, video_path: str, output_name: str = None) -> str:
-        """Add text overlay to video"""
+    def create_text_overlay(self, text: str, video_path: str, output_name: str = None,
+                            profile: str = None) -> str:
+        """Add text overlay to video, encoded with the named render profile (reused from the artifact store)"""
         try:
+            render_profile = get_render_profile(profile)
+            key = self.store.make_key(
+                "captioned", video=file_digest(video_path), text=text, profile=render_profile["name"]
+            )
             if not output_name:
-                output_name = f"captioned_{Path(video_path).stem}.mp4"
+                suffix = "" if render_profile["name"] == "standard" else f"_{render_profile['name']}"
+                output_name = f"captioned_{Path(video_path).stem}_{key[:12]}{suffix}.mp4"
             
             output_path = self.output_dir / output_name
             
-            # Load video
-            video = VideoFileClip(video_path)
-            
-            # Create text clip
-            txt_clip = TextClip(
-                text,
-                fontsize=30,
-                color='white',
-                font='Arial-Bold',
-                stroke_color='black',
-                stroke_width=2
-            ).set_position(('center', 'bottom')).set_duration(video.duration)
-            
-            # Composite video with text
-            final_video = CompositeVideoClip([video, txt_clip])
-            final_video.write_videofile(str(output_path), codec='libx264', audio_codec='aac')
-            
-            # Clean up
-            video.close()
-            final_video.close()
-            
-            return str(output_path)
+            def render(path: str):
+                # Load video
+                video = VideoFileClip(video_path)
+                if render_profile["scale"] != 1.0:
+                    video = video.resize(scaled_size(video.size, render_profile))
+                
+                # Create text clip
+                txt_clip = TextClip(
+                    text,
+                    fontsize=max(12, int(30 * render_profile["scale"])),
+                    color='white',
+                    font='Arial-Bold',
+                    stroke_color='black',
+                    stroke_width=2
+                ).set_position(('center', 'bottom')).set_duration(video.duration)
+                
+                # Composite video with text
+                final_video = CompositeVideoClip([video, txt_clip])
+                final_video.write_videofile(
+                    path,
+                    fps=profile_fps(render_profile, video.fps),
+                    **moviepy_write_args(render_profile)
+                )
+                
+                # Clean up
+                video.close()
+                final_video.close()
+            
+            return self.store.materialize(self.store.produce(key, render, ".mp4"), str(output_path))
         except Exception as e:
             print(f"Text overlay error: {e}")
             return None
     
     def create_reel_from_images(self, image_paths: List[str], audio_path: str = None, 
                                duration_per_image: float = 2.0, output_name: str = None) -> str:
-        """Create reel from multiple images with optional audio"""
+        """Create reel from multiple images with optional audio (reused from the artifact store)"""
         try:
+            has_audio = bool(audio_path and os.path.exists(audio_path))
+            key = self.store.make_key(
+                "image_reel",
+                images=[file_digest(path) for path in image_paths],
+                audio=file_digest(audio_path) if has_audio else None,
+                duration_per_image=duration_per_image
+            )
             if not output_name:
-                output_name = f"reel_{len(image_paths)}_images.mp4"
+                output_name = f"reel_{len(image_paths)}_images_{key[:12]}.mp4"
             
             output_path = self.output_dir / output_name
             
-            clips = []
-            for img_path in image_paths:
-                # Create video clip from image
-                clip = VideoFileClip(img_path).set_duration(duration_per_image)
-                clips.append(clip)
-            
-            # Concatenate all clips
-            final_video = concatenate_videoclips(clips, method="compose")
-            
-            # Add audio if provided
-            if audio_path and os.path.exists(audio_path):
-                audio = AudioFileClip(audio_path)
-                if audio.duration > final_video.duration:
-                    audio = audio.subclip(0, final_video.duration)
-                final_video = final_video.set_audio(audio)
-            
-            # Write final video
-            final_video.write_videofile(str(output_path), codec='libx264', audio_codec='aac')
-            
-            # Clean up
-            for clip in clips:
-                clip.close()
-            final_video.close()
-            
-            return str(output_path)
+            def render(path: str):
+                clips = []
+                for img_path in image_paths:
+                    # Create video clip from image
+                    clip = VideoFileClip(img_path).set_duration(duration_per_image)
+                    clips.append(clip)
+                
+                # Concatenate all clips
+                final_video = concatenate_videoclips(clips, method="compose")
+                
+                # Add audio if provided
+                if has_audio:
+                    audio = AudioFileClip(audio_path)
+                    if audio.duration > final_video.duration:
+                        audio = audio.subclip(0, final_video.duration)
+                    final_video = final_video.set_audio(audio)
+                
+                # Write final video
+                final_video.write_videofile(path, codec='libx264', audio_codec='aac')
+                
+                # Clean up
+                for clip in clips:
+                    clip.close()
+                final_video.close()
+            
+            return self.store.materialize(self.store.produce(key, render, ".mp4"), str(output_path))
         except Exception as e:
             print(f"Reel creation error: {e}")
             return None
@@ -153,7 +189,8 @@ class ContentAutomation:
         elif command_type == "add_caption":
             result = self.create_text_overlay(
                 text=command.get("text"),
-                video_path=command.get("video_path")
+                video_path=command.get("video_path"),
+                profile=command.get("profile")
             )
             return {"success": bool(result), "output_path": result}
         
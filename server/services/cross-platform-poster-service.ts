@@ -563,119 +563,13 @@ if __name__ == "__main__":
   }
 
   // Add animated subtitles to video content
+  // Captions become one timed ASS subtitle track (karaoke word sweep, fades)
+  // burned in by ffmpeg while the video is encoded once; without libass the
+  // same lines are composited as MoviePy text sprites
   async addAnimatedCaptions(videoPath: string, captionText: string, style: string = 'modern'): Promise<string> {
     return new Promise((resolve) => {
-      const pythonScript = `
-import cv2
-import numpy as np
-from moviepy.editor import VideoFileClip, TextClip, CompositeVideoClip
-import json
-import sys
-import os
-
-def add_animated_captions(video_path, caption_text, style='modern'):
-    try:
-        # Load video
-        video = VideoFileClip(video_path)
-        
-        # Split caption into words for word-by-word animation
-        words = caption_text.split()
-        duration_per_word = video.duration / len(words) if len(words) > 0 else 1
-        
-        # Style configurations
-        styles = {
-            'modern': {
-                'fontsize': 60,
-                'color': 'white',
-                'font': 'Arial-Bold',
-                'stroke_color': 'black',
-                'stroke_width': 3
-            },
-            'minimal': {
-                'fontsize': 45,
-                'color': 'white', 
-                'font': 'Arial',
-                'stroke_color': None,
-                'stroke_width': 0
-            },
-            'bold': {
-                'fontsize': 70,
-                'color': 'yellow',
-                'font': 'Arial-Bold',
-                'stroke_color': 'black',
-                'stroke_width': 4
-            },
-            'creative': {
-                'fontsize': 55,
-                'color': 'white',
-                'font': 'Comic Sans MS',
-                'stroke_color': 'purple',
-                'stroke_width': 2
-            }
-        }
-        
-        style_config = styles.get(style, styles['modern'])
-        
-        # Create animated text clips
-        text_clips = []
-        for i, word in enumerate(words):
-            start_time = i * duration_per_word
-            end_time = min((i + 3) * duration_per_word, video.duration)  # Show 3 words at a time
-            
-            # Create text clip with animation
-            text_clip = TextClip(
-                word,
-                fontsize=style_config['fontsize'],
-                color=style_config['color'],
-                font=style_config['font'],
-                stroke_color=style_config['stroke_color'],
-                stroke_width=style_config['stroke_width']
-            ).set_position(('center', 'bottom')).set_start(start_time).set_end(end_time)
-            
-            # Add fade in/out animation
-            text_clip = text_clip.crossfadein(0.3).crossfadeout(0.3)
-            
-            text_clips.append(text_clip)
-        
-        # Composite video with animated captions
-        final_video = CompositeVideoClip([video] + text_clips)
-        
-        # Generate output path
-        output_path = video_path.replace('.mp4', '_captioned.mp4')
-        
-        # Export with optimized settings
-        final_video.write_videofile(
-            output_path,
-            codec='libx264',
-            audio_codec='aac',
-            temp_audiofile='temp-audio.m4a',
-            remove_temp=True,
-            fps=30
-        )
-        
-        # Clean up
-        video.close()
-        final_video.close()
-        
-        print(json.dumps({
-            "success": True,
-            "output_path": output_path,
-            "caption_text": caption_text,
-            "style": style
-        }))
-        
-    except Exception as e:
-        print(json.dumps({"success": False, "error": str(e)}))
-
-if __name__ == "__main__":
-    add_animated_captions(
-        "${videoPath.replace(/"/g, '\\"')}", 
-        "${captionText.replace(/"/g, '\\"')}", 
-        "${style}"
-    )
-`;
-
-      const python = spawn('python3', ['-c', pythonScript]);
+      const scriptPath = path.join(process.cwd(), 'server', 'services', 'ass_captions.py');
+      const python = spawn('python3', [scriptPath, videoPath, captionText, style]);
       let output = '';
 
       python.stdout.on('data', (data) => {
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Image Enhance - Batch reel image preparation
+Crops and resizes media to the reel frame and applies the style filters,
+across a process pool, with outputs kept in the artifact store by source
+content and style
+"""
+
+import os
+import uuid
+import asyncio
+import logging
+import multiprocessing
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional, Tuple
+
+from PIL import Image, ImageEnhance, ImageFilter
+
+from artifact_store import ArtifactStore, get_artifact_store, file_digest
+
+logger = logging.getLogger(__name__)
+
+TARGET_SIZE = (1080, 1920)
+# Bump when the enhancement pipeline changes so stale cache entries are ignored
+PIPELINE_VERSION = 1
+
+
+def enhance_image_file(source_path: str, output_path: str, style: str = "modern",
+                       size: Tuple[int, int] = TARGET_SIZE) -> str:
+    """
+    Fit one image to the reel frame and apply style-specific filters
+
+    Runs in pool workers, so it only touches its arguments and the filesystem.
+    """
+    target_width, target_height = size
+    img = Image.open(source_path)
+
+    # Let the JPEG decoder downscale by 1/2, 1/4 or 1/8 while still covering the target
+    if img.format == "JPEG":
+        scale = max(target_width / img.width, target_height / img.height)
+        if scale < 0.5:
+            img.draft("RGB", (int(img.width * scale) + 1, int(img.height * scale) + 1))
+
+    # Resize to fit reel format (9:16)
+    img_ratio = img.width / img.height
+    target_ratio = target_width / target_height
+
+    if img_ratio > target_ratio:
+        # Image is wider, crop width
+        new_height = img.height
+        new_width = int(new_height * target_ratio)
+        left = (img.width - new_width) // 2
+        img = img.crop((left, 0, left + new_width, new_height))
+    else:
+        # Image is taller, crop height
+        new_width = img.width
+        new_height = int(new_width / target_ratio)
+        top = (img.height - new_height) // 2
+        img = img.crop((0, top, new_width, top + new_height))
+
+    # Cheap box reduction first when the crop is still far larger than the target
+    factor = min(img.width // target_width, img.height // target_height)
+    if factor >= 2:
+        img = img.reduce(factor)
+
+    # Resize to target dimensions
+    img = img.resize((target_width, target_height), Image.Resampling.LANCZOS)
+
+    # Apply style-specific enhancements
+    if style == "modern":
+        # Increase contrast and saturation
+        img = ImageEnhance.Contrast(img).enhance(1.2)
+        img = ImageEnhance.Color(img).enhance(1.1)
+    elif style == "tech":
+        # Add blue tint and increase sharpness
+        img = img.convert('RGB')
+        img = ImageEnhance.Color(img).enhance(0.8)  # Reduce saturation
+        img = ImageEnhance.Sharpness(img).enhance(1.3)
+    elif style == "educational":
+        # Soften and brighten
+        img = img.filter(ImageFilter.GaussianBlur(radius=0.5))
+        img = ImageEnhance.Brightness(img).enhance(1.1)
+
+    # Write under a private name and publish atomically; jobs may race on one entry
+    output = Path(output_path)
+    temp_path = output.with_name(f".{uuid.uuid4().hex}{output.suffix}")
+    try:
+        img.save(str(temp_path), format=Image.registered_extensions().get(output.suffix.lower()), quality=95)
+        os.replace(temp_path, output)
+    finally:
+        if temp_path.exists():
+            temp_path.unlink()
+    return str(output)
+
+
+class ImageEnhancer:
+    """Process-parallel front end to enhance_image_file, caching results in the artifact store"""
+
+    def __init__(self, store: Optional[ArtifactStore] = None, max_workers: Optional[int] = None):
+        self.store = store or get_artifact_store()
+        self.max_workers = max_workers or int(os.environ.get("MO_REEL_IMAGE_WORKERS", os.cpu_count() or 2))
+        self.executor: Optional[ProcessPoolExecutor] = None
+
+    def cache_key(self, source_path: str, style: str, size: Tuple[int, int] = TARGET_SIZE) -> str:
+        return self.store.make_key(
+            "enhanced_image", source=file_digest(source_path), style=style,
+            size=list(size), pipeline=PIPELINE_VERSION
+        )
+
+    @staticmethod
+    def output_ext(source_path: str) -> str:
+        return Path(source_path).suffix.lower() or ".png"
+
+    def get_executor(self) -> ProcessPoolExecutor:
+        if self.executor is None:
+            # Spawned workers avoid forking a process that is running threads and an event loop
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self.executor
+
+    def enhance(self, source_path: str, style: str = "modern",
+                size: Tuple[int, int] = TARGET_SIZE) -> str:
+        """Enhance one image in-process, reusing a stored result when present"""
+        return self.store.produce(
+            self.cache_key(source_path, style, size),
+            lambda path: enhance_image_file(source_path, path, style, size),
+            self.output_ext(source_path)
+        )
+
+    def submit_all(self, builds: Dict[str, Tuple[str, str]], style: str,
+                   size: Tuple[int, int]) -> List[asyncio.Future]:
+        loop = asyncio.get_running_loop()
+        executor = self.get_executor()
+        return [
+            loop.run_in_executor(executor, enhance_image_file, source, temp_path, style, size)
+            for source, temp_path in builds.values()
+        ]
+
+    async def enhance_many(self, source_paths: List[str], style: str = "modern",
+                           size: Tuple[int, int] = TARGET_SIZE) -> List[str]:
+        """
+        Enhance a batch of images in parallel
+
+        Returns enhanced paths in input order; duplicates and stored images
+        are not reprocessed. An image that cannot be enhanced is logged and
+        its original path is returned in its place.
+        """
+        keys = await asyncio.gather(*(
+            asyncio.to_thread(self.cache_key, path, style, size) for path in source_paths
+        ), return_exceptions=True)
+
+        objects: Dict[str, str] = {}
+        builds: Dict[str, Tuple[str, str]] = {}
+        for source, key in zip(source_paths, keys):
+            if isinstance(key, BaseException):
+                logger.error(f"Could not enhance {source}: {key}")
+            elif key not in objects and key not in builds:
+                stored = self.store.lookup(key)
+                if stored:
+                    objects[key] = stored
+                else:
+                    temp_path = self.store.objects_dir / f".build_{uuid.uuid4().hex}{self.output_ext(source)}"
+                    builds[key] = (source, str(temp_path))
+
+        try:
+            if len(builds) == 1:
+                source, temp_path = next(iter(builds.values()))
+                results = await asyncio.gather(
+                    asyncio.to_thread(enhance_image_file, source, temp_path, style, size),
+                    return_exceptions=True
+                )
+            elif builds:
+                try:
+                    futures = self.submit_all(builds, style, size)
+                except BrokenProcessPool:
+                    # A worker died in an earlier batch; start over with a fresh pool
+                    self.close()
+                    futures = self.submit_all(builds, style, size)
+                results = await asyncio.gather(*futures, return_exceptions=True)
+            else:
+                results = []
+
+            failed = 0
+            for (key, (source, temp_path)), result in zip(builds.items(), results):
+                if isinstance(result, BaseException):
+                    logger.error(f"Could not enhance {source}: {result}")
+                    failed += 1
+                    continue
+                objects[key] = await asyncio.to_thread(
+                    self.store.publish, temp_path, key, self.output_ext(source)
+                )
+        finally:
+            for _, temp_path in builds.values():
+                Path(temp_path).unlink(missing_ok=True)
+
+        if len(builds) > 1:
+            logger.info(f"Enhanced {len(builds) - failed} images "
+                        f"({len(source_paths) - len(builds)} cached, {failed} failed)")
+
+        return [
+            objects.get(key, source) if not isinstance(key, BaseException) else source
+            for source, key in zip(source_paths, keys)
+        ]
+
+    def close(self):
+        if self.executor:
+            self.executor.shutdown(wait=True)
+            self.executor = None
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Media Probe - Header-only media metadata with a persistent index
+Reads duration, frame rate, resolution, codecs and sample rate from
+container headers (stdlib for WAV, ffprobe otherwise, MoviePy's ffmpeg
+when ffprobe is missing) without decoding, and remembers the result
+keyed by path, size and modification time
+"""
+
+import os
+import json
+import time
+import wave
+import shutil
+import sqlite3
+import logging
+import threading
+import subprocess
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDEX_PATH = Path(os.environ.get("MO_MEDIA_INDEX", Path.home() / ".cache" / "mo_media" / "index.db"))
+FFPROBE_BINARY = os.environ.get("MO_FFPROBE_BINARY", "ffprobe")
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp')
+
+
+def parse_rate(rate: Optional[str]) -> Optional[float]:
+    """Turn ffprobe's "30000/1001" style rates into floats"""
+    if not rate or rate in ("0/0", "0"):
+        return None
+    if "/" in rate:
+        num, den = rate.split("/", 1)
+        return float(num) / float(den) if float(den) else None
+    return float(rate)
+
+
+def probe_wav(path: str) -> Dict[str, Any]:
+    with wave.open(path, "rb") as wav:
+        frames = wav.getnframes()
+        rate = wav.getframerate()
+        return {
+            "format": "wav",
+            "duration": frames / float(rate) if rate else 0.0,
+            "bit_rate": rate * wav.getnchannels() * wav.getsampwidth() * 8,
+            "video": None,
+            "audio": {"codec": "pcm", "sample_rate": rate, "channels": wav.getnchannels()}
+        }
+
+
+def probe_image(path: str) -> Dict[str, Any]:
+    from PIL import Image
+    with Image.open(path) as img:
+        return {
+            "format": (img.format or "").lower(),
+            "duration": 0.0,
+            "bit_rate": None,
+            "video": {"codec": (img.format or "").lower(), "width": img.width, "height": img.height, "fps": None},
+            "audio": None
+        }
+
+
+def probe_ffprobe(path: str) -> Dict[str, Any]:
+    result = subprocess.run(
+        [FFPROBE_BINARY, "-v", "error", "-print_format", "json", "-show_format", "-show_streams", path],
+        capture_output=True, text=True, timeout=30
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"ffprobe failed for {path}: {result.stderr.strip()[-300:]}")
+    data = json.loads(result.stdout or "{}")
+    fmt = data.get("format", {})
+
+    video = audio = None
+    for stream in data.get("streams", []):
+        if stream.get("codec_type") == "video" and video is None:
+            # Cover art in audio files is reported as a video stream
+            if stream.get("disposition", {}).get("attached_pic"):
+                continue
+            video = {
+                "codec": stream.get("codec_name"),
+                "width": stream.get("width"),
+                "height": stream.get("height"),
+                "fps": parse_rate(stream.get("avg_frame_rate")) or parse_rate(stream.get("r_frame_rate"))
+            }
+        elif stream.get("codec_type") == "audio" and audio is None:
+            audio = {
+                "codec": stream.get("codec_name"),
+                "sample_rate": int(stream["sample_rate"]) if stream.get("sample_rate") else None,
+                "channels": stream.get("channels")
+            }
+
+    return {
+        "format": fmt.get("format_name"),
+        "duration": float(fmt["duration"]) if fmt.get("duration") else 0.0,
+        "bit_rate": int(fmt["bit_rate"]) if fmt.get("bit_rate") else None,
+        "video": video,
+        "audio": audio
+    }
+
+
+def probe_moviepy(path: str) -> Dict[str, Any]:
+    """Header read through the ffmpeg binary bundled with MoviePy (imageio-ffmpeg)"""
+    from moviepy.video.io.ffmpeg_reader import ffmpeg_parse_infos
+
+    infos = ffmpeg_parse_infos(path)
+    video = audio = None
+    if infos.get("video_found"):
+        width, height = infos.get("video_size") or (None, None)
+        video = {"codec": infos.get("video_codec_name"), "width": width, "height": height,
+                 "fps": infos.get("video_fps")}
+    if infos.get("audio_found"):
+        audio = {"codec": None, "sample_rate": infos.get("audio_fps"), "channels": None}
+    return {
+        "format": None,
+        "duration": infos.get("duration") or 0.0,
+        "bit_rate": infos["bitrate"] * 1000 if infos.get("bitrate") else None,
+        "video": video,
+        "audio": audio
+    }
+
+
+def read_metadata(path: str) -> Dict[str, Any]:
+    """Probe a file directly, bypassing the index"""
+    lower = path.lower()
+    if lower.endswith(".wav"):
+        try:
+            return probe_wav(path)
+        except (wave.Error, EOFError):
+            # Compressed or extensible WAV; let ffprobe handle it
+            pass
+    if shutil.which(FFPROBE_BINARY):
+        return probe_ffprobe(path)
+    if lower.endswith(IMAGE_EXTENSIONS):
+        return probe_image(path)
+    try:
+        return probe_moviepy(path)
+    except ImportError:
+        raise RuntimeError(f"Cannot probe {path}: neither ffprobe nor MoviePy is available")
+
+
+class MediaIndex:
+    """SQLite index of probe results, invalidated when a file's size or mtime changes"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = Path(path) if path else DEFAULT_INDEX_PATH
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0}
+
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS media_index (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                metadata TEXT NOT NULL,
+                probed_at REAL NOT NULL
+            )
+        """)
+        self.conn.commit()
+
+    def probe(self, path: str) -> Dict[str, Any]:
+        """
+        Metadata for a media file, from the index when the file is unchanged
+
+        Returns a dict with path, size, format, duration (seconds), bit_rate,
+        video (codec, width, height, fps) and audio (codec, sample_rate,
+        channels); absent streams are None.
+        """
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT size, mtime_ns, metadata FROM media_index WHERE path = ?", (path,)
+            ).fetchone()
+        if row and row[0] == stat.st_size and row[1] == stat.st_mtime_ns:
+            with self.lock:
+                self.stats["hits"] += 1
+            return json.loads(row[2])
+
+        metadata = {"path": path, "size": stat.st_size, **read_metadata(path)}
+        with self.lock:
+            self.stats["misses"] += 1
+            self.conn.execute(
+                "INSERT OR REPLACE INTO media_index (path, size, mtime_ns, metadata, probed_at) VALUES (?, ?, ?, ?, ?)",
+                (path, stat.st_size, stat.st_mtime_ns, json.dumps(metadata), time.time())
+            )
+            self.conn.commit()
+        return metadata
+
+    def prune(self) -> int:
+        """Drop entries for files that no longer exist"""
+        with self.lock:
+            paths = [row[0] for row in self.conn.execute("SELECT path FROM media_index")]
+            missing = [(path,) for path in paths if not os.path.exists(path)]
+            self.conn.executemany("DELETE FROM media_index WHERE path = ?", missing)
+            self.conn.commit()
+        return len(missing)
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+_shared_index: Optional[MediaIndex] = None
+_shared_lock = threading.Lock()
+
+
+def get_media_index() -> MediaIndex:
+    """Process-wide index instance"""
+    global _shared_index
+    with _shared_lock:
+        if _shared_index is None:
+            _shared_index = MediaIndex()
+        return _shared_index
+
+
+def probe_media(path: str) -> Dict[str, Any]:
+    """Probe through the shared index"""
+    return get_media_index().probe(path)
+
+
+def media_duration(path: str) -> float:
+    """Duration in seconds, 0.0 if the file cannot be probed"""
+    try:
+        return probe_media(path)["duration"] or 0.0
+    except Exception as e:
+        logger.warning(f"Could not probe {path}: {e}")
+        return 0.0
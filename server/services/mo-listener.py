@@ -8,13 +8,24 @@ Phase 2 - Advanced Mobile Control System
 import os
 import json
 import time
+import base64
+import codecs
+import heapq
+import itertools
+import signal
 import asyncio
+import sqlite3
 import aiohttp
+from aiohttp import web
+import importlib.util
+import multiprocessing
+from collections import deque
 from pathlib import Path
-from typing import Dict, Any, List, Optional
-import subprocess
+from typing import Dict, Any, List, Optional, Tuple
 import logging
 
+from artifact_store import file_digest
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -22,14 +33,489 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+class TokenBucket:
+    """Token-bucket rate limiter: `rate` tokens per second, up to `burst` saved"""
+    
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+    
+    def refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+    
+    def try_take(self) -> bool:
+        self.refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+    
+    def time_until_available(self) -> float:
+        self.refill()
+        if self.tokens >= 1 or self.rate <= 0:
+            return 0.0 if self.tokens >= 1 else float("inf")
+        return (1 - self.tokens) / self.rate
+
+class ListenerMetrics:
+    """In-process counters and latency histograms with Prometheus/JSON export"""
+    
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300)
+    
+    HELP = {
+        "mo_listener_fetch_seconds": ("histogram", "Latency of command queue requests"),
+        "mo_listener_queue_wait_seconds": ("histogram", "Time from dispatch until a handler slot is free"),
+        "mo_listener_handler_seconds": ("histogram", "Handler runtime per command type"),
+        "mo_listener_result_send_seconds": ("histogram", "Latency of result upload requests"),
+        "mo_listener_commands_total": ("counter", "Commands processed by type and outcome"),
+        "mo_listener_results_sent_total": ("counter", "Results delivered to the server")
+    }
+    
+    def __init__(self):
+        self.started_at = time.time()
+        self.counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+        self.histograms: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], Dict[str, Any]] = {}
+    
+    def inc(self, name: str, amount: float = 1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        self.counters[key] = self.counters.get(key, 0) + amount
+    
+    def observe(self, name: str, value: float, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = {"buckets": [0] * len(self.BUCKETS), "count": 0, "sum": 0.0}
+            self.histograms[key] = histogram
+        for i, bound in enumerate(self.BUCKETS):
+            if value <= bound:
+                histogram["buckets"][i] += 1
+        histogram["count"] += 1
+        histogram["sum"] += value
+    
+    @staticmethod
+    def escape_label(value: Any) -> str:
+        """Escape a label value as the text exposition format requires"""
+        return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    
+    @classmethod
+    def format_labels(cls, labels: Tuple[Tuple[str, str], ...], extra: str = "") -> str:
+        parts = [f'{k}="{cls.escape_label(v)}"' for k, v in labels]
+        if extra:
+            parts.append(extra)
+        return "{" + ",".join(parts) + "}" if parts else ""
+    
+    def render_prometheus(self) -> str:
+        """Prometheus text exposition format"""
+        lines = []
+        for name, (metric_type, help_text) in self.HELP.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            if metric_type == "counter":
+                for (key_name, labels), value in self.counters.items():
+                    if key_name == name:
+                        lines.append(f"{name}{self.format_labels(labels)} {value}")
+            else:
+                for (key_name, labels), histogram in self.histograms.items():
+                    if key_name != name:
+                        continue
+                    for bound, count in zip(self.BUCKETS, histogram["buckets"]):
+                        bucket_labels = self.format_labels(labels, 'le="%s"' % bound)
+                        lines.append(f"{name}_bucket{bucket_labels} {count}")
+                    bucket_labels = self.format_labels(labels, 'le="+Inf"')
+                    lines.append(f"{name}_bucket{bucket_labels} {histogram['count']}")
+                    lines.append(f"{name}_sum{self.format_labels(labels)} {histogram['sum']}")
+                    lines.append(f"{name}_count{self.format_labels(labels)} {histogram['count']}")
+        return "\n".join(lines) + "\n"
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON-friendly view of all metrics"""
+        return {
+            "timestamp": time.time(),
+            "uptime": time.time() - self.started_at,
+            "counters": [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in self.counters.items()
+            ],
+            "histograms": [
+                {
+                    "name": name,
+                    "labels": dict(labels),
+                    "count": histogram["count"],
+                    "sum": histogram["sum"],
+                    "avg": histogram["sum"] / histogram["count"] if histogram["count"] else 0.0,
+                    "buckets": dict(zip([str(b) for b in self.BUCKETS], histogram["buckets"]))
+                }
+                for (name, labels), histogram in self.histograms.items()
+            ]
+        }
+    
+    def write_snapshot(self, path: str):
+        """Atomically replace the snapshot file"""
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w') as f:
+            json.dump(self.snapshot(), f, indent=2)
+        os.replace(temp_path, path)
+
+class CommandJournal:
+    """Append-only SQLite journal of command lifecycle events
+    
+    Every command moves through fetched -> started -> finished -> reported.
+    Events are buffered in memory and committed in groups, so journaling a
+    command costs a list append on the hot path.
+    """
+    
+    STATES = ("fetched", "started", "finished", "reported")
+    
+    def __init__(self, path: str, commit_interval: float = 0.2, batch_size: int = 50):
+        self.path = Path(path)
+        self.commit_interval = commit_interval
+        self.batch_size = batch_size
+        self.pending: List[Tuple[str, str, Optional[str], float]] = []
+        # Latest state of commands still in flight; reported ones are evicted
+        self.states: Dict[str, str] = {}
+        self.committer: Optional[asyncio.Task] = None
+        
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS command_events (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                command_id TEXT NOT NULL,
+                state TEXT NOT NULL,
+                data TEXT,
+                ts REAL NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_command_events_id ON command_events (command_id)")
+        self.conn.commit()
+    
+    def record(self, command_id: str, state: str, data: Optional[Dict[str, Any]] = None):
+        """Append a lifecycle event; it is committed with the next group"""
+        if state == "reported":
+            # Done for good; its rows answer is_known until they are pruned
+            self.states.pop(command_id, None)
+        else:
+            self.states[command_id] = state
+        self.pending.append((command_id, state, json.dumps(data) if data is not None else None, time.time()))
+        if len(self.pending) >= self.batch_size:
+            self.commit()
+    
+    def commit(self):
+        """Write all buffered events in a single transaction"""
+        if not self.pending:
+            return
+        events, self.pending = self.pending, []
+        try:
+            with self.conn:
+                self.conn.executemany(
+                    "INSERT INTO command_events (command_id, state, data, ts) VALUES (?, ?, ?, ?)",
+                    events
+                )
+        except sqlite3.Error as e:
+            logger.error(f"Journal commit error: {e}")
+            self.pending = events + self.pending
+    
+    async def commit_loop(self):
+        """Periodically commit buffered events"""
+        while True:
+            await asyncio.sleep(self.commit_interval)
+            self.commit()
+    
+    def start(self):
+        if self.committer is None or self.committer.done():
+            self.committer = asyncio.create_task(self.commit_loop())
+    
+    def is_known(self, command_id: str) -> bool:
+        """True if the command has been journaled before (deduplicates re-fetches)"""
+        if command_id in self.states:
+            return True
+        if any(event[0] == command_id for event in self.pending):
+            return True
+        row = self.conn.execute(
+            "SELECT 1 FROM command_events WHERE command_id = ? LIMIT 1", (command_id,)
+        ).fetchone()
+        return row is not None
+    
+    def unreported(self) -> Dict[str, Dict[str, Any]]:
+        """Latest state and payloads for every command whose result was never reported"""
+        self.commit()
+        rows = self.conn.execute("""
+            SELECT command_id, state, data FROM command_events
+            WHERE command_id IN (
+                SELECT command_id FROM command_events
+                GROUP BY command_id
+                HAVING SUM(state = 'reported') = 0
+            )
+            ORDER BY seq
+        """).fetchall()
+        
+        commands: Dict[str, Dict[str, Any]] = {}
+        for command_id, state, data in rows:
+            entry = commands.setdefault(command_id, {"state": state, "command": None, "result": None})
+            entry["state"] = state
+            if state == "fetched" and data:
+                entry["command"] = json.loads(data)
+            elif state == "finished" and data:
+                entry["result"] = json.loads(data)
+        return commands
+    
+    def prune(self, retention_days: float):
+        """Drop events of reported commands older than the retention window"""
+        cutoff = time.time() - retention_days * 86400
+        with self.conn:
+            self.conn.execute("""
+                DELETE FROM command_events WHERE command_id IN (
+                    SELECT command_id FROM command_events
+                    WHERE state = 'reported' AND ts < ?
+                )
+            """, (cutoff,))
+    
+    async def close(self):
+        if self.committer is not None:
+            self.committer.cancel()
+            await asyncio.gather(self.committer, return_exceptions=True)
+        self.commit()
+        self.conn.close()
+
+def automation_worker_main(conn, module_path: str):
+    """Worker process: import ContentAutomation once, then serve jobs until told to stop"""
+    try:
+        spec = importlib.util.spec_from_file_location("content_automation", module_path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        automation = module.ContentAutomation()
+    except BaseException as e:
+        # content-automation.py exits on missing libraries; report instead of dying silently
+        conn.send({"ready": False, "error": f"Failed to load content automation: {e}"})
+        return
+    
+    conn.send({"ready": True})
+    while True:
+        try:
+            params = conn.recv()
+        except EOFError:
+            break
+        if params is None:
+            break
+        try:
+            result = automation.process_command(params)
+        except Exception as e:
+            result = {"success": False, "error": str(e)}
+        conn.send(result)
+
+class AutomationWorker:
+    """Handle to one pre-imported ContentAutomation worker process"""
+    
+    def __init__(self, context, module_path: str):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=automation_worker_main,
+            args=(child_conn, module_path),
+            daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.jobs_done = 0
+    
+    def receive(self, timeout: float) -> Dict[str, Any]:
+        """Blocking receive with timeout; meant to run in a thread"""
+        if not self.conn.poll(timeout):
+            raise TimeoutError
+        return self.conn.recv()
+    
+    def stop(self, timeout: float = 5):
+        try:
+            self.conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(1)
+        self.conn.close()
+
+class AutomationWorkerPool:
+    """Persistent pool of warm ContentAutomation workers
+    
+    Heavy MoviePy/cv2 imports happen once per worker instead of once per job,
+    and rendering runs outside the listener's event loop. Workers are recycled
+    after max_jobs_per_worker jobs, and a worker that exceeds the job timeout is
+    killed and replaced.
+    """
+    
+    def __init__(self, module_path: str, size: int = 1, max_jobs_per_worker: int = 20,
+                 job_timeout: float = 600, startup_timeout: float = 120):
+        self.module_path = module_path
+        self.size = max(1, size)
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.job_timeout = job_timeout
+        self.startup_timeout = startup_timeout
+        self.context = multiprocessing.get_context("spawn")
+        self.idle: Optional[asyncio.Queue] = None
+        self.workers: List[AutomationWorker] = []
+        self.background: set = set()
+        self.started = False
+        self.last_error: Optional[str] = None
+    
+    async def start(self):
+        """Spawn and warm up all workers"""
+        if self.started:
+            return
+        self.started = True
+        self.idle = asyncio.Queue()
+        await asyncio.gather(*(self.add_worker() for _ in range(self.size)))
+    
+    async def add_worker(self):
+        """Start a worker and make it available once its imports have finished"""
+        try:
+            worker = AutomationWorker(self.context, self.module_path)
+        except Exception as e:
+            # e.g. spawn cannot pickle the entry point when this module was loaded by path
+            self.last_error = f"Worker failed to spawn: {e}"
+            logger.error(f"Automation worker unavailable: {self.last_error}")
+            # Keep the slot so waiting jobs fail fast rather than hang
+            await self.idle.put(None)
+            return
+        
+        self.workers.append(worker)
+        try:
+            handshake = await asyncio.to_thread(worker.receive, self.startup_timeout)
+        except (TimeoutError, EOFError):
+            handshake = {"ready": False, "error": "Worker failed to start"}
+        
+        if not handshake.get("ready"):
+            self.last_error = handshake.get("error")
+            logger.error(f"Automation worker unavailable: {self.last_error}")
+            self.workers.remove(worker)
+            await asyncio.to_thread(worker.stop, 0)
+            await self.idle.put(None)
+            return
+        self.last_error = None
+        await self.idle.put(worker)
+    
+    async def replace_worker(self, worker: Optional[AutomationWorker], graceful: bool = True):
+        """Stop a worker (if any) and start a fresh one in its slot"""
+        if worker is not None:
+            if worker in self.workers:
+                self.workers.remove(worker)
+            await asyncio.to_thread(worker.stop, 5 if graceful else 0)
+        if self.started:
+            await self.add_worker()
+    
+    def schedule_replacement(self, worker: Optional[AutomationWorker], graceful: bool = True):
+        task = asyncio.create_task(self.replace_worker(worker, graceful))
+        self.background.add(task)
+        task.add_done_callback(self.background.discard)
+    
+    async def submit(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Run one job on the next idle worker"""
+        await self.start()
+        worker = await self.idle.get()
+        
+        if worker is None:
+            # A previous start-up failed; retry so a fixed install recovers
+            self.schedule_replacement(None)
+            error = "Content automation worker unavailable"
+            if self.last_error:
+                error += f": {self.last_error}"
+            return {"success": False, "error": error}
+        
+        try:
+            worker.conn.send(params)
+            result = await asyncio.to_thread(worker.receive, self.job_timeout)
+        except TimeoutError:
+            logger.warning("Automation job timed out, replacing worker")
+            self.schedule_replacement(worker, graceful=False)
+            return {"success": False, "error": "Automation job timeout"}
+        except (EOFError, OSError) as e:
+            logger.error(f"Automation worker crashed: {e}")
+            self.schedule_replacement(worker, graceful=False)
+            return {"success": False, "error": "Automation worker crashed"}
+        
+        worker.jobs_done += 1
+        if worker.jobs_done >= self.max_jobs_per_worker:
+            # Recycle to contain leaks from long-lived MoviePy state
+            self.schedule_replacement(worker)
+        else:
+            await self.idle.put(worker)
+        return result
+    
+    async def close(self):
+        self.started = False
+        for task in list(self.background):
+            task.cancel()
+        await asyncio.gather(*self.background, return_exceptions=True)
+        await asyncio.gather(*(asyncio.to_thread(worker.stop) for worker in self.workers))
+        self.workers.clear()
+
 class MoListener:
     """Main listener service for MO app commands"""
     
     def __init__(self, config_file: str = "mo_config.json"):
         self.config_file = Path(config_file)
         self.config = self.load_config()
-        self.command_queue = []
         self.is_running = False
+        self.session: Optional[aiohttp.ClientSession] = None
+        
+        # Concurrent dispatch state
+        self.active_counts: Dict[str, int] = {}
+        self.in_flight: Dict[str, asyncio.Task] = {}
+        
+        # Priority backlog and rate limiting
+        self.backlog: List[Tuple[int, int, float, Dict[str, Any]]] = []
+        self.backlog_ids: set = set()
+        self.backlog_seq = itertools.count()
+        self.rate_limiters: Dict[str, Optional[TokenBucket]] = {}
+        self.schedule_event = asyncio.Event()
+        self.scheduler: Optional[asyncio.Task] = None
+        
+        # Push delivery and adaptive polling state
+        self.current_poll_interval = self.config.get("polling_interval", 2)
+        self.push_failures = 0
+        self.push_retry_at = 0.0
+        self.long_poll_early = False
+        self.long_poll_empty_streak = 0
+        self.stream_reconnect_delay = 1.0
+        
+        # Batched result upload state
+        self.result_buffer: deque = deque()
+        # Commands whose result is buffered or being retried, not yet delivered
+        self.unreported_ids: set = set()
+        self.result_ready = asyncio.Event()
+        self.result_flusher: Optional[asyncio.Task] = None
+        self.batch_results_supported = True
+        self.dropped_results = 0
+        self.output_streaming_supported = True
+        
+        # Instrumentation
+        self.metrics = ListenerMetrics()
+        self.metrics_runner: Optional[web.AppRunner] = None
+        self.metrics_writer: Optional[asyncio.Task] = None
+        
+        # Warm content automation workers
+        self.prewarm_task: Optional[asyncio.Task] = None
+        self.automation_pool = AutomationWorkerPool(
+            self.config.get(
+                "content_automation_path",
+                str(Path(__file__).resolve().parent / "content-automation.py")
+            ),
+            size=self.config.get("automation_pool_size", 1),
+            max_jobs_per_worker=self.config.get("automation_max_jobs_per_worker", 20),
+            job_timeout=self.config.get("automation_job_timeout", 600)
+        )
+        
+        # Durable command journal
+        self.journal: Optional[CommandJournal] = None
+        if self.config.get("journal_enabled", True):
+            self.journal = CommandJournal(
+                self.config.get("journal_path", "mo_journal.db"),
+                commit_interval=self.config.get("journal_commit_interval", 0.2),
+                batch_size=self.config.get("journal_batch_size", 50)
+            )
         
         # API endpoints
         self.replit_api = self.config.get("replit_api", "http://localhost:5000")
@@ -46,14 +532,7 @@ class MoListener:
         }
     
     def load_config(self) -> Dict[str, Any]:
-        """Load configuration from JSON file"""
-        if self.config_file.exists():
-            try:
-                with open(self.config_file, 'r') as f:
-                    return json.load(f)
-            except Exception as e:
-                logger.error(f"Config load error: {e}")
-        
+        """Load configuration from JSON file, filling in defaults for missing keys"""
         # Default configuration
         default_config = {
             "replit_api": "http://localhost:5000",
@@ -61,6 +540,70 @@ class MoListener:
             "polling_interval": 2,
             "max_retries": 3,
             "log_commands": True,
+            "http_pool_limit": 10,
+            "http_pool_limit_per_host": 4,
+            "http_keepalive_timeout": 60,
+            "http_dns_cache_ttl": 300,
+            "http_connect_timeout": 10,
+            "http_request_timeout": 30,
+            "default_concurrency": 4,
+            "concurrency_limits": {
+                "termux_command": 4,
+                "app_control": 1,
+                "file_operation": 8,
+                "social_action": 2,
+                "voice_command": 1,
+                "automation_task": 1
+            },
+            "shutdown_grace_period": 30,
+            "command_priorities": {
+                "termux_command": 0,
+                "app_control": 1,
+                "file_operation": 1,
+                "voice_command": 2,
+                "automation_task": 3,
+                "social_action": 4
+            },
+            "default_priority": 2,
+            "rate_limits": {
+                "social_action": {"rate": 0.5, "burst": 5}
+            },
+            "backlog_limit": 200,
+            "delivery_mode": "sse",
+            "stream_idle_timeout": 60,
+            "long_poll_timeout": 25,
+            "long_poll_early_empty_limit": 3,
+            "push_retry_interval": 5,
+            "max_push_retry_interval": 120,
+            "max_polling_interval": 30,
+            "poll_backoff_factor": 1.5,
+            "result_batch_size": 20,
+            "result_linger": 0.25,
+            "result_buffer_limit": 1000,
+            "result_retry_backoff": 1,
+            "command_timeout": 30,
+            "app_control_timeout": 15,
+            "stream_output": True,
+            "output_chunk_size": 4096,
+            "output_flush_interval": 0.5,
+            "max_output_bytes": 1048576,
+            "result_output_limit": 65536,
+            "journal_enabled": True,
+            "journal_path": "mo_journal.db",
+            "journal_commit_interval": 0.2,
+            "journal_batch_size": 50,
+            "journal_retention_days": 7,
+            "file_max_read_bytes": 4194304,
+            "file_hash_block_size": 1048576,
+            "automation_pool_size": 1,
+            "automation_prewarm": True,
+            "automation_job_timeout": 600,
+            "automation_max_jobs_per_worker": 20,
+            "metrics_enabled": True,
+            "metrics_host": "127.0.0.1",
+            "metrics_port": 9464,
+            "metrics_snapshot_path": "",
+            "metrics_snapshot_interval": 60,
             "allowed_commands": [
                 "termux_command",
                 "app_control",
@@ -69,6 +612,13 @@ class MoListener:
             ]
         }
         
+        if self.config_file.exists():
+            try:
+                with open(self.config_file, 'r') as f:
+                    return {**default_config, **json.load(f)}
+            except Exception as e:
+                logger.error(f"Config load error: {e}")
+        
         self.save_config(default_config)
         return default_config
     
@@ -80,22 +630,353 @@ class MoListener:
         except Exception as e:
             logger.error(f"Config save error: {e}")
     
+    async def get_session(self) -> aiohttp.ClientSession:
+        """Return the shared pooled HTTP session, creating it on first use"""
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.config.get("http_pool_limit", 10),
+                limit_per_host=self.config.get("http_pool_limit_per_host", 4),
+                keepalive_timeout=self.config.get("http_keepalive_timeout", 60),
+                ttl_dns_cache=self.config.get("http_dns_cache_ttl", 300),
+                use_dns_cache=True
+            )
+            timeout = aiohttp.ClientTimeout(
+                total=self.config.get("http_request_timeout", 30),
+                connect=self.config.get("http_connect_timeout", 10)
+            )
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=timeout,
+                headers={"Authorization": f"Bearer {self.auth_token}"}
+            )
+        return self.session
+    
+    async def close(self):
+        """Close the shared HTTP session and release pooled connections"""
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+            # Give the connector a moment to close underlying transports
+            await asyncio.sleep(0.25)
+        self.session = None
+    
     async def fetch_commands(self) -> List[Dict[str, Any]]:
         """Fetch pending commands from Replit API"""
+        started = time.monotonic()
         try:
-            async with aiohttp.ClientSession() as session:
-                headers = {"Authorization": f"Bearer {self.auth_token}"}
-                async with session.get(f"{self.replit_api}/api/command-queue", headers=headers) as response:
-                    if response.status == 200:
-                        commands = await response.json()
-                        return commands
-                    else:
-                        logger.warning(f"API fetch failed: {response.status}")
-                        return []
+            session = await self.get_session()
+            async with session.get(f"{self.replit_api}/api/command-queue") as response:
+                if response.status == 200:
+                    commands = await response.json()
+                    self.metrics.observe("mo_listener_fetch_seconds", time.monotonic() - started, mode="poll")
+                    return commands
+                else:
+                    logger.warning(f"API fetch failed: {response.status}")
+                    return []
         except Exception as e:
             logger.error(f"Command fetch error: {e}")
             return []
     
+    async def long_poll_commands(self) -> Optional[List[Dict[str, Any]]]:
+        """Hold a queue request open until commands arrive; None if unsupported or failed"""
+        wait = self.config.get("long_poll_timeout", 25)
+        timeout = aiohttp.ClientTimeout(
+            total=wait + self.config.get("http_request_timeout", 30),
+            connect=self.config.get("http_connect_timeout", 10)
+        )
+        started = time.monotonic()
+        try:
+            session = await self.get_session()
+            async with session.get(
+                f"{self.replit_api}/api/command-queue",
+                params={"wait": str(wait)},
+                timeout=timeout
+            ) as response:
+                if response.status != 200:
+                    logger.warning(f"Long-poll failed: {response.status}")
+                    return None
+                commands = await response.json()
+        except Exception as e:
+            logger.error(f"Long-poll error: {e}")
+            return None
+        
+        # A server that ignores `wait` answers immediately, with nothing queued
+        # or with commands that are still in flight. One early empty reply can be
+        # a command that was taken by another consumer; only a run of them means
+        # the server does not hold requests.
+        self.long_poll_early = time.monotonic() - started < min(1.0, wait)
+        if commands or not self.long_poll_early:
+            self.long_poll_empty_streak = 0
+            return commands
+        self.long_poll_empty_streak += 1
+        if self.long_poll_empty_streak >= self.config.get("long_poll_early_empty_limit", 3):
+            logger.warning("Long-poll keeps returning immediately; server does not hold requests")
+            self.long_poll_empty_streak = 0
+            return None
+        return commands
+    
+    def handle_stream_event(self, data: str):
+        """Dispatch the command(s) carried by one server-sent event"""
+        try:
+            payload = json.loads(data)
+        except json.JSONDecodeError:
+            logger.warning(f"Ignoring malformed stream event: {data[:100]}")
+            return
+        
+        commands = payload if isinstance(payload, list) else [payload]
+        for command in commands:
+            if isinstance(command, dict):
+                self.dispatch_command(command)
+    
+    async def stream_commands(self) -> bool:
+        """Consume commands pushed over Server-Sent Events until the stream drops
+        
+        Returns True if the stream was established, False if it could not connect.
+        """
+        timeout = aiohttp.ClientTimeout(
+            total=None,
+            connect=self.config.get("http_connect_timeout", 10),
+            sock_read=self.config.get("stream_idle_timeout", 60)
+        )
+        connected = False
+        try:
+            session = await self.get_session()
+            async with session.get(
+                f"{self.replit_api}/api/command-stream",
+                headers={"Accept": "text/event-stream"},
+                timeout=timeout
+            ) as response:
+                content_type = response.headers.get("Content-Type", "")
+                if response.status != 200 or not content_type.startswith("text/event-stream"):
+                    logger.warning(f"Command stream unavailable: {response.status}")
+                    return False
+                
+                logger.info("Command stream connected")
+                connected = True
+                self.push_failures = 0
+                data_lines: List[str] = []
+                
+                async for raw_line in response.content:
+                    if not self.is_running:
+                        break
+                    line = raw_line.decode("utf-8").rstrip("\r\n")
+                    
+                    # A blank line terminates the current event
+                    if not line:
+                        if data_lines:
+                            self.handle_stream_event("\n".join(data_lines))
+                            data_lines = []
+                        continue
+                    
+                    # Lines starting with ':' are keep-alive comments
+                    if line.startswith(":"):
+                        continue
+                    
+                    field, _, value = line.partition(":")
+                    value = value[1:] if value.startswith(" ") else value
+                    if field == "data":
+                        data_lines.append(value)
+                    elif field == "retry" and value.isdigit():
+                        self.stream_reconnect_delay = int(value) / 1000
+                
+                logger.warning("Command stream closed by server")
+        
+        except asyncio.TimeoutError:
+            logger.warning("Command stream idle timeout")
+        except Exception as e:
+            logger.error(f"Command stream error: {e}")
+        
+        if connected and self.is_running:
+            # Reconnect after the delay requested by the server
+            await asyncio.sleep(self.stream_reconnect_delay)
+        return connected
+    
+    async def receive_pushed_commands(self) -> bool:
+        """Run one push-delivery attempt; False means fall back to polling for a while"""
+        mode = self.config.get("delivery_mode", "sse")
+        
+        if mode == "sse":
+            connected = await self.stream_commands()
+        else:
+            commands = await self.long_poll_commands()
+            connected = commands is not None
+            fresh = any(not self.is_pending(command.get("id", "")) for command in commands or [])
+            for command in commands or []:
+                self.dispatch_command(command)
+            if connected and commands and not fresh and self.long_poll_early:
+                # Only commands we already hold, answered at once; pace the next
+                # request like a poll instead of spinning on them
+                await asyncio.sleep(self.next_poll_delay(False))
+        
+        if connected:
+            return True
+        
+        # Back off reconnect attempts exponentially while push is unavailable
+        self.push_failures += 1
+        retry = min(
+            self.config.get("push_retry_interval", 5) * (2 ** (self.push_failures - 1)),
+            self.config.get("max_push_retry_interval", 120)
+        )
+        self.push_retry_at = time.monotonic() + retry
+        logger.info(f"Push delivery unavailable, polling for {retry:.0f}s")
+        return False
+    
+    def next_poll_delay(self, received_commands: bool) -> float:
+        """Adaptive polling interval: reset on activity, back off while idle"""
+        base = self.config.get("polling_interval", 2)
+        if received_commands:
+            self.current_poll_interval = base
+        else:
+            self.current_poll_interval = min(
+                self.current_poll_interval * self.config.get("poll_backoff_factor", 1.5),
+                self.config.get("max_polling_interval", 30)
+            )
+        return self.current_poll_interval
+    
+    async def send_output_chunk(self, command_id: str, stream: str, seq: int, data: str) -> bool:
+        """Stream a chunk of subprocess output to Replit API; False stops streaming"""
+        if not self.output_streaming_supported:
+            return False
+        try:
+            session = await self.get_session()
+            payload = {
+                "command_id": command_id,
+                "stream": stream,
+                "seq": seq,
+                "data": data,
+                "timestamp": time.time()
+            }
+            async with session.post(f"{self.replit_api}/api/command-output", json=payload) as response:
+                if response.status in (404, 405):
+                    logger.info("Output streaming endpoint unavailable, returning output with result only")
+                    self.output_streaming_supported = False
+                    return False
+                if response.status != 200:
+                    logger.warning(f"Output chunk send failed: {response.status}")
+                    return False
+                return True
+        except Exception as e:
+            logger.error(f"Output chunk send error: {e}")
+            return False
+    
+    def kill_process_group(self, process: asyncio.subprocess.Process):
+        """Kill a shell command together with any children it spawned"""
+        if process.returncode is not None:
+            return
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError, AttributeError):
+            try:
+                process.kill()
+            except ProcessLookupError:
+                pass
+    
+    async def run_subprocess(self, cmd: str, command_id: str = "", timeout: float = 30) -> Dict[str, Any]:
+        """Run a shell command without blocking the event loop
+        
+        Output is streamed to the server in chunks while the command runs. Only the
+        first result_output_limit characters of each stream are kept for the final
+        result, and the command is killed once max_output_bytes have been produced.
+        """
+        chunk_size = self.config.get("output_chunk_size", 4096)
+        flush_interval = self.config.get("output_flush_interval", 0.5)
+        max_output = self.config.get("max_output_bytes", 1048576)
+        result_limit = self.config.get("result_output_limit", 65536)
+        state = {
+            "streaming": self.config.get("stream_output", True) and bool(command_id),
+            "seq": 0,
+            "total": 0,
+            "truncated": False
+        }
+        captured = {"stdout": [], "stderr": []}
+        
+        process = await asyncio.create_subprocess_shell(
+            cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            start_new_session=True
+        )
+        
+        async def flush(name: str, text: str):
+            if state["streaming"] and text:
+                seq = state["seq"]
+                state["seq"] += 1
+                state["streaming"] = await self.send_output_chunk(command_id, name, seq, text)
+        
+        async def pump(reader: asyncio.StreamReader, name: str):
+            decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+            kept = 0
+            pending = ""
+            last_flush = time.monotonic()
+            
+            while True:
+                try:
+                    data = await asyncio.wait_for(reader.read(chunk_size), timeout=flush_interval)
+                except asyncio.TimeoutError:
+                    # Quiet period: push out whatever has accumulated
+                    await flush(name, pending)
+                    pending = ""
+                    last_flush = time.monotonic()
+                    continue
+                
+                if not data:
+                    break
+                if state["truncated"]:
+                    # Discard output after the cap until the killed process closes its pipes
+                    continue
+                
+                state["total"] += len(data)
+                text = decoder.decode(data)
+                if kept < result_limit:
+                    piece = text[:result_limit - kept]
+                    captured[name].append(piece)
+                    kept += len(piece)
+                
+                pending += text
+                if len(pending) >= chunk_size or time.monotonic() - last_flush >= flush_interval:
+                    await flush(name, pending)
+                    pending = ""
+                    last_flush = time.monotonic()
+                
+                if state["total"] > max_output:
+                    state["truncated"] = True
+                    self.kill_process_group(process)
+            
+            await flush(name, pending + decoder.decode(b"", final=True))
+        
+        timed_out = False
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(
+                    pump(process.stdout, "stdout"),
+                    pump(process.stderr, "stderr"),
+                    process.wait()
+                ),
+                timeout=timeout
+            )
+        except asyncio.TimeoutError:
+            timed_out = True
+        finally:
+            self.kill_process_group(process)
+            await process.wait()
+        
+        if timed_out:
+            error = "Command timeout"
+        elif state["truncated"]:
+            # Killed partway; the output cap is not a completed run
+            error = f"Output limit exceeded ({max_output} bytes); command killed"
+        else:
+            error = "".join(captured["stderr"])
+        
+        return {
+            "success": not timed_out and not state["truncated"],
+            "output": "".join(captured["stdout"]),
+            "error": error,
+            "exit_code": process.returncode,
+            "output_bytes": state["total"],
+            "truncated": state["truncated"],
+            "streamed_chunks": state["seq"]
+        }
+    
     async def execute_termux_command(self, command: Dict[str, Any]) -> Dict[str, Any]:
         """Execute terminal command in Termux"""
         try:
@@ -107,26 +988,15 @@ class MoListener:
             safe_commands = ["ls", "pwd", "python", "pkg", "apt", "pip", "git", "curl", "wget"]
             if not any(cmd.startswith(safe_cmd) for safe_cmd in safe_commands):
                 logger.warning(f"Blocked potentially unsafe command: {cmd}")
-                return {"success": False, "error": "Command not allowed"}
+                return {"success": False, "error": "Command not allowed", "blocked": True}
             
-            # Execute command
-            result = subprocess.run(
+            # Execute command without blocking the event loop
+            return await self.run_subprocess(
                 cmd,
-                shell=True,
-                capture_output=True,
-                text=True,
-                timeout=30
+                command_id=command.get("id", ""),
+                timeout=self.config.get("command_timeout", 30)
             )
-            
-            return {
-                "success": True,
-                "output": result.stdout,
-                "error": result.stderr,
-                "exit_code": result.returncode
-            }
         
-        except subprocess.TimeoutExpired:
-            return {"success": False, "error": "Command timeout"}
         except Exception as e:
             return {"success": False, "error": str(e)}
     
@@ -158,12 +1028,17 @@ class MoListener:
                 if "{message}" in cmd and "message" in params:
                     cmd = cmd.format(message=params["message"])
                 
-                result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
+                result = await self.run_subprocess(
+                    cmd,
+                    command_id=command.get("id", ""),
+                    timeout=self.config.get("app_control_timeout", 15)
+                )
                 return {
-                    "success": True,
+                    "success": result["success"],
                     "app": app_name,
                     "action": action,
-                    "output": result.stdout
+                    "output": result["output"],
+                    "exit_code": result["exit_code"]
                 }
             else:
                 return {"success": False, "error": f"Unknown app/action: {app_name}/{action}"}
@@ -171,22 +1046,127 @@ class MoListener:
         except Exception as e:
             return {"success": False, "error": str(e)}
     
+    def hash_file(self, file_path: str) -> str:
+        """SHA-256 of a file, read in fixed-size blocks"""
+        return file_digest(file_path, self.config.get("file_hash_block_size", 1048576))
+    
+    def read_file_range(self, file_path: str, offset: int, length: int) -> Tuple[bytes, int]:
+        """Read at most `length` bytes starting at `offset`; returns (data, file size)"""
+        with open(file_path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            f.seek(offset)
+            return f.read(length), size
+    
+    def write_file_range(self, file_path: str, data: bytes, offset: Optional[int], final: bool) -> int:
+        """Write `data` at `offset` (whole-file replace when offset is None); returns new size"""
+        if offset is None:
+            with open(file_path, 'wb') as f:
+                f.write(data)
+                return f.tell()
+        
+        size = os.path.getsize(file_path) if os.path.exists(file_path) else 0
+        if offset > size:
+            raise ValueError(f"Write offset {offset} is past end of file (size {size})")
+        
+        with open(file_path, 'r+b' if os.path.exists(file_path) else 'wb') as f:
+            f.seek(offset)
+            f.write(data)
+            if final:
+                f.truncate()
+            f.seek(0, os.SEEK_END)
+            return f.tell()
+    
     async def handle_file_operation(self, command: Dict[str, Any]) -> Dict[str, Any]:
-        """Handle file operations"""
+        """Handle file operations
+        
+        Reads and writes are ranged (offset/length) so large files move in bounded
+        chunks; encoding "base64" makes them binary-safe. "stat" and "hash" let the
+        server skip transfers of files that have not changed.
+        """
         try:
             operation = command.get("operation", "")
             file_path = command.get("path", "")
+            encoding = command.get("encoding", "utf-8")
             
             if operation == "read":
-                with open(file_path, 'r') as f:
-                    content = f.read()
-                return {"success": True, "content": content}
+                # Let the caller skip the transfer when its copy is current
+                expected_hash = command.get("if_none_match")
+                if expected_hash:
+                    current_hash = await asyncio.to_thread(self.hash_file, file_path)
+                    if current_hash == expected_hash:
+                        return {"success": True, "unchanged": True, "sha256": current_hash}
+                
+                max_read = self.config.get("file_max_read_bytes", 4194304)
+                offset = int(command.get("offset", 0))
+                length = int(command.get("length", max_read))
+                if offset < 0 or length < 0:
+                    return {"success": False, "error": "offset and length must be non-negative"}
+                length = min(length, max_read)
+                data, size = await asyncio.to_thread(self.read_file_range, file_path, offset, length)
+                
+                if encoding == "base64":
+                    content = base64.b64encode(data).decode("ascii")
+                else:
+                    content = data.decode(encoding, errors="replace")
+                
+                next_offset = offset + len(data)
+                return {
+                    "success": True,
+                    "content": content,
+                    "encoding": encoding,
+                    "offset": offset,
+                    "length": len(data),
+                    "size": size,
+                    "next_offset": next_offset,
+                    "eof": next_offset >= size
+                }
             
             elif operation == "write":
                 content = command.get("content", "")
-                with open(file_path, 'w') as f:
-                    f.write(content)
-                return {"success": True, "message": "File written"}
+                if encoding == "base64":
+                    data = base64.b64decode(content)
+                else:
+                    data = content.encode(encoding)
+                
+                offset = command.get("offset")
+                final = command.get("final", offset is None)
+                size = await asyncio.to_thread(
+                    self.write_file_range,
+                    file_path,
+                    data,
+                    int(offset) if offset is not None else None,
+                    final
+                )
+                
+                result = {
+                    "success": True,
+                    "message": "File written",
+                    "size": size,
+                    "next_offset": (int(offset) if offset is not None else 0) + len(data)
+                }
+                
+                # Verify the assembled file once the last chunk has landed
+                expected_hash = command.get("sha256")
+                if final and expected_hash:
+                    actual_hash = await asyncio.to_thread(self.hash_file, file_path)
+                    result["sha256"] = actual_hash
+                    if actual_hash != expected_hash:
+                        result["success"] = False
+                        result["error"] = "SHA-256 mismatch after write"
+                return result
+            
+            elif operation == "stat":
+                stat = await asyncio.to_thread(os.stat, file_path)
+                return {
+                    "success": True,
+                    "size": stat.st_size,
+                    "mtime": stat.st_mtime,
+                    "is_file": os.path.isfile(file_path)
+                }
+            
+            elif operation == "hash":
+                digest = await asyncio.to_thread(self.hash_file, file_path)
+                return {"success": True, "sha256": digest, "size": os.path.getsize(file_path)}
             
             elif operation == "delete":
                 os.remove(file_path)
@@ -224,17 +1204,24 @@ class MoListener:
         """Process voice commands"""
         try:
             text = command.get("text", "")
-            voice_file = f"/tmp/voice_{int(time.time())}.mp3"
             
-            # Generate voice using TTS
+            # Generate voice using TTS, reusing cached audio for repeated phrases
             from gtts import gTTS
-            tts = gTTS(text=text, lang='en')
-            tts.save(voice_file)
+            from tts_cache import get_tts_cache
+            cache = get_tts_cache()
+            voice_file = await asyncio.to_thread(
+                cache.fetch,
+                text,
+                lambda path: gTTS(text=text, lang='en').save(path),
+                language="en",
+                voice="com",
+                engine="gtts"
+            )
             
-            # Play voice file
-            subprocess.run(f"play {voice_file}", shell=True)
+            # Play voice file without blocking the event loop
+            await self.run_subprocess(f"play {voice_file}", timeout=self.config.get("command_timeout", 30))
             
-            return {"success": True, "voice_file": voice_file}
+            return {"success": True, "voice_file": voice_file, "tts_cache": cache.get_stats()}
         
         except Exception as e:
             return {"success": False, "error": str(e)}
@@ -246,11 +1233,8 @@ class MoListener:
             params = command.get("params", {})
             
             if task_type == "content_creation":
-                # Integrate with content automation service
-                from content_automation import ContentAutomation
-                automation = ContentAutomation()
-                result = automation.process_command(params)
-                return result
+                # Run on a warm content automation worker off the event loop
+                return await self.automation_pool.submit(params)
             
             elif task_type == "social_scheduler":
                 # Schedule social media posts
@@ -263,62 +1247,460 @@ class MoListener:
             return {"success": False, "error": str(e)}
     
     async def send_result(self, command_id: str, result: Dict[str, Any]):
-        """Send command execution result back to Replit API"""
-        try:
-            async with aiohttp.ClientSession() as session:
-                headers = {"Authorization": f"Bearer {self.auth_token}"}
-                payload = {
-                    "command_id": command_id,
-                    "result": result,
-                    "timestamp": time.time()
-                }
+        """Queue a command execution result for batched upload to Replit API"""
+        if command_id:
+            self.unreported_ids.add(command_id)
+        self.result_buffer.append({
+            "command_id": command_id,
+            "result": result,
+            "timestamp": time.time()
+        })
+        self.trim_result_buffer()
+        
+        if len(self.result_buffer) >= self.config.get("result_batch_size", 20):
+            self.result_ready.set()
+        if self.result_flusher is None or self.result_flusher.done():
+            self.result_flusher = asyncio.create_task(self.result_flush_loop())
+    
+    def trim_result_buffer(self):
+        """Enforce the in-memory overflow cap by dropping the oldest results"""
+        limit = self.config.get("result_buffer_limit", 1000)
+        while len(self.result_buffer) > limit:
+            dropped = self.result_buffer.popleft()
+            # The result is lost; let the queue's redelivery run the command again
+            self.unreported_ids.discard(dropped["command_id"])
+            self.dropped_results += 1
+            if self.dropped_results % 100 == 1:
+                logger.warning(f"Result buffer full, dropped {self.dropped_results} results so far")
+    
+    async def result_flush_loop(self):
+        """Upload buffered results, flushing on batch size or after the linger time"""
+        batch_size = self.config.get("result_batch_size", 20)
+        linger = self.config.get("result_linger", 0.25)
+        
+        while self.result_buffer:
+            if len(self.result_buffer) < batch_size:
+                self.result_ready.clear()
+                try:
+                    await asyncio.wait_for(self.result_ready.wait(), timeout=linger)
+                except asyncio.TimeoutError:
+                    pass
+            
+            batch = [self.result_buffer.popleft() for _ in range(min(batch_size, len(self.result_buffer)))]
+            started = time.monotonic()
+            delivered = await self.post_results(batch)
+            self.metrics.observe("mo_listener_result_send_seconds", time.monotonic() - started)
+            self.metrics.inc("mo_listener_results_sent_total", delivered)
+            
+            for payload in batch[:delivered]:
+                if payload["command_id"]:
+                    self.unreported_ids.discard(payload["command_id"])
+                    if self.journal:
+                        self.journal.record(payload["command_id"], "reported")
+            
+            if delivered < len(batch):
+                # Put undelivered results back at the front, preserving order
+                self.result_buffer.extendleft(reversed(batch[delivered:]))
+                self.trim_result_buffer()
+    
+    async def post_results(self, batch: List[Dict[str, Any]]) -> int:
+        """POST a batch of results with retries; returns how many were delivered"""
+        max_retries = self.config.get("max_retries", 3)
+        backoff = self.config.get("result_retry_backoff", 1)
+        delivered = 0
+        
+        for attempt in range(max_retries):
+            try:
+                session = await self.get_session()
+                
+                if self.batch_results_supported:
+                    async with session.post(
+                        f"{self.replit_api}/api/command-results/batch",
+                        json={"results": batch}
+                    ) as response:
+                        if response.status == 200:
+                            return len(batch)
+                        if response.status in (404, 405):
+                            logger.info("Batch result endpoint unavailable, sending results individually")
+                            self.batch_results_supported = False
+                        else:
+                            logger.warning(f"Result batch send failed: {response.status}")
                 
-                async with session.post(
-                    f"{self.replit_api}/api/command-results",
-                    json=payload,
-                    headers=headers
-                ) as response:
-                    if response.status != 200:
-                        logger.warning(f"Result send failed: {response.status}")
+                if not self.batch_results_supported:
+                    # Only (re)send what has not been delivered yet
+                    for payload in batch[delivered:]:
+                        async with session.post(
+                            f"{self.replit_api}/api/command-results",
+                            json=payload
+                        ) as response:
+                            if response.status != 200:
+                                logger.warning(f"Result send failed: {response.status}")
+                                break
+                            delivered += 1
+                    if delivered == len(batch):
+                        return delivered
+            
+            except Exception as e:
+                logger.error(f"Result send error: {e}")
+            
+            await asyncio.sleep(backoff * (2 ** attempt))
+        
+        return delivered
+    
+    async def flush_results(self):
+        """Deliver any buffered results before shutdown"""
+        if self.result_buffer and (self.result_flusher is None or self.result_flusher.done()):
+            self.result_flusher = asyncio.create_task(self.result_flush_loop())
+        if self.result_flusher is None:
+            return
+        
+        self.result_ready.set()
+        try:
+            await asyncio.wait_for(self.result_flusher, timeout=self.config.get("shutdown_grace_period", 30))
+        except asyncio.TimeoutError:
+            logger.warning(f"Gave up on {len(self.result_buffer)} undelivered results on shutdown")
+    
+    def concurrency_limit(self, command_type: str) -> int:
+        """Maximum number of commands of a type that may run at once"""
+        limits = self.config.get("concurrency_limits", {})
+        return max(1, int(limits.get(command_type, self.config.get("default_concurrency", 4))))
+    
+    def command_priority(self, command: Dict[str, Any]) -> int:
+        """Priority class of a command; lower values run first"""
+        if isinstance(command.get("priority"), int):
+            return command["priority"]
+        priorities = self.config.get("command_priorities", {})
+        return priorities.get(command.get("type", ""), self.config.get("default_priority", 2))
+    
+    def get_rate_limiter(self, command_type: str) -> Optional[TokenBucket]:
+        """Token bucket for a command type, or None if the type is not rate limited"""
+        if command_type not in self.rate_limiters:
+            limit = self.config.get("rate_limits", {}).get(command_type)
+            self.rate_limiters[command_type] = (
+                TokenBucket(limit.get("rate", 1), limit.get("burst", 1)) if limit else None
+            )
+        return self.rate_limiters[command_type]
+    
+    async def run_command(self, command: Dict[str, Any], enqueued_at: Optional[float] = None):
+        """Execute a single command in a slot reserved by the scheduler and report the result"""
+        command_type = command.get("type", "")
+        command_id = command.get("id", "")
+        started = time.monotonic()
+        if enqueued_at is not None:
+            self.metrics.observe("mo_listener_queue_wait_seconds", started - enqueued_at, type=command_type)
+        
+        try:
+            if self.journal and command_id:
+                self.journal.record(command_id, "started")
+            try:
+                result = await self.command_handlers[command_type](command)
+            finally:
+                self.metrics.observe("mo_listener_handler_seconds", time.monotonic() - started, type=command_type)
         except Exception as e:
-            logger.error(f"Result send error: {e}")
+            result = {"success": False, "error": str(e)}
+        finally:
+            # Free the slot for the next queued command of this type
+            self.active_counts[command_type] = self.active_counts.get(command_type, 1) - 1
+            self.schedule_event.set()
+        
+        await self.finish_command(command, result)
+    
+    async def finish_command(self, command: Dict[str, Any], result: Dict[str, Any]):
+        """Record, count and report the result of a command"""
+        command_type = command.get("type", "")
+        command_id = command.get("id", "")
+        
+        if result.get("shed"):
+            outcome = "shed"
+        elif result.get("blocked"):
+            outcome = "blocked"
+        else:
+            outcome = "success" if result.get("success") else "failure"
+        self.metrics.inc("mo_listener_commands_total", type=command_type, outcome=outcome)
+        
+        if self.journal and command_id:
+            self.journal.record(command_id, "finished", result)
+        
+        # Send result back as soon as this handler finishes
+        await self.send_result(command_id, result)
+        
+        if self.config.get("log_commands", True):
+            logger.info(f"Executed: {command_type} - {result.get('success', False)}")
+    
+    def dispatch_command(self, command: Dict[str, Any]):
+        """Queue a fetched command for prioritised, concurrent execution"""
+        command_type = command.get("type", "")
+        command_id = command.get("id", "")
+        
+        if command_type not in self.command_handlers:
+            logger.warning(f"Unknown command type: {command_type!r}")
+            # Server-supplied types would make label cardinality unbounded
+            self.metrics.inc("mo_listener_commands_total", type="unknown", outcome="blocked")
+            return
+        
+        # The queue may return a command again until its result is recorded
+        if self.is_pending(command_id):
+            return
+        
+        if self.journal and command_id:
+            if self.journal.is_known(command_id):
+                return
+            self.journal.record(command_id, "fetched", command)
+        
+        self.enqueue_command(command)
+    
+    def is_pending(self, command_id: str) -> bool:
+        """True while a command is queued, running, or its result is awaiting delivery"""
+        return bool(command_id) and (
+            command_id in self.in_flight
+            or command_id in self.backlog_ids
+            or command_id in self.unreported_ids
+        )
+    
+    def enqueue_command(self, command: Dict[str, Any]):
+        """Add a command to the priority backlog, shedding load when it is full"""
+        command_id = command.get("id", "")
+        heapq.heappush(
+            self.backlog,
+            (self.command_priority(command), next(self.backlog_seq), time.monotonic(), command)
+        )
+        if command_id:
+            self.backlog_ids.add(command_id)
+        
+        if len(self.backlog) > self.config.get("backlog_limit", 200):
+            self.shed_command()
+        
+        self.schedule_event.set()
+        if self.scheduler is None or self.scheduler.done():
+            self.scheduler = asyncio.create_task(self.scheduler_loop())
+    
+    def shed_command(self):
+        """Drop the newest command of the lowest priority class"""
+        victim = max(self.backlog, key=lambda entry: (entry[0], entry[1]))
+        self.backlog.remove(victim)
+        heapq.heapify(self.backlog)
+        
+        command = victim[3]
+        self.backlog_ids.discard(command.get("id", ""))
+        logger.warning(f"Backlog full, shedding {command.get('type', '')} command")
+        result = {"success": False, "error": "Dropped by listener load shedding", "shed": True}
+        self.track_in_flight(asyncio.create_task(self.finish_command(command, result)), command.get("id", ""))
+    
+    def launch_ready_commands(self) -> Optional[float]:
+        """Start every queued command that has a free slot and a rate token
+        
+        Commands are considered in priority order. A command whose type is
+        saturated or rate limited does not hold back other types. Returns the
+        seconds until the next rate-limited command could run, or None.
+        """
+        next_wakeup: Optional[float] = None
+        remaining = []
+        
+        for entry in sorted(self.backlog):
+            command = entry[3]
+            command_type = command.get("type", "")
+            
+            if self.active_counts.get(command_type, 0) >= self.concurrency_limit(command_type):
+                remaining.append(entry)
+                continue
+            
+            bucket = self.get_rate_limiter(command_type)
+            if bucket is not None and not bucket.try_take():
+                wait = bucket.time_until_available()
+                next_wakeup = wait if next_wakeup is None else min(next_wakeup, wait)
+                remaining.append(entry)
+                continue
+            
+            self.active_counts[command_type] = self.active_counts.get(command_type, 0) + 1
+            self.backlog_ids.discard(command.get("id", ""))
+            self.spawn_command(command, command.get("id", ""), entry[2])
+        
+        self.backlog = remaining
+        heapq.heapify(self.backlog)
+        return next_wakeup
+    
+    async def scheduler_loop(self):
+        """Launch backlog commands as slots and rate tokens become available"""
+        while True:
+            self.schedule_event.clear()
+            wait = self.launch_ready_commands()
+            try:
+                await asyncio.wait_for(self.schedule_event.wait(), timeout=wait)
+            except asyncio.TimeoutError:
+                pass
+    
+    def spawn_command(self, command: Dict[str, Any], command_id: str, enqueued_at: Optional[float] = None):
+        """Start a command task and track it until it completes"""
+        self.track_in_flight(asyncio.create_task(self.run_command(command, enqueued_at)), command_id)
+    
+    def track_in_flight(self, task: asyncio.Task, command_id: str):
+        """Remember a running command task until it completes"""
+        key = command_id or f"anonymous_{id(task)}"
+        self.in_flight[key] = task
+        task.add_done_callback(lambda _: self.in_flight.pop(key, None))
+    
+    async def drain(self):
+        """Wait for in-flight commands to finish, cancelling stragglers
+        
+        Commands still waiting in the backlog are left journaled as fetched
+        and run on the next start.
+        """
+        if self.scheduler is not None:
+            self.scheduler.cancel()
+            await asyncio.gather(self.scheduler, return_exceptions=True)
+        if self.backlog:
+            logger.info(f"Leaving {len(self.backlog)} queued commands for the next run")
+        
+        if not self.in_flight:
+            return
+        
+        tasks = list(self.in_flight.values())
+        grace_period = self.config.get("shutdown_grace_period", 30)
+        done, pending = await asyncio.wait(tasks, timeout=grace_period)
+        for task in pending:
+            task.cancel()
+        if pending:
+            logger.warning(f"Cancelled {len(pending)} unfinished commands on shutdown")
+            await asyncio.gather(*pending, return_exceptions=True)
+    
+    async def handle_metrics(self, request: web.Request) -> web.Response:
+        """Prometheus scrape endpoint"""
+        return web.Response(
+            text=self.metrics.render_prometheus(),
+            content_type="text/plain",
+            charset="utf-8"
+        )
+    
+    async def handle_metrics_json(self, request: web.Request) -> web.Response:
+        return web.json_response(self.metrics.snapshot())
+    
+    async def metrics_snapshot_loop(self, path: str):
+        """Periodically write a JSON metrics snapshot file"""
+        interval = self.config.get("metrics_snapshot_interval", 60)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await asyncio.to_thread(self.metrics.write_snapshot, path)
+            except Exception as e:
+                logger.error(f"Metrics snapshot error: {e}")
+    
+    async def start_metrics(self):
+        """Expose metrics over local HTTP and/or a snapshot file"""
+        if not self.config.get("metrics_enabled", True):
+            return
+        
+        port = self.config.get("metrics_port", 9464)
+        if port:
+            app = web.Application()
+            app.router.add_get("/metrics", self.handle_metrics)
+            app.router.add_get("/metrics.json", self.handle_metrics_json)
+            self.metrics_runner = web.AppRunner(app, access_log=None)
+            await self.metrics_runner.setup()
+            try:
+                site = web.TCPSite(self.metrics_runner, self.config.get("metrics_host", "127.0.0.1"), port)
+                await site.start()
+                logger.info(f"Metrics available on port {port}")
+            except OSError as e:
+                logger.error(f"Metrics endpoint unavailable: {e}")
+                await self.metrics_runner.cleanup()
+                self.metrics_runner = None
+        
+        snapshot_path = self.config.get("metrics_snapshot_path", "")
+        if snapshot_path:
+            self.metrics_writer = asyncio.create_task(self.metrics_snapshot_loop(snapshot_path))
+    
+    async def stop_metrics(self):
+        if self.metrics_writer is not None:
+            self.metrics_writer.cancel()
+            await asyncio.gather(self.metrics_writer, return_exceptions=True)
+            snapshot_path = self.config.get("metrics_snapshot_path", "")
+            if snapshot_path:
+                self.metrics.write_snapshot(snapshot_path)
+        if self.metrics_runner is not None:
+            await self.metrics_runner.cleanup()
+            self.metrics_runner = None
+    
+    async def replay_journal(self):
+        """Recover commands and results left over from a previous run"""
+        self.journal.prune(self.config.get("journal_retention_days", 7))
+        leftovers = self.journal.unreported()
+        if not leftovers:
+            return
+        
+        logger.info(f"Replaying {len(leftovers)} journaled commands")
+        for command_id, entry in leftovers.items():
+            if entry["state"] == "finished":
+                await self.send_result(command_id, entry["result"] or {})
+            elif entry["state"] == "started":
+                # Never re-run a command that may have partially executed
+                result = {"success": False, "error": "Interrupted by listener restart"}
+                self.journal.record(command_id, "finished", result)
+                await self.send_result(command_id, result)
+            elif entry["command"]:
+                # Fetched but never started: safe to execute now
+                self.enqueue_command(entry["command"])
+    
+    def log_prewarm_result(self, task: asyncio.Task):
+        if task.cancelled():
+            return
+        if task.exception():
+            logger.error(f"Automation pool prewarm failed: {task.exception()}")
+        elif self.automation_pool.last_error:
+            logger.warning(f"Automation pool prewarmed with errors: {self.automation_pool.last_error}")
     
     async def main_loop(self):
         """Main listener loop"""
         logger.info("MO Listener started")
         self.is_running = True
+        await self.start_metrics()
         
-        while self.is_running:
-            try:
-                # Fetch pending commands
-                commands = await self.fetch_commands()
-                
-                for command in commands:
-                    command_type = command.get("type", "")
-                    command_id = command.get("id", "")
+        if self.journal:
+            self.journal.start()
+            await self.replay_journal()
+        
+        if self.config.get("automation_prewarm", True):
+            self.prewarm_task = asyncio.create_task(self.automation_pool.start())
+            self.prewarm_task.add_done_callback(self.log_prewarm_result)
+        
+        try:
+            while self.is_running:
+                try:
+                    push_mode = self.config.get("delivery_mode", "sse") in ("sse", "long_poll")
+                    if push_mode and time.monotonic() >= self.push_retry_at:
+                        if await self.receive_pushed_commands():
+                            continue
+                    
+                    # Fall back to polling, run fetched commands concurrently
+                    commands = await self.fetch_commands()
                     
-                    if command_type in self.command_handlers:
-                        # Execute command
-                        result = await self.command_handlers[command_type](command)
-                        
-                        # Send result back
-                        await self.send_result(command_id, result)
-                        
-                        if self.config.get("log_commands", True):
-                            logger.info(f"Executed: {command_type} - {result.get('success', False)}")
-                    else:
-                        logger.warning(f"Unknown command type: {command_type}")
+                    for command in commands:
+                        self.dispatch_command(command)
+                    
+                    # Wait before next poll, capped so push delivery is retried on time
+                    delay = self.next_poll_delay(bool(commands))
+                    if push_mode:
+                        delay = max(0.0, min(delay, self.push_retry_at - time.monotonic()))
+                    await asyncio.sleep(delay)
                 
-                # Wait before next poll
-                await asyncio.sleep(self.config.get("polling_interval", 2))
-            
-            except KeyboardInterrupt:
-                logger.info("Shutting down MO Listener")
-                self.is_running = False
-                break
-            except Exception as e:
-                logger.error(f"Main loop error: {e}")
-                await asyncio.sleep(5)  # Wait before retry
+                except KeyboardInterrupt:
+                    logger.info("Shutting down MO Listener")
+                    self.is_running = False
+                    break
+                except Exception as e:
+                    logger.error(f"Main loop error: {e}")
+                    await asyncio.sleep(5)  # Wait before retry
+        finally:
+            await self.drain()
+            await self.flush_results()
+            if self.prewarm_task is not None:
+                self.prewarm_task.cancel()
+                await asyncio.gather(self.prewarm_task, return_exceptions=True)
+            await self.automation_pool.close()
+            await self.stop_metrics()
+            if self.journal:
+                await self.journal.close()
+            # Release pooled connections on any exit path, including cancellation
+            await self.close()
 
 def main():
     """Entry point for MO Listener"""
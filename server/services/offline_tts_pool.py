@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""
+Offline TTS Pool - Warm pyttsx3 engines for batch synthesis
+pyttsx3 hands out one engine per process and is not thread-safe, so each
+engine lives in its own worker process; the pool keeps them initialized
+and spreads batches of utterances across them. Run with --serve to expose
+the pool over JSON lines on stdin/stdout for the Node services.
+"""
+
+import os
+import sys
+import json
+import uuid
+import queue
+import logging
+import tempfile
+import threading
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_SIZE = int(os.environ.get("MO_OFFLINE_TTS_WORKERS", "2"))
+
+
+def resolve_voice(voices: Dict[str, str], requested: Optional[str]) -> Optional[str]:
+    """Map a voice id or (partial) name to an engine voice id"""
+    if not requested or requested == "default":
+        return None
+    if requested in voices.values():
+        return requested
+    needle = requested.lower()
+    for name, voice_id in voices.items():
+        if needle in name:
+            return voice_id
+    return None
+
+
+def tts_worker_main(conn):
+    """Worker process: initialize one engine, then synthesize batches until told to stop"""
+    try:
+        import pyttsx3
+        engine = pyttsx3.init()
+        voices = {v.name.lower(): v.id for v in engine.getProperty("voices") or []}
+    except BaseException as e:
+        conn.send({"ready": False, "error": f"Failed to initialize pyttsx3: {e}"})
+        return
+
+    # Engine properties are only pushed when they change between utterances;
+    # unset ones go back to the startup defaults so output doesn't depend on
+    # what the worker's previous utterance asked for
+    defaults = {name: engine.getProperty(name) for name in ("voice", "rate", "volume")}
+    current: Dict[str, Any] = dict(defaults)
+    resolved: Dict[str, Optional[str]] = {}
+
+    def apply(name: str, value: Any):
+        if value is None:
+            value = defaults[name]
+        if current.get(name) != value:
+            engine.setProperty(name, value)
+            current[name] = value
+
+    conn.send({"ready": True, "voices": sorted(voices)})
+    while True:
+        try:
+            batch = conn.recv()
+        except EOFError:
+            break
+        if batch is None:
+            break
+
+        try:
+            for item in batch:
+                voice = item.get("voice")
+                if voice not in resolved:
+                    resolved[voice] = resolve_voice(voices, voice)
+                apply("voice", resolved[voice])
+                apply("rate", item.get("rate"))
+                apply("volume", item.get("volume"))
+                engine.save_to_file(item["text"], item["path"])
+            # One event-loop run renders the whole batch
+            engine.runAndWait()
+
+            results = []
+            for item in batch:
+                ok = os.path.exists(item["path"]) and os.path.getsize(item["path"]) > 0
+                result = {"success": ok, "path": item["path"]}
+                if not ok:
+                    result["error"] = "Engine produced no audio"
+                results.append(result)
+        except Exception as e:
+            results = [{"success": False, "path": item.get("path"), "error": str(e)} for item in batch]
+        conn.send(results)
+
+
+class TTSWorker:
+    """Handle to one warm pyttsx3 worker process"""
+
+    def __init__(self, context):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=tts_worker_main, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.voices: List[str] = []
+
+    def wait_ready(self, timeout: float):
+        if not self.conn.poll(timeout):
+            raise TimeoutError("TTS worker did not start in time")
+        message = self.conn.recv()
+        if not message.get("ready"):
+            raise RuntimeError(message.get("error", "TTS worker failed to start"))
+        self.voices = message.get("voices", [])
+
+    def run(self, batch: List[Dict[str, Any]], timeout: float) -> List[Dict[str, Any]]:
+        self.conn.send(batch)
+        if not self.conn.poll(timeout):
+            raise TimeoutError("TTS batch timed out")
+        return self.conn.recv()
+
+    def stop(self, timeout: float = 2):
+        try:
+            self.conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(1)
+        self.conn.close()
+
+
+class OfflineTTSPool:
+    """Pool of initialized pyttsx3 engines, safe to call from any thread
+
+    Batches are split across idle workers; a worker that times out or dies
+    is replaced so one stuck utterance cannot wedge the pool.
+    """
+
+    def __init__(self, size: int = DEFAULT_POOL_SIZE, batch_timeout: float = 120,
+                 startup_timeout: float = 30):
+        self.size = max(1, size)
+        self.batch_timeout = batch_timeout
+        self.startup_timeout = startup_timeout
+        self.context = multiprocessing.get_context("spawn")
+        self.idle: "queue.Queue[TTSWorker]" = queue.Queue()
+        self.workers: List[TTSWorker] = []
+        self.spawning = 0
+        self.lock = threading.Lock()
+        self.executor: Optional[ThreadPoolExecutor] = None
+        self.started = False
+        self.stats = {"batches": 0, "utterances": 0, "failures": 0, "replacements": 0}
+
+    def spawn_worker(self) -> TTSWorker:
+        worker = TTSWorker(self.context)
+        try:
+            worker.wait_ready(self.startup_timeout)
+        except Exception:
+            worker.stop(timeout=0)
+            raise
+        return worker
+
+    def start(self):
+        """Spawn and warm up all engines"""
+        with self.lock:
+            if self.started:
+                return
+            errors = []
+            # Launch every process before waiting so engines initialize in parallel
+            for worker in [TTSWorker(self.context) for _ in range(self.size)]:
+                try:
+                    worker.wait_ready(self.startup_timeout)
+                except Exception as e:
+                    worker.stop(timeout=0)
+                    errors.append(str(e))
+                    continue
+                self.workers.append(worker)
+                self.idle.put(worker)
+            if not self.workers:
+                raise RuntimeError(errors[0] if errors else "No TTS workers started")
+            self.executor = ThreadPoolExecutor(max_workers=len(self.workers))
+            self.started = True
+            logger.info(f"Offline TTS pool ready with {len(self.workers)} engines")
+
+    def add_worker(self) -> bool:
+        """Spawn one worker into a free slot, retrying once; False if the pool is full or it could not start"""
+        # Reserve the slot first so concurrent refills cannot overshoot the pool size
+        with self.lock:
+            if len(self.workers) + self.spawning >= self.size:
+                return False
+            self.spawning += 1
+        try:
+            for attempt in range(2):
+                try:
+                    fresh = self.spawn_worker()
+                except Exception as e:
+                    logger.error(f"Could not start TTS worker (attempt {attempt + 1}): {e}")
+                    continue
+                with self.lock:
+                    self.workers.append(fresh)
+                self.idle.put(fresh)
+                return True
+            return False
+        finally:
+            with self.lock:
+                self.spawning -= 1
+
+    def replace_worker(self, worker: TTSWorker):
+        worker.stop(timeout=0)
+        with self.lock:
+            self.stats["replacements"] += 1
+            if worker in self.workers:
+                self.workers.remove(worker)
+        self.add_worker()
+
+    def ensure_workers(self):
+        """Refill the pool after failed replacements; raise if no engine can start"""
+        for _ in range(self.size):
+            if not self.add_worker():
+                break
+        with self.lock:
+            if not self.workers and not self.spawning:
+                raise RuntimeError("No offline TTS workers available")
+
+    def run_on_worker(self, batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # A replacement may be spawning while every other worker is busy
+        try:
+            worker = self.idle.get(timeout=self.batch_timeout + self.startup_timeout)
+        except queue.Empty:
+            return [{"success": False, "path": item["path"], "error": "No TTS worker became available"}
+                    for item in batch]
+        try:
+            results = worker.run(batch, self.batch_timeout)
+        except (TimeoutError, EOFError, BrokenPipeError, OSError) as e:
+            self.replace_worker(worker)
+            return [{"success": False, "path": item["path"], "error": str(e) or "TTS worker failed"}
+                    for item in batch]
+        self.idle.put(worker)
+        return results
+
+    def synthesize_batch(self, utterances: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Synthesize many utterances, in order
+
+        Each utterance is a dict with text and optional path, voice, rate and
+        volume. Utterances without a path go to a temporary WAV that is read
+        back and returned as "audio" bytes instead.
+        """
+        self.start()
+        self.ensure_workers()
+        batch = []
+        for utterance in utterances:
+            item = dict(utterance)
+            item["as_bytes"] = not item.get("path")
+            if item["as_bytes"]:
+                item["path"] = os.path.join(tempfile.gettempdir(), f"mo_tts_{uuid.uuid4().hex}.wav")
+            batch.append(item)
+        if not batch:
+            return []
+
+        # Contiguous slices keep per-worker property changes to a minimum
+        slices = max(1, min(len(self.workers), len(batch)))
+        step = -(-len(batch) // slices)
+        parts = [batch[i:i + step] for i in range(0, len(batch), step)]
+        results: List[Dict[str, Any]] = []
+        for part_results in self.executor.map(self.run_on_worker, parts):
+            results.extend(part_results)
+
+        for item, result in zip(batch, results):
+            if item["as_bytes"]:
+                if result["success"]:
+                    with open(item["path"], "rb") as f:
+                        result["audio"] = f.read()
+                result.pop("path", None)
+                if os.path.exists(item["path"]):
+                    os.unlink(item["path"])
+
+        with self.lock:
+            self.stats["batches"] += 1
+            self.stats["utterances"] += len(batch)
+            self.stats["failures"] += sum(1 for r in results if not r["success"])
+        return results
+
+    def synthesize(self, text: str, path: str, voice: Optional[str] = None,
+                   rate: Optional[int] = None, volume: Optional[float] = None) -> str:
+        """Synthesize one utterance to a WAV file and return its path"""
+        result = self.synthesize_batch([{
+            "text": text, "path": path, "voice": voice, "rate": rate, "volume": volume
+        }])[0]
+        if not result["success"]:
+            raise RuntimeError(result.get("error", "Offline TTS failed"))
+        return path
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {**self.stats, "workers": len(self.workers)}
+
+    def close(self):
+        with self.lock:
+            workers, self.workers = self.workers, []
+            self.started = False
+        if self.executor:
+            self.executor.shutdown(wait=False)
+            self.executor = None
+        for worker in workers:
+            worker.stop()
+        self.idle = queue.Queue()
+
+
+_shared_pool: Optional[OfflineTTSPool] = None
+_shared_lock = threading.Lock()
+
+
+def get_offline_tts_pool() -> OfflineTTSPool:
+    """Process-wide pool instance"""
+    global _shared_pool
+    with _shared_lock:
+        if _shared_pool is None:
+            _shared_pool = OfflineTTSPool()
+        return _shared_pool
+
+
+def serve():
+    """Answer JSON-line requests on stdin: {"id", "utterances": [...]} -> {"id", "success", "results"}"""
+    pool = get_offline_tts_pool()
+    write_lock = threading.Lock()
+    requests_executor = ThreadPoolExecutor(max_workers=pool.size)
+
+    def respond(message: Dict[str, Any]):
+        with write_lock:
+            sys.stdout.write(json.dumps(message) + "\n")
+            sys.stdout.flush()
+
+    def handle(request: Dict[str, Any]):
+        try:
+            utterances = request.get("utterances") or [request]
+            results = pool.synthesize_batch([
+                {key: u.get(key) for key in ("text", "path", "voice", "rate", "volume")}
+                for u in utterances
+            ])
+            for result in results:
+                # Bytes cannot cross the JSON channel; callers always pass paths
+                result.pop("audio", None)
+            respond({"id": request.get("id"), "success": all(r["success"] for r in results),
+                     "results": results})
+        except Exception as e:
+            respond({"id": request.get("id"), "success": False, "error": str(e)})
+
+    try:
+        pool.start()
+        respond({"ready": True})
+    except Exception as e:
+        respond({"ready": False, "error": str(e)})
+        return
+
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError as e:
+            respond({"id": None, "success": False, "error": f"Invalid request: {e}"})
+            continue
+        requests_executor.submit(handle, request)
+
+    requests_executor.shutdown(wait=True)
+    pool.close()
+
+
+if __name__ == "__main__":
+    if "--serve" in sys.argv:
+        serve()
+    else:
+        print("Usage: offline_tts_pool.py --serve")
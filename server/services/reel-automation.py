@@ -5,10 +5,19 @@ Handles video creation, voice synthesis, and content processing
 """
 
 import os
+import re
+import sys
 import json
+import time
+import uuid
+import shutil
 import asyncio
+import subprocess
+import multiprocessing
 from pathlib import Path
-from typing import List, Dict, Optional, Union
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Optional, Union, Callable, AsyncIterator
 import tempfile
 import logging
 
@@ -19,12 +28,21 @@ try:
         concatenate_videoclips, ColorClip, TextClip
     )
     from moviepy.audio.io.AudioFileClip import AudioFileClip
-    from PIL import Image, ImageDraw, ImageFont, ImageEnhance, ImageFilter
+    from PIL import Image, ImageDraw, ImageFont
     import numpy as np
     from gtts import gTTS
     import cv2
     from pydub import AudioSegment
+    from pydub.silence import detect_leading_silence
     import requests
+    from tts_cache import get_tts_cache
+    from audio_dsp import change_speed_segment
+    from image_enhance import ImageEnhancer, PIPELINE_VERSION
+    from reel_render_worker import render_moviepy_segment
+    from media_probe import probe_media
+    from artifact_store import get_artifact_store, file_digest
+    from ass_captions import ass_supported, build_ass, filter_path
+    from render_profiles import get_render_profile, scaled_size, profile_fps, ffmpeg_encoder_args, moviepy_write_args
 except ImportError as e:
     logging.error(f"Required library not installed: {e}")
     raise
@@ -43,6 +61,9 @@ class ReelAutomationService:
         
         self.setup_logging()
         
+        # Finished reels live in the artifact store and are linked into output_dir
+        get_artifact_store().manage(str(self.output_dir))
+        
         # Voice synthesis settings
         self.voice_settings = {
             "natural": {"lang": "en", "tld": "com", "slow": False},
@@ -51,6 +72,47 @@ class ReelAutomationService:
             "energetic": {"lang": "en", "tld": "com.au", "slow": False}
         }
         
+        # Enhanced images are kept in the artifact store by content hash and style
+        self.image_enhancer = ImageEnhancer()
+        
+        # Overlay text rasterization caches
+        self.overlay_font_path = os.environ.get("MO_REEL_FONT", "arial.ttf")
+        self.font_cache: Dict[tuple, ImageFont.ImageFont] = {}
+        self.sprite_cache: OrderedDict = OrderedDict()
+        self.sprite_cache_size = 256
+        
+        # Render engine: "moviepy" (default) or "ffmpeg", overridable per request
+        self.render_settings = {
+            "engine": os.environ.get("MO_REEL_RENDER_ENGINE", "moviepy"),
+            "ffmpeg_binary": os.environ.get("MO_FFMPEG_BINARY", "ffmpeg"),
+            "parallel_segments": os.environ.get("MO_REEL_PARALLEL_SEGMENTS", "1") == "1",
+            "render_workers": int(os.environ.get("MO_REEL_RENDER_WORKERS", max(1, (os.cpu_count() or 2) // 2))),
+            "min_segment_seconds": 4.0,
+            # ffmpeg engine captions: "ass" (one libass subtitle pass) or "sprites" (one overlay per caption)
+            "caption_engine": os.environ.get("MO_REEL_CAPTION_ENGINE", "ass"),
+            "caption_font": os.environ.get("MO_REEL_CAPTION_FONT", "Arial"),
+            # Previews captured during export
+            "preview_frames": 0,
+            "preview_width": 300,
+            "sprite_columns": 5,
+            # Memory budget per concurrent render in a batch
+            "job_memory_bytes": int(os.environ.get("MO_REEL_JOB_MEMORY_MB", "1024")) * 1024 * 1024,
+            # Encoded segments are kept in the artifact store by fingerprint and
+            # spliced back into later renders
+            "segment_cache": os.environ.get("MO_REEL_SEGMENT_CACHE", "1") == "1"
+        }
+        self.active_renders = 0
+        self.digest_cache: Dict[tuple, str] = {}
+        self.render_pool: Optional[ProcessPoolExecutor] = None
+        
+        # Long scripts are synthesized sentence by sentence and stitched
+        self.narration_settings = {
+            "max_chunk_chars": 200,
+            "max_concurrency": int(os.environ.get("MO_TTS_CONCURRENCY", "4")),
+            "pause_ms": 150,
+            "silence_threshold_db": -50.0
+        }
+        
         # Style templates
         self.style_templates = {
             "modern": {
@@ -91,6 +153,192 @@ class ReelAutomationService:
         )
         self.logger = logging.getLogger(__name__)
     
+    def split_script(self, script: str) -> List[str]:
+        """
+        Split a script into sentence-sized chunks for synthesis
+        
+        Args:
+            script: Full narration text
+            
+        Returns:
+            Ordered list of chunks, none longer than max_chunk_chars
+        """
+        max_chars = self.narration_settings["max_chunk_chars"]
+        chunks = []
+        
+        for sentence in re.split(r'(?<=[.!?])\s+', script.strip()):
+            sentence = sentence.strip()
+            if not sentence:
+                continue
+            if len(sentence) <= max_chars:
+                chunks.append(sentence)
+                continue
+            
+            # Run-on sentence: break at clause boundaries, and between words
+            # only inside a clause that is itself too long
+            current = ""
+            for clause in re.split(r'(?<=[,;:])\s+', sentence):
+                if len(clause) <= max_chars:
+                    pieces = [clause]
+                else:
+                    if current:
+                        chunks.append(current)
+                        current = ""
+                    pieces = clause.split()
+                for piece in pieces:
+                    if current and len(current) + 1 + len(piece) > max_chars:
+                        chunks.append(current)
+                        current = piece
+                    else:
+                        current = f"{current} {piece}" if current else piece
+            if current:
+                chunks.append(current)
+        
+        return chunks
+    
+    def synthesize_chunk(self, text: str, voice_config: Dict) -> str:
+        """Synthesize one chunk with gTTS through the shared cache"""
+        return get_tts_cache().fetch(
+            text,
+            lambda path: gTTS(
+                text=text,
+                lang=voice_config["lang"],
+                tld=voice_config["tld"],
+                slow=voice_config["slow"]
+            ).save(path),
+            language=voice_config["lang"],
+            voice=f"{voice_config['tld']}{':slow' if voice_config['slow'] else ''}",
+            engine="gtts"
+        )
+    
+    def change_speed(self, audio: AudioSegment, speed: float) -> AudioSegment:
+        """Apply a playback speed multiplier to decoded audio, keeping pitch"""
+        return change_speed_segment(audio, speed)
+    
+    def stitch_narration(self, chunks: List[str], chunk_paths: List[str]) -> tuple:
+        """
+        Join synthesized chunks into one track without audible seams
+        
+        Args:
+            chunks: Chunk texts, in script order
+            chunk_paths: Synthesized audio for each chunk
+            
+        Returns:
+            Tuple of (stitched AudioSegment, per-chunk timing list)
+        """
+        threshold = self.narration_settings["silence_threshold_db"]
+        pause = AudioSegment.silent(duration=self.narration_settings["pause_ms"])
+        track = AudioSegment.empty()
+        segments = []
+        
+        for index, (text, path) in enumerate(zip(chunks, chunk_paths)):
+            audio = AudioSegment.from_mp3(path)
+            
+            # gTTS pads every request with silence; trim it so sentence gaps stay uniform
+            lead = detect_leading_silence(audio, silence_threshold=threshold)
+            trail = detect_leading_silence(audio.reverse(), silence_threshold=threshold)
+            if lead + trail < len(audio):
+                audio = audio[lead:len(audio) - trail]
+            
+            if index:
+                track += pause
+            start = len(track)
+            track += audio
+            segments.append({
+                "index": index,
+                "text": text,
+                "start": start / 1000.0,
+                "end": len(track) / 1000.0
+            })
+        
+        return track, segments
+    
+    async def create_narration(
+        self,
+        script: str,
+        voice_type: str = "natural",
+        speed: float = 1.0
+    ) -> Dict:
+        """
+        Generate narration audio together with per-chunk timing metadata
+        
+        Scripts with several sentences are synthesized chunk by chunk, in
+        parallel, and stitched into a single track.
+        
+        Args:
+            script: Text to convert to speech
+            voice_type: Type of voice (natural, professional, friendly, energetic)
+            speed: Speech speed multiplier
+            
+        Returns:
+            Dict with audio_path and segments (None for single-chunk scripts)
+        """
+        self.logger.info(f"Generating voice narration: {voice_type}")
+        
+        voice_config = self.voice_settings.get(voice_type, self.voice_settings["natural"])
+        voice = f"{voice_config['tld']}{':slow' if voice_config['slow'] else ''}"
+        cache = get_tts_cache()
+        chunks = self.split_script(script)
+        
+        if len(chunks) < 2:
+            # Generate speech using gTTS, reusing earlier synthesis of the same script
+            raw_audio_path = await asyncio.to_thread(self.synthesize_chunk, script, voice_config)
+            
+            # Adjust speed if needed
+            if speed != 1.0:
+                def adjust_speed(path: str):
+                    audio = self.change_speed(AudioSegment.from_mp3(raw_audio_path), speed)
+                    audio.export(path, format="mp3")
+                
+                raw_audio_path = await asyncio.to_thread(
+                    cache.fetch,
+                    script,
+                    adjust_speed,
+                    language=voice_config["lang"],
+                    voice=voice,
+                    speed=speed,
+                    engine="gtts+wsola"
+                )
+            
+            return {"audio_path": raw_audio_path, "segments": None}
+        
+        # The stitched track and its timings are cached as a pair under the same parameters
+        engine = f"gtts-chunked:{self.narration_settings['pause_ms']}"
+        key_params = dict(language=voice_config["lang"], voice=voice, speed=speed, engine=engine)
+        audio_cached = cache.lookup(cache.make_key(script, fmt="mp3", **key_params))
+        timings_cached = cache.lookup(cache.make_key(script, fmt="json", **key_params))
+        if audio_cached and timings_cached:
+            with open(timings_cached) as f:
+                return {"audio_path": audio_cached, "segments": json.load(f)}
+        
+        semaphore = asyncio.Semaphore(self.narration_settings["max_concurrency"])
+        
+        async def synthesize(text: str) -> str:
+            async with semaphore:
+                return await asyncio.to_thread(self.synthesize_chunk, text, voice_config)
+        
+        self.logger.info(f"Synthesizing {len(chunks)} narration chunks")
+        chunk_paths = await asyncio.gather(*(synthesize(text) for text in chunks))
+        
+        track, segments = await asyncio.to_thread(self.stitch_narration, chunks, chunk_paths)
+        if speed != 1.0:
+            track = await asyncio.to_thread(self.change_speed, track, speed)
+            scale = len(track) / max(1, segments[-1]["end"] * 1000.0)
+            for segment in segments:
+                segment["start"] = round(segment["start"] * scale, 3)
+                segment["end"] = round(segment["end"] * scale, 3)
+        
+        def write_timings(path: str):
+            with open(path, "w") as f:
+                json.dump(segments, f)
+        
+        audio_path = await asyncio.to_thread(
+            cache.fetch, script, lambda path: track.export(path, format="mp3"), fmt="mp3", **key_params
+        )
+        await asyncio.to_thread(cache.fetch, script, write_timings, fmt="json", **key_params)
+        
+        return {"audio_path": audio_path, "segments": segments}
+    
     async def generate_voice_narration(
         self, 
         script: str, 
@@ -109,43 +357,8 @@ class ReelAutomationService:
             Path to generated audio file
         """
         try:
-            self.logger.info(f"Generating voice narration: {voice_type}")
-            
-            voice_config = self.voice_settings.get(voice_type, self.voice_settings["natural"])
-            
-            # Generate speech using gTTS
-            tts = gTTS(
-                text=script,
-                lang=voice_config["lang"],
-                tld=voice_config["tld"],
-                slow=voice_config["slow"]
-            )
-            
-            # Save to temporary file
-            temp_audio_path = self.temp_dir / f"narration_{hash(script)}.mp3"
-            tts.save(str(temp_audio_path))
-            
-            # Adjust speed if needed
-            if speed != 1.0:
-                audio = AudioSegment.from_mp3(str(temp_audio_path))
-                
-                # Speed adjustment
-                if speed > 1.0:
-                    # Increase speed
-                    audio = audio.speedup(playback_speed=speed)
-                else:
-                    # Decrease speed  
-                    audio = audio._spawn(audio.raw_data, overrides={
-                        "frame_rate": int(audio.frame_rate * speed)
-                    })
-                    audio = audio.set_frame_rate(audio.frame_rate)
-                
-                # Save adjusted audio
-                final_audio_path = self.temp_dir / f"narration_final_{hash(script)}.mp3"
-                audio.export(str(final_audio_path), format="mp3")
-                return str(final_audio_path)
-            
-            return str(temp_audio_path)
+            narration = await self.create_narration(script, voice_type, speed)
+            return narration["audio_path"]
             
         except Exception as e:
             self.logger.error(f"Error generating voice narration: {e}")
@@ -168,24 +381,66 @@ class ReelAutomationService:
             position: Text position (center, bottom, top)
             
         Returns:
-            MoviePy ImageClip with text
+            MoviePy ImageClip with text, positioned within the frame
         """
         try:
-            style_config = self.style_templates.get(style, self.style_templates["modern"])
+            sprite, offset = self.render_text_sprite(text, size, style, position)
+            
+            # Only the text's bounding box is blended onto each frame
+            text_clip = ImageClip(np.array(sprite), ismask=False, transparent=True)
             
-            # Create background
-            img = Image.new('RGBA', size, color=(*style_config["bg_color"], 0))
-            draw = ImageDraw.Draw(img)
+            return text_clip.set_position(offset)
             
-            # Load font (fallback to default if custom font not available)
+        except Exception as e:
+            self.logger.error(f"Error creating text overlay: {e}")
+            raise
+    
+    def get_font(self, path: str, size: int):
+        """Load a font once per (path, size)"""
+        key = (path, size)
+        if key not in self.font_cache:
+            # Fallback to default if custom font not available
             try:
-                font_size = max(40, size[0] // 25)
-                font = ImageFont.truetype("arial.ttf", font_size)
-            except:
-                font = ImageFont.load_default()
+                self.font_cache[key] = ImageFont.truetype(path, size)
+            except OSError:
+                self.font_cache[key] = ImageFont.load_default()
+        return self.font_cache[key]
+    
+    def render_text_sprite(
+        self,
+        text: str,
+        size: tuple = (1080, 1920),
+        style: str = "modern",
+        position: str = "center"
+    ) -> tuple:
+        """
+        Rasterize outlined overlay text into a tight sprite
+        
+        Sprites are memoized by (text, style, position, size), so repeated
+        captions across renders are drawn once.
+        
+        Args:
+            text: Text content
+            size: Video dimensions (width, height)
+            style: Visual style template
+            position: Text position (center, bottom, top)
+            
+        Returns:
+            Tuple of (RGBA PIL sprite, (x, y) placement within the frame)
+        """
+        key = (text, style, position, tuple(size))
+        cached = self.sprite_cache.get(key)
+        if cached:
+            self.sprite_cache.move_to_end(key)
+            return cached
+        
+        try:
+            style_config = self.style_templates.get(style, self.style_templates["modern"])
+            font = self.get_font(self.overlay_font_path, max(40, size[0] // 25))
+            stroke = 2
             
             # Calculate text position
-            bbox = draw.textbbox((0, 0), text, font=font)
+            bbox = font.getbbox(text)
             text_width = bbox[2] - bbox[0]
             text_height = bbox[3] - bbox[1]
             
@@ -199,25 +454,27 @@ class ReelAutomationService:
                 x = (size[0] - text_width) // 2
                 y = 100
             
-            # Add text with outline
-            outline_color = (0, 0, 0, 200)
-            for adj in range(3):
-                draw.text((x-adj, y-adj), text, font=font, fill=outline_color)
-                draw.text((x+adj, y+adj), text, font=font, fill=outline_color)
-            
-            # Main text
-            draw.text((x, y), text, font=font, fill=(*style_config["font_color"], 255))
-            
-            # Convert PIL to numpy array for MoviePy
-            img_array = np.array(img)
+            # Sprite covers the glyphs plus their outline, nothing more
+            left, top, right, bottom = font.getbbox(text, stroke_width=stroke)
+            sprite = Image.new('RGBA', (max(1, right - left), max(1, bottom - top)), (0, 0, 0, 0))
+            draw = ImageDraw.Draw(sprite)
             
-            # Create ImageClip
-            text_clip = ImageClip(img_array, ismask=False, transparent=True)
+            # Text with outline in a single stroked draw
+            draw.text(
+                (-left, -top), text, font=font,
+                fill=(*style_config["font_color"], 255),
+                stroke_width=stroke,
+                stroke_fill=(0, 0, 0, 200)
+            )
             
-            return text_clip
+            result = (sprite, (x + left, y + top))
+            self.sprite_cache[key] = result
+            if len(self.sprite_cache) > self.sprite_cache_size:
+                self.sprite_cache.popitem(last=False)
+            return result
             
         except Exception as e:
-            self.logger.error(f"Error creating text overlay: {e}")
+            self.logger.error(f"Error rendering overlay text: {e}")
             raise
     
     def enhance_image(self, image_path: str, style: str = "modern") -> str:
@@ -229,68 +486,26 @@ class ReelAutomationService:
             style: Enhancement style
             
         Returns:
-            Path to enhanced image
+            Path to enhanced image (cached by content and style)
         """
         try:
-            style_config = self.style_templates.get(style, self.style_templates["modern"])
-            
-            # Load image
-            img = Image.open(image_path)
-            
-            # Resize to fit reel format (9:16)
-            target_width = 1080
-            target_height = 1920
-            
-            # Calculate crop/resize dimensions
-            img_ratio = img.width / img.height
-            target_ratio = target_width / target_height
-            
-            if img_ratio > target_ratio:
-                # Image is wider, crop width
-                new_height = img.height
-                new_width = int(new_height * target_ratio)
-                left = (img.width - new_width) // 2
-                img = img.crop((left, 0, left + new_width, new_height))
-            else:
-                # Image is taller, crop height
-                new_width = img.width
-                new_height = int(new_width / target_ratio)
-                top = (img.height - new_height) // 2
-                img = img.crop((0, top, new_width, top + new_height))
-            
-            # Resize to target dimensions
-            img = img.resize((target_width, target_height), Image.Resampling.LANCZOS)
-            
-            # Apply style-specific enhancements
-            if style == "modern":
-                # Increase contrast and saturation
-                enhancer = ImageEnhance.Contrast(img)
-                img = enhancer.enhance(1.2)
-                enhancer = ImageEnhance.Color(img)
-                img = enhancer.enhance(1.1)
-            elif style == "tech":
-                # Add blue tint and increase sharpness
-                img = img.convert('RGB')
-                enhancer = ImageEnhance.Color(img)
-                img = enhancer.enhance(0.8)  # Reduce saturation
-                enhancer = ImageEnhance.Sharpness(img)
-                img = enhancer.enhance(1.3)
-            elif style == "educational":
-                # Soften and brighten
-                img = img.filter(ImageFilter.GaussianBlur(radius=0.5))
-                enhancer = ImageEnhance.Brightness(img)
-                img = enhancer.enhance(1.1)
-            
-            # Save enhanced image
-            enhanced_path = self.temp_dir / f"enhanced_{Path(image_path).name}"
-            img.save(str(enhanced_path), quality=95)
-            
-            return str(enhanced_path)
+            return self.image_enhancer.enhance(image_path, style)
             
         except Exception as e:
             self.logger.error(f"Error enhancing image: {e}")
             raise
     
+    async def prepare_media(self, plan: Dict):
+        """Enhance every image in the plan up front, in parallel"""
+        images = [item for item in plan["media"] if item["kind"] == "image"]
+        if not images:
+            return
+        enhanced = await self.image_enhancer.enhance_many(
+            [item["path"] for item in images], plan["style"], plan["size"]
+        )
+        for item, enhanced_path in zip(images, enhanced):
+            item["enhanced_path"] = enhanced_path
+    
     async def create_reel(
         self,
         project_data: Dict,
@@ -300,119 +515,801 @@ class ReelAutomationService:
         Create complete reel with voice narration and media
         
         Args:
-            project_data: Project configuration
+            project_data: Project configuration (see render_reel)
             media_files: List of media file paths
             
         Returns:
             Path to generated reel video
         """
+        result = await self.render_reel(project_data, media_files)
+        return result["video_path"]
+    
+    async def render_reel(
+        self,
+        project_data: Dict,
+        media_files: List[str] = None
+    ) -> Dict:
+        """
+        Create a reel and its preview images in a single render pass
+        
+        Finished reels are kept in the artifact store under a digest of
+        their inputs; a repeat request links the stored files instead of
+        rendering again.
+        
+        Args:
+            project_data: Project configuration (renderEngine selects
+                "moviepy" or "ffmpeg", renderProfile "draft", "standard"
+                or "final", previewFrames the sprite sheet size)
+            media_files: List of media file paths
+            
+        Returns:
+            Dict with video_path, thumbnail_path, sprite_path and
+            sprite_times (paths are empty when a preview was not captured)
+        
+        The ffmpeg engine draws captions as one ASS subtitle track when its
+        build has libass (captionEngine "ass", the default), else as
+        overlay sprites.
+        """
         try:
             self.logger.info(f"Creating reel: {project_data.get('name', 'Untitled')}")
             
             # Extract configuration
             script = project_data.get('script', '')
-            duration = project_data.get('duration', 30)
             voice_type = project_data.get('voiceType', 'natural')
-            style = project_data.get('style', 'modern')
-            music_type = project_data.get('musicType', 'none')
             
             # Generate voice narration
-            audio_path = await self.generate_voice_narration(script, voice_type)
+            narration = await self.create_narration(script, voice_type)
             
             # Get audio duration to sync with video
-            audio_clip = AudioFileClip(audio_path)
-            actual_duration = min(audio_clip.duration, duration)
-            
-            clips = []
-            
-            # Process media files if provided
-            if media_files:
-                for i, media_file in enumerate(media_files):
-                    if media_file.lower().endswith(('.jpg', '.jpeg', '.png', '.gif')):
-                        # Image processing
-                        enhanced_path = self.enhance_image(media_file, style)
-                        img_clip = ImageClip(enhanced_path)
-                        img_clip = img_clip.set_duration(actual_duration / len(media_files))
-                        clips.append(img_clip)
-                    elif media_file.lower().endswith(('.mp4', '.mov', '.avi')):
-                        # Video processing
-                        vid_clip = VideoFileClip(media_file)
-                        vid_clip = vid_clip.resize((1080, 1920))
-                        vid_clip = vid_clip.set_duration(actual_duration / len(media_files))
-                        clips.append(vid_clip)
-            
-            # If no media files, create background
-            if not clips:
-                style_config = self.style_templates[style]
-                bg_clip = ColorClip(
-                    size=(1080, 1920), 
-                    color=style_config["bg_color"], 
-                    duration=actual_duration
-                )
-                clips.append(bg_clip)
+            audio_info = await asyncio.to_thread(probe_media, narration["audio_path"])
+            audio_duration = audio_info["duration"]
+            
+            plan = self.build_render_plan(project_data, media_files or [], narration, audio_duration)
+            await self.prepare_media(plan)
+            
+            engine = project_data.get('renderEngine', self.render_settings["engine"])
+            if engine == "ffmpeg":
+                unsupported = self.ffmpeg_unsupported(plan)
+                if unsupported:
+                    self.logger.info(f"Falling back to MoviePy: {unsupported}")
+                    engine = "moviepy"
+            captions = project_data.get('captionEngine', self.render_settings["caption_engine"])
+            if captions == "ass" and not (engine == "ffmpeg" and ass_supported(self.render_settings["ffmpeg_binary"])):
+                captions = "sprites"
+            plan["captions"] = captions
+            preview_frames = project_data.get('previewFrames', self.render_settings["preview_frames"])
+            
+            # Identical inputs map to the same stored reel, so a repeat request is not re-rendered
+            store = get_artifact_store()
+            reel_key = await asyncio.to_thread(self.reel_key, plan, engine, preview_frames)
+            parts = {"video_path": ".mp4", "thumbnail_path": "_thumbnail.jpg"}
+            if preview_frames:
+                parts["sprite_path"] = "_sprites.jpg"
+            part_keys = {part: store.make_key("reel", reel=reel_key, part=part) for part in parts}
+            objects = {part: store.lookup(key) for part, key in part_keys.items()}
+            
+            if all(objects.values()):
+                self.logger.info(f"Reusing stored render {reel_key[:16]}")
+                sprite_times = [
+                    round(capture["time"], 3)
+                    for capture in self.plan_captures(plan, self.temp_dir, preview_frames)[1:]
+                ]
+            else:
+                with tempfile.TemporaryDirectory(dir=self.temp_dir) as work_dir:
+                    plan["output_path"] = str(Path(work_dir) / "reel.mp4")
+                    # Preview frames are grabbed from the frames the export already produces
+                    plan["captures"] = self.plan_captures(plan, Path(work_dir), preview_frames)
+                    await self.render_plan(plan, engine, project_data.get(
+                        'parallelSegments', self.render_settings["parallel_segments"]
+                    ))
+                    previews = await asyncio.to_thread(self.build_previews, plan)
+                    
+                    rendered = {"video_path": plan["output_path"], **previews}
+                    for part, key in part_keys.items():
+                        if rendered[part]:
+                            objects[part] = await asyncio.to_thread(store.publish, rendered[part], key)
+                sprite_times = previews["sprite_times"]
+            
+            base_path = str(self.output_dir / f"{plan['name']}_{reel_key[:16]}")
+            result = {"video_path": "", "thumbnail_path": "", "sprite_path": "", "sprite_times": sprite_times}
+            for part, suffix in parts.items():
+                if objects[part]:
+                    result[part] = store.materialize(objects[part], base_path + suffix)
+            
+            self.logger.info(f"Reel created successfully: {result['video_path']}")
+            return result
+            
+        except Exception as e:
+            self.logger.error(f"Error creating reel: {e}")
+            raise
+    
+    def reel_key(self, plan: Dict, engine: str, preview_frames: int) -> str:
+        """Stable key for a finished reel: its picture, narration audio and preview settings"""
+        return get_artifact_store().make_key(
+            "reel",
+            picture=self.segment_fingerprint(plan, engine),
+            audio=self.media_digest(plan["audio_path"]) if plan["audio_path"] else None,
+            audio_bitrate=plan["profile"]["audio_bitrate"],
+            previews=[preview_frames, self.render_settings["preview_width"], self.render_settings["sprite_columns"]]
+        )
+    
+    def plan_captures(self, plan: Dict, capture_dir: Path, sprite_frames: int = 0) -> List[Dict]:
+        """
+        Pick the timeline points to capture during export
+        
+        The first capture is the thumbnail frame (25% in); the rest are
+        evenly spaced sprite sheet frames.
+        """
+        duration = plan["duration"]
+        last_frame = max(0.0, duration - 1.0 / plan["fps"])
+        times = [duration * 0.25] + [(i + 0.5) * duration / sprite_frames for i in range(sprite_frames)]
+        return [
+            {"time": min(t, last_frame), "path": str(capture_dir / f"capture_{i:03d}.png")}
+            for i, t in enumerate(times)
+        ]
+    
+    def preview_size(self, plan: Dict) -> tuple:
+        width, height = plan["size"]
+        preview_width = self.render_settings["preview_width"]
+        return preview_width, max(2, round(height * preview_width / width / 2) * 2)
+    
+    def frame_capturer(self, plan: Dict):
+        """MoviePy frame filter that saves the planned captures as frames go by"""
+        pending = sorted(plan["captures"], key=lambda capture: capture["time"])
+        size = self.preview_size(plan)
+        
+        def capture(get_frame, t):
+            frame = get_frame(t)
+            while pending and pending[0]["time"] <= t + 1e-6:
+                target = pending.pop(0)
+                Image.fromarray(frame.astype('uint8')).resize(size, Image.Resampling.LANCZOS).save(target["path"])
+            return frame
+        
+        return capture
+    
+    def build_previews(self, plan: Dict) -> Dict:
+        """Turn captured frames into the thumbnail JPEG and an optional sprite sheet"""
+        captures = plan.get("captures") or []
+        base_path = plan["output_path"].replace('.mp4', '')
+        previews = {"thumbnail_path": "", "sprite_path": "", "sprite_times": []}
+        
+        if captures and os.path.exists(captures[0]["path"]):
+            thumbnail = Image.open(captures[0]["path"]).convert('RGB')
+            thumbnail.thumbnail((300, 533), Image.Resampling.LANCZOS)
+            previews["thumbnail_path"] = f"{base_path}_thumbnail.jpg"
+            thumbnail.save(previews["thumbnail_path"], quality=85)
+        
+        frames = [capture for capture in captures[1:] if os.path.exists(capture["path"])]
+        if frames:
+            images = [Image.open(capture["path"]).convert('RGB') for capture in frames]
+            tile_width, tile_height = images[0].size
+            columns = min(len(images), self.render_settings["sprite_columns"])
+            rows = -(-len(images) // columns)
+            sheet = Image.new('RGB', (columns * tile_width, rows * tile_height))
+            for i, image in enumerate(images):
+                sheet.paste(image, ((i % columns) * tile_width, (i // columns) * tile_height))
+            previews["sprite_path"] = f"{base_path}_sprites.jpg"
+            sheet.save(previews["sprite_path"], quality=80)
+            previews["sprite_times"] = [round(capture["time"], 3) for capture in frames]
+        
+        return previews
+    
+    async def render_plan(self, plan: Dict, engine: str, parallel: bool = True):
+        """
+        Render a plan, segment-parallel when possible
+        
+        Falls back from segmented to single-pass rendering, and from the
+        ffmpeg engine to MoviePy, when a step fails. With the segment cache
+        on, the timeline is segmented even when not rendering in parallel so
+        unchanged segments can be reused.
+        
+        Args:
+            plan: Plan from build_render_plan
+            engine: "ffmpeg" or "moviepy"
+            parallel: Split the timeline into concurrently encoded segments
+        """
+        segmented = parallel or self.render_settings["segment_cache"]
+        if segmented and shutil.which(self.render_settings["ffmpeg_binary"]):
+            segments = self.split_plan(plan)
+            if len(segments) > 1:
+                workers = self.render_settings["render_workers"] if parallel else 1
+                try:
+                    await self.render_segmented(plan, segments, engine, workers)
+                    return
+                except Exception as e:
+                    self.logger.warning(f"Segmented render failed, rendering in one pass: {e}")
+        
+        if engine == "ffmpeg":
+            try:
+                await self.render_with_ffmpeg(plan)
+                return
+            except Exception as e:
+                self.logger.warning(f"ffmpeg render failed, falling back to MoviePy: {e}")
+        
+        await asyncio.to_thread(self.render_with_moviepy, plan)
+    
+    def split_plan(self, plan: Dict) -> List[Dict]:
+        """
+        Cut a plan into independently renderable, silent segments
+        
+        Scene boundaries are the media slot edges; a single-scene timeline
+        is cut into chunks of at least min_segment_seconds (exactly that
+        long with the segment cache on, so boundaries survive edits).
+        Boundaries are snapped to whole frames so the joined video keeps
+        its timing.
+        
+        Args:
+            plan: Plan from build_render_plan
+            
+        Returns:
+            Segment plans with timeline-relative media and overlays
+        """
+        fps = plan["fps"]
+        duration = plan["duration"]
+        min_seconds = self.render_settings["min_segment_seconds"]
+        
+        media_windows = []
+        cursor = 0.0
+        for item in plan["media"]:
+            media_windows.append((cursor, cursor + item["duration"], item))
+            cursor += item["duration"]
+        
+        if len(media_windows) > 1:
+            edges = [start for start, _, _ in media_windows[1:]]
+        elif self.render_settings["segment_cache"]:
+            edges = [min_seconds * i for i in range(1, int(duration // min_seconds))]
+        else:
+            count = min(self.render_settings["render_workers"], int(duration // min_seconds))
+            edges = [duration * i / count for i in range(1, count)] if count > 1 else []
+        
+        bounds = [0.0] + [round(edge * fps) / fps for edge in edges] + [duration]
+        segments = []
+        for start, end in zip(bounds, bounds[1:]):
+            if end - start < 1.0 / fps:
+                continue
+            
+            media = []
+            for item_start, item_end, item in media_windows:
+                overlap = min(item_end, end) - max(item_start, start)
+                if overlap > 0:
+                    offset = item.get("offset", 0.0) + max(0.0, start - item_start)
+                    media.append({**item, "duration": overlap, "offset": offset})
             
-            # Concatenate or composite clips
-            if len(clips) == 1:
-                main_clip = clips[0]
+            overlays = []
+            for overlay in plan["overlays"]:
+                overlay_start = max(overlay["start"], start)
+                overlay_end = min(overlay["start"] + overlay["duration"], end)
+                if overlay_end > overlay_start:
+                    # The uncut span, segment-relative, tells caption fades which edges are real
+                    span_start, span_end = overlay.get(
+                        "span", (overlay["start"], overlay["start"] + overlay["duration"])
+                    )
+                    overlays.append({
+                        **overlay,
+                        "start": overlay_start - start,
+                        "duration": overlay_end - overlay_start,
+                        "span": (span_start - start, span_end - start)
+                    })
+            
+            segments.append({
+                **plan,
+                "timeline_start": start,
+                "duration": end - start,
+                "media": media,
+                "overlays": overlays,
+                "captures": [],
+                "audio_path": None
+            })
+        
+        return segments
+    
+    async def render_segmented(self, plan: Dict, segments: List[Dict], engine: str, workers: int):
+        """
+        Encode segments, then join them by stream copy and mux the audio once
+        
+        Segments whose fingerprint is already in the artifact store are not
+        re-encoded; their preview captures are read back from the cached file.
+        
+        Args:
+            plan: Plan from build_render_plan
+            segments: Segment plans from split_plan
+            engine: "ffmpeg" or "moviepy"
+            workers: Segments encoded at the same time
+        """
+        with tempfile.TemporaryDirectory(dir=self.temp_dir) as work_dir:
+            # Split the profile's encoder threads between concurrent segments
+            workers = min(len(segments), workers)
+            threads = max(1, plan["profile"]["threads"] // workers)
+            for i, segment in enumerate(segments):
+                segment["output_path"] = str(Path(work_dir) / f"segment_{i:03d}.mp4")
+                segment["profile"] = {**plan["profile"], "threads": threads}
+                if self.render_settings["segment_cache"]:
+                    segment["cache_key"] = await asyncio.to_thread(self.segment_fingerprint, segment, engine)
+                    segment["cache_path"] = get_artifact_store().lookup(segment["cache_key"])
+            
+            # Each capture is taken by the segment that renders its frame
+            for capture in plan.get("captures") or []:
+                owner = segments[-1]
+                for segment in segments:
+                    if capture["time"] < segment["timeline_start"] + segment["duration"]:
+                        owner = segment
+                        break
+                owner["captures"].append({**capture, "time": capture["time"] - owner["timeline_start"]})
+            
+            cached, pending = [], []
+            for segment in segments:
+                (cached if segment.get("cache_path") else pending).append(segment)
+            self.logger.info(
+                f"Rendering {len(pending)} of {len(segments)} segments with {engine} ({len(cached)} reused)"
+            )
+            
+            if pending and engine == "ffmpeg":
+                semaphore = asyncio.Semaphore(workers)
+                
+                async def encode(segment: Dict):
+                    async with semaphore:
+                        await self.render_with_ffmpeg(segment)
+                
+                await asyncio.gather(*(encode(segment) for segment in pending))
+            elif workers > 1 and len(pending) > 1:
+                loop = asyncio.get_running_loop()
+                pool = self.get_render_pool()
+                await asyncio.gather(*(
+                    loop.run_in_executor(pool, render_moviepy_segment, os.path.abspath(__file__), segment)
+                    for segment in pending
+                ))
             else:
-                main_clip = concatenate_videoclips(clips)
+                for segment in pending:
+                    await asyncio.to_thread(self.render_with_moviepy, segment)
+            
+            for segment in cached:
+                await self.capture_from_segment(segment)
+            for segment in pending:
+                if segment.get("cache_key"):
+                    segment["cache_path"] = await asyncio.to_thread(
+                        get_artifact_store().publish, segment["output_path"], segment["cache_key"]
+                    )
+            
+            await self.concat_segments(
+                plan, [segment.get("cache_path") or segment["output_path"] for segment in segments], Path(work_dir)
+            )
+    
+    def media_digest(self, path: str) -> str:
+        """Content digest of a media file, remembered while its size and mtime are unchanged"""
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        key = (path, stat.st_size, stat.st_mtime_ns)
+        if key not in self.digest_cache:
+            self.digest_cache[key] = file_digest(path)
+        return self.digest_cache[key]
+    
+    def segment_fingerprint(self, segment: Dict, engine: str) -> str:
+        """
+        Stable hash of everything that determines a segment's encoded video
+        
+        Covers source media content, slot timing, overlay text and timing,
+        style, font, frame size and rate, encoder settings and engine.
+        Captures, encoder threads and the segment's place in the timeline
+        do not change the pixels and are left out.
+        """
+        def seconds(value: float) -> float:
+            return round(value, 3)
+        
+        payload = {
+            "engine": engine,
+            "image_pipeline": PIPELINE_VERSION,
+            "size": list(segment["size"]),
+            "fps": segment["fps"],
+            "duration": seconds(segment["duration"]),
+            "style": self.style_templates[segment["style"]],
+            "font": self.overlay_font_path,
+            "captions": segment.get("captions", "sprites"),
+            "caption_font": self.render_settings["caption_font"],
+            "encoder": {key: segment["profile"][key] for key in ("preset", "crf")},
+            "media": [
+                {
+                    "digest": self.media_digest(item["path"]),
+                    "kind": item["kind"],
+                    "duration": seconds(item["duration"]),
+                    "offset": seconds(item.get("offset", 0.0))
+                }
+                for item in segment["media"]
+            ],
+            "overlays": [
+                {
+                    "text": overlay["text"],
+                    "position": overlay["position"],
+                    "start": seconds(overlay["start"]),
+                    "duration": seconds(overlay["duration"]),
+                    "span": [seconds(edge) for edge in overlay["span"]] if overlay.get("span") else None
+                }
+                for overlay in segment["overlays"]
+            ]
+        }
+        return get_artifact_store().make_key("reel_segment", **payload)
+    
+    async def capture_from_segment(self, segment: Dict):
+        """Read a reused segment's preview captures back out of its cached file"""
+        width, height = self.preview_size(segment)
+        for capture in segment["captures"]:
+            await self.run_ffmpeg([
+                self.render_settings["ffmpeg_binary"], "-y", "-hide_banner", "-loglevel", "error",
+                "-ss", f"{capture['time']:.3f}", "-i", segment["cache_path"],
+                "-frames:v", "1", "-vf", f"scale={width}:{height}", capture["path"]
+            ])
+    
+    async def concat_segments(self, plan: Dict, segment_paths: List[str], work_dir: Path):
+        """Join encoded segments with the concat demuxer (no re-encode) and add the narration"""
+        list_path = work_dir / "segments.txt"
+        with open(list_path, "w") as f:
+            for path in segment_paths:
+                escaped = path.replace("'", "'\\''")
+                f.write(f"file '{escaped}'\n")
+        
+        command = [
+            self.render_settings["ffmpeg_binary"], "-y", "-hide_banner", "-loglevel", "error",
+            "-f", "concat", "-safe", "0", "-i", str(list_path)
+        ]
+        if plan["audio_path"]:
+            command += [
+                "-i", plan["audio_path"], "-map", "0:v", "-map", "1:a",
+                "-c:a", "aac", "-b:a", plan["profile"]["audio_bitrate"]
+            ]
+        command += [
+            "-c:v", "copy",
+            "-t", f"{plan['duration']:.3f}",
+            "-movflags", "+faststart",
+            plan["output_path"]
+        ]
+        await self.run_ffmpeg(command)
+    
+    async def run_ffmpeg(self, command: List[str]):
+        """Run an ffmpeg command, raising with its stderr tail on failure"""
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE
+        )
+        _, stderr = await process.communicate()
+        if process.returncode != 0:
+            raise RuntimeError(f"ffmpeg exited with {process.returncode}: {stderr.decode(errors='replace')[-500:]}")
+    
+    def get_render_pool(self) -> ProcessPoolExecutor:
+        """Process pool for MoviePy segment renders, created on first use"""
+        if self.render_pool is None:
+            self.render_pool = ProcessPoolExecutor(
+                max_workers=self.render_settings["render_workers"],
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self.render_pool
+    
+    def build_render_plan(
+        self,
+        project_data: Dict,
+        media_files: List[str],
+        narration: Dict,
+        audio_duration: float
+    ) -> Dict:
+        """
+        Describe the reel timeline independently of the render engine
+        
+        Args:
+            project_data: Project configuration
+            media_files: List of media file paths
+            narration: Result of create_narration
+            audio_duration: Length of the narration audio in seconds
             
-            # Add text overlays with script segments
+        Returns:
+            Plan with media, overlay and audio timing for a renderer;
+            the caller sets output_path
+        """
+        script = project_data.get('script', '')
+        duration = project_data.get('duration', 30)
+        style = project_data.get('style', 'modern')
+        if style not in self.style_templates:
+            style = "modern"
+        actual_duration = min(audio_duration, duration)
+        
+        # Process media files if provided
+        media = []
+        for media_file in media_files:
+            if media_file.lower().endswith(('.jpg', '.jpeg', '.png', '.gif')):
+                kind = "image"
+            elif media_file.lower().endswith(('.mp4', '.mov', '.avi')):
+                kind = "video"
+            else:
+                continue
+            media.append({"path": media_file, "kind": kind})
+        for item in media:
+            item["duration"] = actual_duration / len(media_files)
+        
+        # Add text overlays with script segments
+        positions = ["bottom", "center", "top"]
+        overlays = []
+        if narration["segments"]:
+            # Show each sentence while it is being spoken
+            for i, segment in enumerate(narration["segments"]):
+                if segment["start"] >= actual_duration:
+                    break
+                overlays.append({
+                    "text": segment["text"],
+                    "position": positions[i % len(positions)],
+                    "start": segment["start"],
+                    "duration": min(segment["end"], actual_duration) - segment["start"]
+                })
+        else:
             words = script.split()
             words_per_segment = max(1, len(words) // 3)  # 3 text overlays
             segment_duration = actual_duration / 3
             
-            text_clips = []
             for i in range(3):
                 start_word = i * words_per_segment
                 end_word = min((i + 1) * words_per_segment, len(words))
                 segment_text = ' '.join(words[start_word:end_word])
                 
                 if segment_text.strip():
-                    text_overlay = self.create_text_overlay(
-                        segment_text, 
-                        style=style,
-                        position="bottom" if i == 0 else ("center" if i == 1 else "top")
-                    )
-                    text_overlay = text_overlay.set_duration(segment_duration)
-                    text_overlay = text_overlay.set_start(i * segment_duration)
-                    text_clips.append(text_overlay)
-            
-            # Composite all elements
-            if text_clips:
-                final_clip = CompositeVideoClip([main_clip] + text_clips)
+                    overlays.append({
+                        "text": segment_text,
+                        "position": positions[i],
+                        "start": i * segment_duration,
+                        "duration": segment_duration
+                    })
+        
+        # Output name stem; previews never overwrite full-quality exports
+        profile = get_render_profile(project_data.get('renderProfile'))
+        project_name = project_data.get('name', 'reel').replace(' ', '_')
+        profile_suffix = "" if profile["name"] == "standard" else f"_{profile['name']}"
+        
+        return {
+            "size": scaled_size((1080, 1920), profile),
+            "fps": profile_fps(profile, 30),
+            "profile": profile,
+            "style": style,
+            "duration": actual_duration,
+            "media": media,
+            "overlays": overlays,
+            "audio_path": narration["audio_path"],
+            "name": f"{project_name}{profile_suffix}"
+        }
+    
+    def render_with_moviepy(self, plan: Dict):
+        """Composite the plan frame by frame with MoviePy and export it"""
+        size = plan["size"]
+        audio_clip = AudioFileClip(plan["audio_path"]) if plan["audio_path"] else None
+        
+        clips = []
+        for item in plan["media"]:
+            if item["kind"] == "image":
+                # Image processing
+                enhanced_path = item.get("enhanced_path") or self.enhance_image(item["path"], plan["style"])
+                img_clip = ImageClip(enhanced_path)
+                img_clip = img_clip.set_duration(item["duration"])
+                clips.append(img_clip)
             else:
-                final_clip = main_clip
-            
-            # Add audio
-            final_clip = final_clip.set_audio(audio_clip)
-            
-            # Generate output filename
-            project_name = project_data.get('name', 'reel').replace(' ', '_')
-            output_filename = f"{project_name}_{hash(script)}.mp4"
-            output_path = self.output_dir / output_filename
-            
-            # Export video
-            self.logger.info(f"Exporting reel to: {output_path}")
-            final_clip.write_videofile(
-                str(output_path),
-                fps=30,
-                codec='libx264',
-                audio_codec='aac',
-                temp_audiofile=str(self.temp_dir / 'temp_audio.m4a'),
-                remove_temp=True
+                # Video processing
+                vid_clip = VideoFileClip(item["path"])
+                if item.get("offset"):
+                    vid_clip = vid_clip.subclip(item["offset"])
+                vid_clip = vid_clip.resize(size)
+                vid_clip = vid_clip.set_duration(item["duration"])
+                clips.append(vid_clip)
+        
+        # If no media files, create background
+        if not clips:
+            style_config = self.style_templates[plan["style"]]
+            bg_clip = ColorClip(
+                size=size, 
+                color=style_config["bg_color"], 
+                duration=plan["duration"]
             )
-            
-            # Cleanup
+            clips.append(bg_clip)
+        
+        # Concatenate or composite clips
+        if len(clips) == 1:
+            main_clip = clips[0]
+        else:
+            main_clip = concatenate_videoclips(clips)
+        
+        text_clips = []
+        for overlay in plan["overlays"]:
+            text_overlay = self.create_text_overlay(
+                overlay["text"],
+                size=size,
+                style=plan["style"],
+                position=overlay["position"]
+            )
+            text_overlay = text_overlay.set_duration(overlay["duration"])
+            text_overlay = text_overlay.set_start(overlay["start"])
+            text_clips.append(text_overlay)
+        
+        # Composite all elements
+        if text_clips:
+            final_clip = CompositeVideoClip([main_clip] + text_clips)
+        else:
+            final_clip = main_clip
+        
+        if plan.get("captures"):
+            final_clip = final_clip.fl(self.frame_capturer(plan))
+        
+        # Add audio
+        if audio_clip:
+            final_clip = final_clip.set_audio(audio_clip)
+        
+        # Export video
+        self.logger.info(f"Exporting reel to: {plan['output_path']}")
+        final_clip.write_videofile(
+            plan["output_path"],
+            fps=plan["fps"],
+            audio=audio_clip is not None,
+            temp_audiofile=str(self.temp_dir / f"temp_audio_{uuid.uuid4().hex}.m4a"),
+            remove_temp=True,
+            **moviepy_write_args(plan["profile"])
+        )
+        
+        # Cleanup
+        if audio_clip:
             audio_clip.close()
-            final_clip.close()
+        final_clip.close()
+    
+    def ffmpeg_unsupported(self, plan: Dict) -> Optional[str]:
+        """Return why the ffmpeg engine cannot render a plan, or None if it can"""
+        if not shutil.which(self.render_settings["ffmpeg_binary"]):
+            return "ffmpeg binary not found"
+        for item in plan["media"]:
+            if item["path"].lower().endswith('.gif'):
+                # MoviePy shows a GIF's first frame; keep that behaviour on the MoviePy path
+                return f"GIF input: {item['path']}"
+        return None
+    
+    def build_ffmpeg_command(self, plan: Dict, work_dir: Path) -> List[str]:
+        """
+        Compile a render plan into a single ffmpeg invocation
+        
+        Media is scaled/cropped to the frame and concatenated, captions
+        are drawn from one ASS track (or overlay images composited inside
+        their enable windows), and the narration is muxed in, all in one
+        filtergraph.
+        
+        Args:
+            plan: Plan from build_render_plan
+            work_dir: Directory for the caption track or overlay images
             
-            self.logger.info(f"Reel created successfully: {output_path}")
-            return str(output_path)
+        Returns:
+            ffmpeg argument list
+        """
+        width, height = plan["size"]
+        fps = plan["fps"]
+        duration = plan["duration"]
+        inputs: List[str] = []
+        filters: List[str] = []
+        input_index = 0
+        
+        def fit(label: str, seconds: float, pad: bool) -> str:
+            chain = (
+                f"scale={width}:{height}:force_original_aspect_ratio=increase,"
+                f"crop={width}:{height},setsar=1,fps={fps},format=yuv420p"
+            )
+            if pad:
+                # Hold the last frame when a clip is shorter than its slot
+                chain += f",tpad=stop_mode=clone:stop_duration={seconds:.3f}"
+            return f"{label}{chain},trim=duration={seconds:.3f},setpts=PTS-STARTPTS"
+        
+        segments = []
+        for item in plan["media"]:
+            seconds = item["duration"]
+            if item["kind"] == "image":
+                enhanced_path = item.get("enhanced_path") or self.enhance_image(item["path"], plan["style"])
+                inputs += ["-loop", "1", "-framerate", str(fps), "-t", f"{seconds:.3f}", "-i", enhanced_path]
+                filters.append(fit(f"[{input_index}:v]", seconds, pad=False) + f"[m{input_index}]")
+            else:
+                if item.get("offset"):
+                    inputs += ["-ss", f"{item['offset']:.3f}"]
+                inputs += ["-t", f"{seconds:.3f}", "-i", item["path"]]
+                filters.append(fit(f"[{input_index}:v]", seconds, pad=True) + f"[m{input_index}]")
+            segments.append(f"[m{input_index}]")
+            input_index += 1
+        
+        if not segments:
+            r, g, b = self.style_templates[plan["style"]]["bg_color"]
+            inputs += [
+                "-f", "lavfi",
+                "-i", f"color=c=0x{r:02x}{g:02x}{b:02x}:s={width}x{height}:r={fps}:d={duration:.3f}"
+            ]
+            filters.append(f"[{input_index}:v]format=yuv420p[base]")
+            input_index += 1
+        elif len(segments) == 1:
+            filters.append(f"{segments[0]}null[base]")
+        else:
+            filters.append(f"{''.join(segments)}concat=n={len(segments)}:v=1:a=0[base]")
+        
+        current = "[base]"
+        if plan.get("captions") == "ass" and plan["overlays"]:
+            # All captions in one subtitle track, drawn by libass in a single filter
+            ass_path = work_dir / "captions.ass"
+            events = [
+                {
+                    "text": overlay["text"],
+                    "start": overlay["start"],
+                    "end": overlay["start"] + overlay["duration"],
+                    "position": overlay["position"],
+                    "span": overlay.get("span")
+                }
+                for overlay in plan["overlays"]
+            ]
+            ass_path.write_text(build_ass(events, plan["size"], self.caption_style(plan)), encoding="utf-8")
+            filters.append(f"{current}ass={filter_path(str(ass_path))}[subs]")
+            current = "[subs]"
+        else:
+            for i, overlay in enumerate(plan["overlays"]):
+                image_path = work_dir / f"overlay_{i}.png"
+                sprite, (x, y) = self.render_text_sprite(
+                    overlay["text"], plan["size"], plan["style"], overlay["position"]
+                )
+                sprite.save(image_path)
+                inputs += ["-i", str(image_path)]
+                start = overlay["start"]
+                end = start + overlay["duration"]
+                filters.append(
+                    f"{current}[{input_index}:v]overlay={x}:{y}:enable='between(t,{start:.3f},{end:.3f})'[v{i}]"
+                )
+                current = f"[v{i}]"
+                input_index += 1
+        
+        # Preview captures branch off the finished frames inside the same graph
+        captures = plan.get("captures") or []
+        capture_outputs: List[str] = []
+        if captures:
+            preview_width, preview_height = self.preview_size(plan)
+            branches = "".join(f"[capsrc{i}]" for i in range(len(captures)))
+            filters.append(f"{current}split={len(captures) + 1}[final]{branches}")
+            for i, capture in enumerate(captures):
+                filters.append(
+                    f"[capsrc{i}]select='gte(t,{capture['time']:.3f})',"
+                    f"scale={preview_width}:{preview_height}[cap{i}]"
+                )
+                capture_outputs += ["-map", f"[cap{i}]", "-frames:v", "1", "-update", "1", capture["path"]]
+            current = "[final]"
+        
+        if plan["audio_path"]:
+            inputs += ["-i", plan["audio_path"]]
+            audio_args = ["-map", f"{input_index}:a", "-c:a", "aac", "-b:a", plan["profile"]["audio_bitrate"]]
+        else:
+            audio_args = ["-an"]
+        
+        return [
+            self.render_settings["ffmpeg_binary"], "-y", "-hide_banner", "-loglevel", "error",
+            *inputs,
+            "-filter_complex", ";".join(filters),
+            "-map", current, *audio_args,
+            "-t", f"{duration:.3f}",
+            "-r", str(fps),
+            *ffmpeg_encoder_args(plan["profile"]),
+            "-movflags", "+faststart",
+            plan["output_path"],
+            *capture_outputs
+        ]
+    
+    def caption_style(self, plan: Dict) -> Dict:
+        """ASS caption style matching the overlay sprites' size, colour and outline"""
+        style_config = self.style_templates[plan["style"]]
+        return {
+            "font": self.render_settings["caption_font"],
+            "fontsize": max(40, plan["size"][0] // 25),
+            "bold": False,
+            "color": style_config["font_color"],
+            "outline_color": (0, 0, 0),
+            "outline_alpha": 55,
+            "outline": 2,
+            "margin_v": 100
+        }
+    
+    async def render_with_ffmpeg(self, plan: Dict):
+        """Render the plan natively with one ffmpeg filtergraph"""
+        with tempfile.TemporaryDirectory(dir=self.temp_dir) as work_dir:
+            command = await asyncio.to_thread(self.build_ffmpeg_command, plan, Path(work_dir))
             
-        except Exception as e:
-            self.logger.error(f"Error creating reel: {e}")
-            raise
+            self.logger.info(f"Exporting reel with ffmpeg to: {plan['output_path']}")
+            await self.run_ffmpeg(command)
     
     def generate_thumbnail(self, video_path: str) -> str:
         """
@@ -425,11 +1322,17 @@ class ReelAutomationService:
             Path to thumbnail image
         """
         try:
-            # Load video and extract frame
-            clip = VideoFileClip(video_path)
+            frame_time = probe_media(video_path)["duration"] * 0.25
+            thumbnail_path = video_path.replace('.mp4', '_thumbnail.jpg')
+            
+            if shutil.which(self.render_settings["ffmpeg_binary"]):
+                try:
+                    return self.extract_keyframe(video_path, frame_time, thumbnail_path)
+                except Exception as e:
+                    self.logger.warning(f"Keyframe extraction failed, decoding instead: {e}")
             
-            # Get frame at 25% of video duration
-            frame_time = clip.duration * 0.25
+            # Get frame at 25% of video duration, opening only the video stream
+            clip = VideoFileClip(video_path, audio=False)
             frame = clip.get_frame(frame_time)
             
             # Convert to PIL Image
@@ -439,7 +1342,6 @@ class ReelAutomationService:
             thumbnail.thumbnail((300, 533), Image.Resampling.LANCZOS)
             
             # Save thumbnail
-            thumbnail_path = video_path.replace('.mp4', '_thumbnail.jpg')
             thumbnail.save(thumbnail_path, quality=85)
             
             clip.close()
@@ -449,6 +1351,24 @@ class ReelAutomationService:
             self.logger.error(f"Error generating thumbnail: {e}")
             return ""
     
+    def extract_keyframe(self, video_path: str, frame_time: float, output_path: str) -> str:
+        """Save the keyframe at or before frame_time as a thumbnail, decoding keyframes only"""
+        result = subprocess.run(
+            [
+                self.render_settings["ffmpeg_binary"], "-y", "-hide_banner", "-loglevel", "error",
+                "-skip_frame", "nokey", "-noaccurate_seek", "-ss", f"{frame_time:.3f}",
+                "-i", video_path,
+                "-frames:v", "1",
+                "-vf", "scale=300:533:force_original_aspect_ratio=decrease",
+                "-q:v", "3",
+                output_path
+            ],
+            capture_output=True, text=True, timeout=60
+        )
+        if result.returncode != 0 or not os.path.exists(output_path):
+            raise RuntimeError(result.stderr.strip()[-300:] or "no frame extracted")
+        return output_path
+    
     async def process_reel_request(self, request_data: Dict) -> Dict:
         """
         Main entry point for reel processing requests
@@ -463,16 +1383,20 @@ class ReelAutomationService:
             project_data = request_data.get('project', {})
             media_files = request_data.get('media_files', [])
             
-            # Create the reel
-            video_path = await self.create_reel(project_data, media_files)
+            # Create the reel; the thumbnail is captured during the render
+            reel = await self.render_reel(project_data, media_files)
+            video_path = reel["video_path"]
             
-            # Generate thumbnail
-            thumbnail_path = self.generate_thumbnail(video_path)
+            thumbnail_path = reel["thumbnail_path"]
+            if not thumbnail_path:
+                thumbnail_path = await asyncio.to_thread(self.generate_thumbnail, video_path)
             
             return {
                 "success": True,
                 "video_path": video_path,
                 "thumbnail_path": thumbnail_path,
+                "sprite_path": reel["sprite_path"],
+                "sprite_times": reel["sprite_times"],
                 "duration": project_data.get('duration', 30),
                 "message": "Reel created successfully with AI voice narration"
             }
@@ -484,12 +1408,181 @@ class ReelAutomationService:
                 "error": str(e),
                 "message": "Failed to create reel"
             }
+    
+    async def process_reel_batch(
+        self,
+        requests: List[Dict],
+        max_concurrent: Optional[int] = None,
+        on_progress: Optional[Callable[[str, str, Dict], None]] = None
+    ) -> AsyncIterator[Dict]:
+        """
+        Render many reel requests, streaming each result as it completes
+        
+        Shared narration and images are produced once for the whole batch,
+        then renders run with concurrency sized to CPU cores and memory.
+        
+        Args:
+            requests: Requests shaped like process_reel_request input,
+                each optionally carrying an "id"
+            max_concurrent: Cap on simultaneous renders (default: batch_concurrency())
+            on_progress: Called as on_progress(job_id, stage, detail) with stages
+                queued, preparing, rendering, done and failed
+            
+        Yields:
+            process_reel_request results tagged with job_id and index
+        """
+        jobs = [
+            {"id": str(request.get("id") or f"job_{i}"), "index": i, "request": request}
+            for i, request in enumerate(requests)
+        ]
+        limit = max(1, max_concurrent or self.batch_concurrency())
+        self.logger.info(f"Rendering batch of {len(jobs)} reels, {limit} at a time")
+        
+        def report(job: Dict, stage: str, detail: Optional[Dict] = None):
+            job["stage"] = stage
+            if on_progress:
+                try:
+                    on_progress(job["id"], stage, detail or {})
+                except Exception as e:
+                    self.logger.warning(f"Progress callback failed: {e}")
+        
+        for job in jobs:
+            report(job, "queued")
+        
+        await self.prepare_shared_assets(jobs, report)
+        
+        semaphore = asyncio.Semaphore(limit)
+        completed: asyncio.Queue = asyncio.Queue()
+        
+        async def run(job: Dict):
+            async with semaphore:
+                await self.wait_for_memory()
+                request = job["request"]
+                project = dict(request.get('project', {}))
+                if limit > 1:
+                    # Jobs already occupy the cores; splitting each one further only adds contention
+                    project.setdefault('parallelSegments', False)
+                
+                report(job, "rendering")
+                self.active_renders += 1
+                try:
+                    result = await self.process_reel_request({**request, "project": project})
+                finally:
+                    self.active_renders -= 1
+                
+                report(job, "done" if result["success"] else "failed", {
+                    key: result[key] for key in ("video_path", "error") if key in result
+                })
+                await completed.put({**result, "job_id": job["id"], "index": job["index"]})
+        
+        tasks = [asyncio.create_task(run(job)) for job in jobs]
+        try:
+            for _ in jobs:
+                yield await completed.get()
+        finally:
+            # Consumer stopped early (or finished): don't leave renders running unobserved
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+    
+    async def prepare_shared_assets(self, jobs: List[Dict], report: Callable):
+        """Synthesize each distinct narration and enhance each distinct image once per batch"""
+        narrations: Dict[tuple, List[Dict]] = {}
+        images: Dict[tuple, set] = {}
+        
+        for job in jobs:
+            report(job, "preparing")
+            request = job["request"]
+            project = request.get('project', {})
+            narrations.setdefault((project.get('script', ''), project.get('voiceType', 'natural')), []).append(job)
+            
+            style = project.get('style', 'modern')
+            if style not in self.style_templates:
+                style = "modern"
+            size = scaled_size((1080, 1920), get_render_profile(project.get('renderProfile')))
+            images.setdefault((style, size), set()).update(
+                path for path in request.get('media_files', [])
+                if path.lower().endswith(('.jpg', '.jpeg', '.png', '.gif'))
+            )
+        
+        semaphore = asyncio.Semaphore(self.narration_settings["max_concurrency"])
+        
+        async def narrate(script: str, voice_type: str):
+            async with semaphore:
+                try:
+                    # Lands in the TTS cache; each job's render then reuses it
+                    await self.create_narration(script, voice_type)
+                except Exception as e:
+                    # The job's own render retries and reports the failure
+                    self.logger.warning(f"Shared narration failed: {e}")
+        
+        await asyncio.gather(*(narrate(script, voice) for script, voice in narrations))
+        
+        for (style, size), paths in images.items():
+            if not paths:
+                continue
+            try:
+                await self.image_enhancer.enhance_many(sorted(paths), style, size)
+            except Exception as e:
+                self.logger.warning(f"Shared image enhancement failed: {e}")
+        
+        self.logger.info(
+            f"Prepared {len(narrations)} narrations and "
+            f"{sum(len(paths) for paths in images.values())} images for {len(jobs)} jobs"
+        )
+    
+    def batch_concurrency(self) -> int:
+        """Simultaneous renders the host can take, from CPU cores and available memory"""
+        slots = max(1, (os.cpu_count() or 1) // 2)
+        available = available_memory_bytes()
+        if available is not None:
+            slots = min(slots, max(1, available // self.render_settings["job_memory_bytes"]))
+        return slots
+    
+    async def wait_for_memory(self, timeout: float = 300):
+        """Hold a job back while another render runs and memory is short"""
+        deadline = time.monotonic() + timeout
+        while self.active_renders and time.monotonic() < deadline:
+            available = available_memory_bytes()
+            if available is None or available >= self.render_settings["job_memory_bytes"]:
+                return
+            await asyncio.sleep(1)
 
-# Initialize service
-reel_service = ReelAutomationService()
+
+def available_memory_bytes() -> Optional[int]:
+    """MemAvailable from /proc/meminfo, or None where it cannot be read"""
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+_reel_service: Optional[ReelAutomationService] = None
+
+def get_reel_service() -> ReelAutomationService:
+    """Process-wide service, created on first use rather than at import"""
+    global _reel_service
+    if _reel_service is None:
+        _reel_service = ReelAutomationService()
+    return _reel_service
 
 async def main():
-    """Example usage of the reel automation service"""
+    """Example usage of the reel automation service
+    
+    With a JSON file of reel requests as the argument, renders them as a
+    batch and prints one JSON result per line as each reel finishes.
+    """
+    reel_service = get_reel_service()
+    
+    if len(sys.argv) > 1:
+        with open(sys.argv[1]) as f:
+            batch_requests = json.load(f)
+        async for result in reel_service.process_reel_batch(batch_requests):
+            print(json.dumps(result), flush=True)
+        return
     
     # Example project data
     sample_project = {
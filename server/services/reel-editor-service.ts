@@ -1,7 +1,8 @@
 import OpenAI from 'openai';
-import { spawn } from 'child_process';
+import { spawn, ChildProcessWithoutNullStreams } from 'child_process';
 import fs from 'fs/promises';
 import path from 'path';
+import readline from 'readline';
 
 const openai = new OpenAI({
   apiKey: process.env.OPENAI_API_KEY,
@@ -44,6 +45,93 @@ export interface ReelProject {
   progress?: number;
 }
 
+export interface OfflineUtterance {
+  text: string;
+  path: string;
+  voice?: string;
+  rate?: number;
+  volume?: number;
+}
+
+// Long-lived offline_tts_pool.py process that keeps pyttsx3 engines warm,
+// so offline synthesis no longer pays for an interpreter and engine per call
+class OfflineTTSWorker {
+  private child: ChildProcessWithoutNullStreams | null = null;
+  private ready: Promise<void> | null = null;
+  private pending = new Map<number, { resolve: (result: any) => void; reject: (error: Error) => void }>();
+  private nextId = 1;
+
+  private start(): Promise<void> {
+    if (this.ready) {
+      return this.ready;
+    }
+
+    this.ready = new Promise((resolve, reject) => {
+      const scriptPath = path.join(process.cwd(), 'server', 'services', 'offline_tts_pool.py');
+      const child = spawn('python3', [scriptPath, '--serve']);
+      this.child = child;
+
+      const fail = (message: string) => {
+        if (this.child !== child) {
+          return;
+        }
+        const error = new Error(message);
+        reject(error);
+        for (const request of Array.from(this.pending.values())) {
+          request.reject(error);
+        }
+        this.pending.clear();
+        this.child = null;
+        this.ready = null;
+        child.kill();
+      };
+
+      readline.createInterface({ input: child.stdout }).on('line', (line) => {
+        let message: any;
+        try {
+          message = JSON.parse(line);
+        } catch {
+          return;
+        }
+        if ('ready' in message) {
+          if (message.ready) {
+            resolve();
+          } else {
+            fail(message.error || 'Offline TTS pool failed to start');
+          }
+          return;
+        }
+        const request = this.pending.get(message.id);
+        if (request) {
+          this.pending.delete(message.id);
+          request.resolve(message);
+        }
+      });
+
+      child.on('error', (error) => fail(`Offline TTS pool error: ${error.message}`));
+      child.on('exit', () => fail('Offline TTS pool exited'));
+      // Writes to a dead pool surface here (EPIPE) rather than as a thrown error
+      child.stdin.on('error', (error) => fail(`Offline TTS pool stdin error: ${error.message}`));
+    });
+    return this.ready;
+  }
+
+  async synthesize(utterances: OfflineUtterance[]): Promise<any> {
+    await this.start();
+    const id = this.nextId++;
+    return new Promise((resolve, reject) => {
+      if (!this.child) {
+        reject(new Error('Offline TTS pool exited'));
+        return;
+      }
+      this.pending.set(id, { resolve, reject });
+      this.child.stdin.write(JSON.stringify({ id, utterances }) + '\n');
+    });
+  }
+}
+
+const offlineTTS = new OfflineTTSWorker();
+
 export class ReelEditorService {
   private projectsDir = './uploads/reel-projects';
   private outputDir = './uploads/reel-outputs';
@@ -189,6 +277,15 @@ export class ReelEditorService {
     }
   }
 
+  // Batch offline synthesis, spread across the warm pyttsx3 engines
+  async synthesizeOfflineBatch(utterances: OfflineUtterance[]) {
+    try {
+      return await offlineTTS.synthesize(utterances);
+    } catch (error: any) {
+      return { success: false, error: error.message || 'Offline batch synthesis failed' };
+    }
+  }
+
   // ElevenLabs voice synthesis
   private async synthesizeElevenLabs(text: string, voiceId: string, emotion: string, outputPath: string): Promise<any> {
     return new Promise((resolve) => {
@@ -246,53 +343,20 @@ except Exception as e:
     });
   }
 
-  // pyttsx3 voice synthesis  
+  // pyttsx3 voice synthesis on the warm offline engine pool
   private async synthesizePyttsx3(text: string, voice: string, speed: number, pitch: number, outputPath: string): Promise<any> {
-    return new Promise((resolve) => {
-      const pythonScript = `
-import pyttsx3
-import json
-
-try:
-    engine = pyttsx3.init()
-    
-    # Set voice
-    voices = engine.getProperty('voices')
-    if "${voice}" and len(voices) > 0:
-        for v in voices:
-            if "${voice}".lower() in v.name.lower():
-                engine.setProperty('voice', v.id)
-                break
-    
-    # Set speech rate
-    engine.setProperty('rate', int(${speed} * 200))  # Convert to words per minute
-    
-    # Note: pyttsx3 doesn't support pitch directly
-    engine.save_to_file("${text.replace(/"/g, '\\"')}", "${outputPath}")
-    engine.runAndWait()
-    
-    print(json.dumps({"success": True, "path": "${outputPath}"}))
-    
-except Exception as e:
-    print(json.dumps({"success": False, "error": str(e)}))
-`;
-
-      const python = spawn('python3', ['-c', pythonScript]);
-      let output = '';
-
-      python.stdout.on('data', (data) => {
-        output += data.toString();
-      });
-
-      python.on('close', (code) => {
-        try {
-          const result = JSON.parse(output.trim());
-          resolve(result);
-        } catch {
-          resolve({ success: false, error: 'pyttsx3 synthesis failed' });
-        }
-      });
-    });
+    try {
+      // Note: pyttsx3 doesn't support pitch directly
+      const result = await offlineTTS.synthesize([
+        { text, path: outputPath, voice, rate: Math.round(speed * 200) }
+      ]);
+      if (result.success) {
+        return { success: true, path: outputPath };
+      }
+      return { success: false, error: result.results?.[0]?.error || result.error || 'pyttsx3 synthesis failed' };
+    } catch (error: any) {
+      return { success: false, error: error.message || 'pyttsx3 synthesis failed' };
+    }
   }
 
   // gTTS voice synthesis (enhanced)
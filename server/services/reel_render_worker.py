@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""
+Reel Render Worker - Process pool entry point for segment rendering
+Loads ReelAutomationService once per worker process (reel-automation.py
+cannot be imported by name) and renders segment plans with MoviePy
+"""
+
+import importlib.util
+from typing import Dict
+
+_service = None
+
+
+def load_service(module_path: str):
+    """Import reel-automation.py from its path, once per process"""
+    global _service
+    if _service is None:
+        spec = importlib.util.spec_from_file_location("reel_automation", module_path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _service = module.get_reel_service()
+    return _service
+
+
+def render_moviepy_segment(module_path: str, plan: Dict) -> str:
+    """Render one silent segment plan and return its output path"""
+    load_service(module_path).render_with_moviepy(plan)
+    return plan["output_path"]
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Render Profiles - Named quality presets shared by every video export path
+A profile fixes resolution scale, frame rate, x264 preset/CRF, encoder
+threads and audio bitrate; "draft" trades quality for a fast preview and
+keeps to a couple of encoder threads so batch previews can run side by
+side, while "final" takes every core
+"""
+
+import os
+import logging
+from typing import Dict, Any, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+RENDER_PROFILES: Dict[str, Dict[str, Any]] = {
+    "draft": {
+        "scale": 0.5,
+        "fps": 15,
+        "preset": "ultrafast",
+        "crf": 30,
+        "threads": 2,
+        "audio_bitrate": "64k"
+    },
+    "standard": {
+        "scale": 1.0,
+        "fps": None,  # keep the caller's frame rate
+        "preset": "medium",
+        "crf": 23,
+        "threads": 4,
+        "audio_bitrate": "128k"
+    },
+    "final": {
+        "scale": 1.0,
+        "fps": None,
+        "preset": "slow",
+        "crf": 18,
+        "threads": 0,  # all cores
+        "audio_bitrate": "192k"
+    }
+}
+
+DEFAULT_PROFILE = os.environ.get("MO_RENDER_PROFILE", "standard")
+
+
+def get_render_profile(name: Optional[str] = None) -> Dict[str, Any]:
+    """Resolve a profile by name; threads are capped at the core count, 0 means all cores"""
+    name = name or DEFAULT_PROFILE
+    if name not in RENDER_PROFILES:
+        logger.warning(f"Unknown render profile '{name}', using '{DEFAULT_PROFILE}'")
+        name = DEFAULT_PROFILE if DEFAULT_PROFILE in RENDER_PROFILES else "standard"
+    profile = dict(RENDER_PROFILES[name], name=name)
+    cores = os.cpu_count() or 1
+    profile["threads"] = min(profile["threads"], cores) if profile["threads"] else cores
+    return profile
+
+
+def scaled_size(size: Tuple[int, int], profile: Dict[str, Any]) -> Tuple[int, int]:
+    """Frame size under the profile's scale, kept even for yuv420p"""
+    width, height = size
+    scale = profile["scale"]
+    return (max(2, int(width * scale) // 2 * 2), max(2, int(height * scale) // 2 * 2))
+
+
+def profile_fps(profile: Dict[str, Any], requested: float) -> float:
+    """The profile's fps acts as a cap; it never raises a lower requested rate"""
+    return min(profile["fps"], requested) if profile["fps"] else requested
+
+
+def ffmpeg_encoder_args(profile: Dict[str, Any]) -> List[str]:
+    """Video encoder arguments for a direct ffmpeg invocation"""
+    return [
+        "-c:v", "libx264",
+        "-preset", profile["preset"],
+        "-crf", str(profile["crf"]),
+        "-threads", str(profile["threads"]),
+        "-pix_fmt", "yuv420p"
+    ]
+
+
+def moviepy_write_args(profile: Dict[str, Any]) -> Dict[str, Any]:
+    """Keyword arguments for MoviePy's write_videofile"""
+    return {
+        "codec": "libx264",
+        "preset": profile["preset"],
+        "threads": profile["threads"],
+        "audio_codec": "aac",
+        "audio_bitrate": profile["audio_bitrate"],
+        "ffmpeg_params": ["-crf", str(profile["crf"]), "-pix_fmt", "yuv420p"]
+    }
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+TTS Cache - Content-addressed voice synthesis cache
+Shared by every text-to-speech path (content automation, reel automation,
+AI media generation and the MO listener) so identical narration is only
+synthesized once, across processes and runs. Audio lives in the artifact
+store, whose collector bounds it together with the other generated media.
+"""
+
+import logging
+import threading
+from typing import Callable, Dict, Any, Optional
+
+from artifact_store import ArtifactStore, get_artifact_store
+
+logger = logging.getLogger(__name__)
+
+
+class TTSCache:
+    """Synthesis front end to the artifact store, keyed by the synthesis parameters"""
+
+    def __init__(self, store: Optional[ArtifactStore] = None):
+        self.store = store or get_artifact_store()
+        self.lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0}
+
+    @staticmethod
+    def make_key(text: str, language: str = "en", voice: str = "", speed: float = 1.0,
+                 pitch: float = 1.0, engine: str = "gtts", fmt: str = "mp3") -> str:
+        """Stable SHA-256 over the normalized synthesis parameters"""
+        return ArtifactStore.make_key(
+            "tts",
+            text=text,
+            language=language,
+            voice=voice or "",
+            speed=round(float(speed), 4),
+            pitch=round(float(pitch), 4),
+            engine=engine,
+            format=fmt
+        )
+
+    def lookup(self, key: str) -> Optional[str]:
+        """Return the stored audio for a key, refreshing its LRU position"""
+        return self.store.lookup(key)
+
+    def fetch(self, text: str, synthesize: Callable[[str], None], language: str = "en",
+              voice: str = "", speed: float = 1.0, pitch: float = 1.0,
+              engine: str = "gtts", fmt: str = "mp3") -> str:
+        """Return cached audio for the parameters, synthesizing on a miss
+
+        `synthesize` receives a temporary path to write the audio to; the file
+        is then published into the artifact store.
+        """
+        key = self.make_key(text, language, voice, speed, pitch, engine, fmt)
+        cached = self.lookup(key)
+        if cached:
+            with self.lock:
+                self.stats["hits"] += 1
+            return cached
+
+        with self.lock:
+            self.stats["misses"] += 1
+        return self.store.produce(key, synthesize, f".{fmt}")
+
+    def materialize(self, cached_path: str, output_path: str) -> str:
+        """Expose cached audio at a caller-chosen path and reference it in the store"""
+        return self.store.materialize(cached_path, output_path)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            stats = dict(self.stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+
+_shared_cache: Optional[TTSCache] = None
+
+
+def get_tts_cache() -> TTSCache:
+    """Process-wide cache instance"""
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = TTSCache()
+    return _shared_cache
@@ -0,0 +1,38 @@
+import sys
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+SERVICES_DIR = Path(__file__).resolve().parent.parent / "services"
+sys.path.insert(0, str(SERVICES_DIR))
+
+
+@pytest.fixture
+def reel_service(tmp_path, monkeypatch):
+    """ReelAutomationService loaded from its hyphenated file, working inside tmp_path"""
+    for module in ("moviepy", "gtts", "cv2", "pydub", "requests"):
+        pytest.importorskip(module)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("TMPDIR", str(tmp_path))
+    monkeypatch.setenv("MO_ARTIFACT_STORE", str(tmp_path / "artifacts"))
+    monkeypatch.setenv("MO_MEDIA_INDEX", str(tmp_path / "media_index.db"))
+
+    spec = importlib.util.spec_from_file_location("reel_automation", SERVICES_DIR / "reel-automation.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.ReelAutomationService()
+
+
+def load_module(name, path):
+    """Import a service or script despite its hyphenated file name"""
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(scope="session")
+def listener_module():
+    pytest.importorskip("aiohttp")
+    return load_module("mo_listener", SERVICES_DIR / "mo-listener.py")
@@ -0,0 +1,58 @@
+import time
+from pathlib import Path
+
+import pytest
+
+from artifact_store import ArtifactStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ArtifactStore(str(tmp_path / "store"), max_bytes=1000)
+    store.last_gc = time.time()
+    yield store
+    store.close()
+
+
+def publish_bytes(store, tmp_path, index, size=100):
+    source = tmp_path / f"source_{index}.bin"
+    source.write_bytes(bytes([index % 256]) * size)
+    return store.publish(str(source), key=f"key-{index}")
+
+
+def test_writes_only_collect_once_over_budget(store, tmp_path, monkeypatch):
+    collections = []
+    gc = store.gc
+    monkeypatch.setattr(store, "gc", lambda **kwargs: collections.append(kwargs) or gc(**kwargs))
+
+    for index in range(10):
+        publish_bytes(store, tmp_path, index)
+    assert collections == [] and store.total_bytes == 1000
+
+    publish_bytes(store, tmp_path, 10)
+    assert len(collections) == 1
+    assert store.total_bytes <= 900
+    # Below the low-water mark the next write does not collect again
+    publish_bytes(store, tmp_path, 11)
+    assert len(collections) == 1
+
+
+def test_duplicate_content_is_counted_once(store, tmp_path):
+    publish_bytes(store, tmp_path, 1)
+    publish_bytes(store, tmp_path, 1)
+    assert store.total_bytes == 100
+
+
+def test_gc_keeps_referenced_objects(store, tmp_path):
+    referenced = publish_bytes(store, tmp_path, 1)
+    output = store.materialize(referenced, str(tmp_path / "out" / "reel.mp4"))
+    unreferenced = [publish_bytes(store, tmp_path, index) for index in range(2, 5)]
+
+    result = store.gc(max_bytes=150)
+
+    assert result["objects_removed"] == 3
+    assert Path(referenced).exists() and Path(output).exists()
+    assert not any(Path(path).exists() for path in unreferenced)
+    assert store.lookup("key-1") == referenced
+    assert store.lookup("key-2") is None
+    assert store.total_bytes == 100
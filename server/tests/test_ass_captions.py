@@ -0,0 +1,94 @@
+import re
+
+import ass_captions
+from ass_captions import CAPTION_STYLES, build_ass, caption_events, caption_sprite, filter_path
+
+SIZE = (1080, 1920)
+
+
+def dialogue_lines(script):
+    return [line for line in script.splitlines() if line.startswith("Dialogue:")]
+
+
+def fades(script):
+    return [tuple(map(int, re.search(r"\\fad\((\d+),(\d+)\)", line).groups())) for line in dialogue_lines(script)]
+
+
+def test_whole_caption_fades_in_and_out():
+    script = build_ass([{"text": "A first sentence.", "start": 0.0, "end": 5.5}], SIZE, CAPTION_STYLES["modern"])
+    assert fades(script) == [(300, 300)]
+
+
+def test_caption_spanning_a_segment_cut_does_not_fade_at_the_cut():
+    # "A first sentence." over 0-5.5 s, cut at 4.0 s; each piece is segment-relative
+    first = {"text": "A first sentence.", "start": 0.0, "end": 4.0, "span": (0.0, 5.5)}
+    second = {"text": "A first sentence.", "start": 0.0, "end": 1.5, "span": (-4.0, 1.5)}
+
+    assert fades(build_ass([first], SIZE, CAPTION_STYLES["modern"])) == [(300, 0)]
+    assert fades(build_ass([second], SIZE, CAPTION_STYLES["modern"])) == [(0, 300)]
+
+
+def test_fade_length_comes_from_the_whole_caption_not_the_piece():
+    # A 0.4 s tail of a long caption still fades like the full caption would
+    tail = {"text": "Long caption", "start": 0.0, "end": 0.4, "span": (-6.0, 0.4)}
+    assert fades(build_ass([tail], SIZE, CAPTION_STYLES["modern"])) == [(0, 300)]
+
+
+def test_caption_events_group_three_words_with_karaoke():
+    events = caption_events("one two three four", 4.0)
+    assert [event["text"] for event in events] == ["one two three", "four"]
+    assert events[1]["start"] == 3.0 and events[1]["end"] == 4.0
+    assert "{\\kf100}one" in dialogue_lines(build_ass(events, SIZE, CAPTION_STYLES["modern"]))[0]
+
+
+def test_filter_path_escapes_both_filtergraph_levels():
+    assert filter_path("/tmp/it's:x.ass") == "/tmp/it\\\\\\'s\\\\:x.ass"
+
+
+def test_caption_sprite_sits_above_the_bottom_margin():
+    sprite, (x, y) = caption_sprite("one two three", SIZE, CAPTION_STYLES["bold"])
+    assert sprite.mode == "RGBA"
+    assert x == (SIZE[0] - sprite.width) // 2
+    assert y + sprite.height == SIZE[1] - 100
+    assert sprite.getbbox() is not None
+
+
+def test_burn_captions_falls_back_to_moviepy_without_libass(monkeypatch, tmp_path):
+    video = str(tmp_path / "clip.mp4")
+    calls = []
+    monkeypatch.setattr(ass_captions, "ass_supported", lambda binary: False)
+    monkeypatch.setattr(ass_captions, "probe_media", lambda path: {"duration": 3.0, "video": {"width": 720, "height": 1280}})
+    monkeypatch.setattr(ass_captions, "burn_captions_moviepy", lambda *args: calls.append(args))
+
+    result = ass_captions.burn_captions(video, "one two three four", "minimal")
+
+    assert result["success"] and result["engine"] == "moviepy"
+    assert result["output_path"] == str(tmp_path / "clip_captioned.mp4")
+    source, events, style, output_path, profile = calls[0]
+    assert source == video and output_path == result["output_path"]
+    assert [event["text"] for event in events] == ["one two three", "four"]
+    assert style is CAPTION_STYLES["minimal"]
+
+
+def test_burn_captions_reports_a_failed_fallback(monkeypatch, tmp_path):
+    def broken(*args):
+        raise ImportError("No module named 'moviepy'")
+
+    monkeypatch.setattr(ass_captions, "ass_supported", lambda binary: False)
+    monkeypatch.setattr(ass_captions, "probe_media", lambda path: {"duration": 3.0, "video": {}})
+    monkeypatch.setattr(ass_captions, "burn_captions_moviepy", broken)
+
+    result = ass_captions.burn_captions(str(tmp_path / "clip.mp4"), "caption")
+    assert result == {"success": False, "error": "No module named 'moviepy'"}
+
+
+def test_split_plan_keeps_caption_span_across_segments(reel_service):
+    narration = {"audio_path": None, "segments": [{"text": "A first sentence.", "start": 0.0, "end": 5.5}]}
+    plan = reel_service.build_render_plan({"name": "t", "script": "A first sentence."}, [], narration, 8.0)
+    reel_service.render_settings["segment_cache"] = True
+
+    segments = reel_service.split_plan(plan)
+    pieces = [overlay for segment in segments for overlay in segment["overlays"]]
+    assert len(pieces) == 2
+    assert pieces[0]["span"] == (0.0, 5.5)
+    assert pieces[1]["span"] == (-4.0, 1.5)
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from audio_dsp import apply_gain, pitch_shift, resample, time_stretch
+
+RATE = 16000
+
+
+def tone(frequency, seconds=1.0, rate=RATE):
+    t = np.arange(int(seconds * rate)) / rate
+    return (0.5 * np.sin(2 * np.pi * frequency * t)).astype(np.float32)
+
+
+def dominant_frequency(samples, rate=RATE):
+    mono = samples.mean(axis=1)
+    spectrum = np.abs(np.fft.rfft(mono * np.hanning(len(mono))))
+    return np.fft.rfftfreq(len(mono), 1 / rate)[np.argmax(spectrum)]
+
+
+@pytest.mark.parametrize("rate", [0.75, 1.25, 1.5, 2.0])
+def test_time_stretch_scales_length_and_keeps_pitch(rate):
+    stretched = time_stretch(tone(440), rate, RATE)
+
+    assert stretched.dtype == np.float32 and stretched.shape[1] == 1
+    assert len(stretched) == int(RATE / rate)
+    assert dominant_frequency(stretched) == pytest.approx(440, rel=0.03)
+
+
+@pytest.mark.parametrize("factor", [0.8, 1.25])
+def test_pitch_shift_keeps_length_and_scales_pitch(factor):
+    shifted = pitch_shift(tone(440), factor, RATE)
+
+    assert abs(len(shifted) - RATE) <= 2
+    assert dominant_frequency(shifted) == pytest.approx(440 * factor, rel=0.03)
+
+
+def test_stereo_channels_are_kept():
+    stereo = np.stack([tone(440), tone(660)], axis=1)
+    stretched = time_stretch(stereo, 1.5, RATE)
+
+    assert stretched.shape == (int(RATE / 1.5), 2)
+    assert dominant_frequency(stretched[:, :1]) == pytest.approx(440, rel=0.03)
+    assert dominant_frequency(stretched[:, 1:]) == pytest.approx(660, rel=0.03)
+
+
+def test_resample_and_gain():
+    assert len(resample(tone(440), RATE, RATE // 2)) == RATE // 2
+    louder = apply_gain(tone(440), 6.0)
+    assert np.max(np.abs(louder)) == pytest.approx(0.5 * 10 ** (6 / 20), rel=1e-3)
+
+
+def test_invalid_stretch_rate_is_rejected():
+    with pytest.raises(ValueError):
+        time_stretch(tone(440), 0, RATE)
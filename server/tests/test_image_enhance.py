@@ -0,0 +1,47 @@
+import os
+import asyncio
+
+import pytest
+from PIL import Image
+
+from artifact_store import ArtifactStore
+from image_enhance import ImageEnhancer
+
+SIZE = (108, 192)
+
+
+@pytest.fixture
+def enhancer(tmp_path):
+    enhancer = ImageEnhancer(ArtifactStore(str(tmp_path / "store")), max_workers=2)
+    yield enhancer
+    enhancer.close()
+    enhancer.store.close()
+
+
+def make_image(path, color, size=(200, 300)):
+    Image.new("RGB", size, color).save(path)
+    return str(path)
+
+
+def test_batch_reuses_stored_results_and_falls_back_for_bad_images(enhancer, tmp_path):
+    red = make_image(tmp_path / "red.png", "red")
+    blue = make_image(tmp_path / "blue.png", "blue", (300, 200))
+    broken = tmp_path / "broken.png"
+    broken.write_text("not an image")
+
+    first = asyncio.run(enhancer.enhance_many([red, blue, str(broken), red], "modern", SIZE))
+    assert first[0] == first[3] != red
+    assert first[2] == str(broken)
+    assert Image.open(first[1]).size == SIZE
+
+    assert enhancer.store.get_stats()["objects"] == 2
+    again = asyncio.run(enhancer.enhance_many([blue], "modern", SIZE))
+    assert again == [first[1]]
+
+
+def test_enhanced_images_are_reclaimed_by_store_gc(enhancer, tmp_path):
+    path = enhancer.enhance(make_image(tmp_path / "red.png", "red"), "tech", SIZE)
+
+    enhancer.store.gc(max_bytes=0)
+    assert enhancer.store.get_stats()["objects"] == 0
+    assert not os.path.exists(path)
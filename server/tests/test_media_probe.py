@@ -0,0 +1,42 @@
+import sys
+import types
+
+import pytest
+
+import media_probe
+
+INFOS = {
+    "narration.mp3": {"duration": 12.5, "video_found": False, "audio_found": True, "audio_fps": 24000},
+    "reel.mp4": {"duration": 12.5, "video_found": True, "video_size": [1080, 1920], "video_fps": 30.0,
+                 "audio_found": True, "audio_fps": 44100},
+}
+
+
+@pytest.fixture
+def without_ffprobe(monkeypatch):
+    monkeypatch.setattr(media_probe.shutil, "which", lambda binary: None)
+    ffmpeg_reader = types.SimpleNamespace(
+        ffmpeg_parse_infos=lambda path: INFOS[path.rsplit("/", 1)[-1]]
+    )
+    for name in ("moviepy", "moviepy.video", "moviepy.video.io"):
+        monkeypatch.setitem(sys.modules, name, types.ModuleType(name))
+    monkeypatch.setitem(sys.modules, "moviepy.video.io.ffmpeg_reader", ffmpeg_reader)
+
+
+def test_compressed_audio_falls_back_to_moviepy_headers_without_ffprobe(tmp_path, without_ffprobe):
+    path = tmp_path / "narration.mp3"
+    path.write_bytes(b"ID3")
+
+    metadata = media_probe.read_metadata(str(path))
+    assert metadata["duration"] == 12.5
+    assert metadata["video"] is None
+    assert metadata["audio"]["sample_rate"] == 24000
+
+
+def test_video_falls_back_to_moviepy_headers_without_ffprobe(tmp_path, without_ffprobe):
+    path = tmp_path / "reel.mp4"
+    path.write_bytes(b"\x00")
+
+    metadata = media_probe.read_metadata(str(path))
+    assert metadata["duration"] == 12.5
+    assert (metadata["video"]["width"], metadata["video"]["height"], metadata["video"]["fps"]) == (1080, 1920, 30.0)
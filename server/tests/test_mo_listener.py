@@ -0,0 +1,182 @@
+import json
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from conftest import load_module
+
+BENCHMARK = Path(__file__).resolve().parent.parent / "scripts" / "mo-listener-benchmark.py"
+
+
+@pytest.fixture(scope="module")
+def benchmark(listener_module):
+    return load_module("mo_listener_benchmark", BENCHMARK)
+
+
+@pytest.fixture
+def make_listener(listener_module, tmp_path):
+    def make(**config):
+        config_path = tmp_path / "mo_config.json"
+        config_path.write_text(json.dumps({
+            "journal_path": str(tmp_path / "mo_journal.db"),
+            "metrics_snapshot_path": str(tmp_path / "metrics.json"),
+            "automation_prewarm": False,
+            "log_commands": False,
+            "rate_limits": {},
+            **config
+        }))
+        return listener_module.MoListener(str(config_path))
+    return make
+
+
+def test_long_poll_delivers_without_poll_pacing(benchmark):
+    result = asyncio.run(benchmark.run_mode("long_poll", commands=5, spacing=0.2, enable_push=True))
+    assert result["delivered"] == 5
+    # A held request answers as soon as a command is queued; polling would take ~1 s
+    assert result["p50_ms"] < 250
+
+
+def test_long_poll_falls_back_when_server_does_not_hold(benchmark):
+    result = asyncio.run(benchmark.run_mode("long_poll", commands=3, spacing=0.2, enable_push=False))
+    assert result["delivered"] == 3
+
+
+def test_command_is_not_rerun_while_its_result_awaits_delivery(make_listener):
+    listener = make_listener(journal_enabled=False, result_linger=0.01, result_retry_backoff=0.01)
+    runs = []
+    delivering = {"ok": False}
+
+    async def handler(command):
+        runs.append(command["id"])
+        return {"success": True}
+
+    async def post_results(batch):
+        return len(batch) if delivering["ok"] else 0
+
+    listener.command_handlers["social_action"] = handler
+    listener.post_results = post_results
+
+    async def scenario():
+        command = {"id": "c1", "type": "social_action"}
+        listener.dispatch_command(dict(command))
+        await asyncio.sleep(0.1)
+        # The queue hands the command out again until its result is recorded
+        listener.dispatch_command(dict(command))
+        await asyncio.sleep(0.1)
+        assert runs == ["c1"]
+
+        delivering["ok"] = True
+        await asyncio.wait_for(listener.result_flusher, timeout=2)
+        assert "c1" not in listener.unreported_ids
+
+    asyncio.run(scenario())
+
+
+def test_output_limit_kill_is_reported_as_failure(make_listener):
+    listener = make_listener(stream_output=False, max_output_bytes=1024)
+    result = asyncio.run(listener.run_subprocess("yes", timeout=10))
+
+    assert result["truncated"] is True
+    assert result["success"] is False
+    assert "Output limit exceeded" in result["error"]
+
+
+def test_command_within_output_limit_succeeds(make_listener):
+    listener = make_listener(stream_output=False)
+    result = asyncio.run(listener.run_subprocess("echo hello", timeout=10))
+
+    assert result["success"] is True and result["output"] == "hello\n"
+
+
+def test_prometheus_label_values_are_escaped(listener_module):
+    metrics = listener_module.ListenerMetrics()
+    metrics.inc("mo_listener_commands_total", type='a"b\\c\nd', outcome="success")
+
+    line = [l for l in metrics.render_prometheus().splitlines() if l.startswith("mo_listener_commands_total{")][0]
+    assert line == 'mo_listener_commands_total{outcome="success",type="a\\"b\\\\c\\nd"} 1'
+
+
+def test_unknown_command_types_share_one_label(make_listener):
+    listener = make_listener(journal_enabled=False)
+    for command_type in ("bogus-1", "bogus-2"):
+        listener.dispatch_command({"id": command_type, "type": command_type})
+
+    blocked = [(dict(labels), value) for (name, labels), value in listener.metrics.counters.items()
+               if name == "mo_listener_commands_total"]
+    assert blocked == [({"outcome": "blocked", "type": "unknown"}, 2)]
+
+
+def test_journal_deduplicates_commands_across_restart(listener_module, tmp_path):
+    path = str(tmp_path / "journal.db")
+
+    async def first_run():
+        journal = listener_module.CommandJournal(path)
+        journal.record("done", "fetched", {"id": "done", "type": "social_action"})
+        journal.record("done", "finished", {"success": True})
+        journal.record("done", "reported")
+        journal.record("lost", "fetched", {"id": "lost", "type": "content_generate"})
+        journal.record("lost", "finished", {"success": False, "error": "boom"})
+        await journal.close()
+
+    asyncio.run(first_run())
+
+    journal = listener_module.CommandJournal(path)
+    try:
+        assert journal.is_known("done") and journal.is_known("lost")
+        assert not journal.is_known("new")
+        assert journal.unreported() == {
+            "lost": {
+                "state": "finished",
+                "command": {"id": "lost", "type": "content_generate"},
+                "result": {"success": False, "error": "boom"}
+            }
+        }
+    finally:
+        asyncio.run(journal.close())
+
+
+def test_token_bucket_allows_burst_then_paces(listener_module, monkeypatch):
+    now = {"t": 100.0}
+    monkeypatch.setattr(listener_module.time, "monotonic", lambda: now["t"])
+    bucket = listener_module.TokenBucket(rate=2, burst=3)
+
+    assert [bucket.try_take() for _ in range(4)] == [True, True, True, False]
+    assert bucket.time_until_available() == pytest.approx(0.5)
+
+    now["t"] += 0.5
+    assert bucket.try_take() and not bucket.try_take()
+    now["t"] += 10
+    assert [bucket.try_take() for _ in range(4)] == [True, True, True, False]
+
+
+def test_full_backlog_sheds_newest_lowest_priority_command(make_listener):
+    listener = make_listener(journal_enabled=False, backlog_limit=2, command_priorities={"urgent": 0})
+    sent = []
+
+    async def send_result(command_id, result):
+        sent.append((command_id, result))
+
+    async def handler(command):
+        return {"success": True}
+
+    listener.send_result = send_result
+    listener.command_handlers.update(social_action=handler, urgent=handler)
+
+    async def scenario():
+        # Queued synchronously, so the scheduler has not started any of them yet
+        listener.enqueue_command({"id": "old", "type": "social_action"})
+        listener.enqueue_command({"id": "new", "type": "social_action"})
+        listener.enqueue_command({"id": "urgent", "type": "urgent"})
+        queued = {entry[3]["id"] for entry in listener.backlog}
+        await asyncio.sleep(0.05)
+        return queued
+
+    queued = asyncio.run(scenario())
+
+    assert queued == {"old", "urgent"}
+    assert "new" not in listener.backlog_ids
+    assert ("new", {"success": False, "error": "Dropped by listener load shedding", "shed": True}) in sent
+    assert listener.metrics.counters[
+        ("mo_listener_commands_total", (("outcome", "shed"), ("type", "social_action")))
+    ] == 1
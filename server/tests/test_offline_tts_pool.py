@@ -0,0 +1,87 @@
+import sys
+import time
+import types
+import threading
+
+import pytest
+
+import offline_tts_pool
+from offline_tts_pool import OfflineTTSPool, tts_worker_main
+
+
+class FakeEngine:
+    def __init__(self):
+        self.properties = {"voice": "voice-a", "rate": 200, "volume": 1.0}
+        self.spoken = []
+
+    def getProperty(self, name):
+        if name == "voices":
+            return [types.SimpleNamespace(name="Alice", id="voice-a"), types.SimpleNamespace(name="Bob", id="voice-b")]
+        return self.properties[name]
+
+    def setProperty(self, name, value):
+        self.properties[name] = value
+
+    def save_to_file(self, text, path):
+        self.spoken.append(dict(self.properties))
+        with open(path, "w") as f:
+            f.write(text)
+
+    def runAndWait(self):
+        pass
+
+
+class FakeConn:
+    def __init__(self, batches):
+        self.batches = list(batches) + [None]
+        self.sent = []
+
+    def recv(self):
+        return self.batches.pop(0)
+
+    def send(self, message):
+        self.sent.append(message)
+
+
+def test_unset_properties_fall_back_to_engine_defaults(tmp_path, monkeypatch):
+    engine = FakeEngine()
+    monkeypatch.setitem(sys.modules, "pyttsx3", types.SimpleNamespace(init=lambda: engine))
+    conn = FakeConn([
+        [{"text": "one", "path": str(tmp_path / "1.wav"), "voice": "bob", "rate": 120, "volume": 0.5}],
+        [{"text": "two", "path": str(tmp_path / "2.wav"), "voice": "default"}],
+    ])
+
+    tts_worker_main(conn)
+
+    assert engine.spoken[0] == {"voice": "voice-b", "rate": 120, "volume": 0.5}
+    assert engine.spoken[1] == {"voice": "voice-a", "rate": 200, "volume": 1.0}
+    assert all(result["success"] for batch in conn.sent[1:] for result in batch)
+
+
+def test_concurrent_refills_do_not_grow_the_pool_past_its_size(monkeypatch):
+    pool = OfflineTTSPool(size=2)
+
+    def slow_spawn():
+        time.sleep(0.05)
+        return types.SimpleNamespace(stop=lambda timeout=0: None)
+
+    monkeypatch.setattr(pool, "spawn_worker", slow_spawn)
+    threads = [threading.Thread(target=pool.ensure_workers) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(pool.workers) == 2
+    assert pool.idle.qsize() == 2
+
+
+def test_empty_pool_fails_fast_when_workers_cannot_start(monkeypatch):
+    pool = OfflineTTSPool(size=2, batch_timeout=0.1, startup_timeout=0.1)
+    monkeypatch.setattr(pool, "spawn_worker", lambda: (_ for _ in ()).throw(RuntimeError("no engine")))
+    monkeypatch.setattr(offline_tts_pool.logger, "error", lambda message: None)
+
+    with pytest.raises(RuntimeError, match="No offline TTS workers"):
+        pool.ensure_workers()
+
+    assert pool.run_on_worker([{"path": "x.wav"}])[0]["success"] is False
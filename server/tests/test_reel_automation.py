@@ -0,0 +1,20 @@
+def test_split_script_breaks_run_on_sentences_at_clauses(reel_service):
+    reel_service.narration_settings["max_chunk_chars"] = 40
+    script = "First we open the laptop, then we write the opening line; finally we hit publish. Done."
+
+    assert reel_service.split_script(script) == [
+        "First we open the laptop,",
+        "then we write the opening line;",
+        "finally we hit publish.",
+        "Done."
+    ]
+
+
+def test_split_script_splits_words_only_inside_an_overlong_clause(reel_service):
+    reel_service.narration_settings["max_chunk_chars"] = 20
+    script = "Short clause, and then a clause that runs on far too long."
+
+    chunks = reel_service.split_script(script)
+    assert chunks[0] == "Short clause,"
+    assert all(len(chunk) <= 20 for chunk in chunks)
+    assert " ".join(chunks) == script
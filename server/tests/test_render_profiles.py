@@ -0,0 +1,24 @@
+import render_profiles
+from render_profiles import get_render_profile, profile_fps, scaled_size
+
+
+def test_profiles_differ_in_encoder_threads(monkeypatch):
+    monkeypatch.setattr(render_profiles.os, "cpu_count", lambda: 16)
+    threads = {name: get_render_profile(name)["threads"] for name in ("draft", "standard", "final")}
+    assert threads == {"draft": 2, "standard": 4, "final": 16}
+
+
+def test_threads_never_exceed_the_core_count(monkeypatch):
+    monkeypatch.setattr(render_profiles.os, "cpu_count", lambda: 1)
+    assert get_render_profile("standard")["threads"] == 1
+
+
+def test_profile_fps_caps_but_never_raises_the_requested_rate():
+    draft = get_render_profile("draft")
+    assert profile_fps(draft, 30) == 15
+    assert profile_fps(draft, 12) == 12
+    assert profile_fps(get_render_profile("final"), 24) == 24
+
+
+def test_scaled_size_stays_even():
+    assert scaled_size((1081, 1921), get_render_profile("draft")) == (540, 960)
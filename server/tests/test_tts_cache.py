@@ -0,0 +1,39 @@
+import os
+
+import pytest
+
+from artifact_store import ArtifactStore
+from tts_cache import TTSCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    store = ArtifactStore(str(tmp_path / "store"))
+    yield TTSCache(store)
+    store.close()
+
+
+def test_identical_requests_synthesize_once(cache):
+    calls = []
+
+    def synthesize(path):
+        calls.append(path)
+        with open(path, "wb") as f:
+            f.write(b"audio")
+
+    first = cache.fetch("Hello there", synthesize, speed=1.0)
+    second = cache.fetch("Hello there", synthesize, speed=1.00001)
+
+    assert first == second and len(calls) == 1
+    assert cache.get_stats()["hit_rate"] == 0.5
+    cache.fetch("Hello there", synthesize, speed=1.25)
+    assert len(calls) == 2
+
+
+def test_cached_audio_is_bounded_by_store_gc(cache, tmp_path):
+    path = cache.fetch("Bye", lambda p: open(p, "wb").write(b"x" * 1024))
+    output = cache.materialize(path, str(tmp_path / "out" / "bye.mp3"))
+
+    cache.store.gc(max_bytes=0)
+    assert not os.path.exists(path) and not os.path.exists(output)
+    assert cache.lookup(TTSCache.make_key("Bye")) is None